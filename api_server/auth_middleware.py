@@ -6,12 +6,17 @@ import os
 
 auth_tokens = os.getenv("AUTH_TOKENS", "").split(",") if os.getenv("AUTH_TOKENS") else []
 
+def is_authorized(auth_token: str) -> bool:
+    """Whether the token is accepted, always true when AUTH_TOKENS is unset."""
+    return not len(auth_tokens) or auth_token in auth_tokens
+
+
 async def auth_middleware(request: Request, call_next):
     # skip authentication if the auth_tokens list is empty
     if not len(auth_tokens):
         return await call_next(request)
-    # authenticate all requests except the /health endpoint
-    if request.url.path != "/health":
+    # authenticate all requests except the /health and /ready probes
+    if request.url.path not in ("/health", "/ready"):
         auth_token = request.headers.get("Authorization")
         logger.bind(
             path=request.url.path,
@@ -0,0 +1,102 @@
+"""
+Fan-out of job updates to SSE and websocket subscribers.
+
+The job registry reports changes from worker threads; they are handed to the
+event loop of every subscriber with call_soon_threadsafe and delivered through
+a bounded asyncio queue per subscriber.
+"""
+import asyncio
+import threading
+from typing import Iterable
+from api_server.job_registry import job_registry, COMPLETED, FAILED
+
+# events a subscriber may lag behind before the oldest ones are dropped
+SUBSCRIBER_QUEUE_SIZE = 100
+
+FINISHED_STATES = (COMPLETED, FAILED)
+
+
+class Subscription:
+    """Queue of job updates for one SSE or websocket client."""
+
+    def __init__(self, hub: "JobEventHub", job_ids: Iterable[str]):
+        self.hub = hub
+        self.job_ids = set(job_ids)
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+    def deliver(self, job: dict):
+        # runs on the subscriber's event loop
+        if self.queue.full():
+            # a slow client only needs the latest state, drop the oldest update
+            self.queue.get_nowait()
+        self.queue.put_nowait(job)
+
+    async def get(self) -> dict:
+        """Waits for the next job update."""
+        return await self.queue.get()
+
+    def add(self, job_ids: Iterable[str]):
+        """Subscribes to more jobs."""
+        self.hub.add(self, job_ids)
+
+    def remove(self, job_ids: Iterable[str]):
+        """Unsubscribes from jobs."""
+        self.hub.remove(self, job_ids)
+
+    def close(self):
+        """Unsubscribes from every job."""
+        self.hub.remove(self, list(self.job_ids))
+
+
+class JobEventHub:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = {}
+        job_registry.add_listener(self.publish)
+
+    def subscribe(self, job_ids: Iterable[str]) -> Subscription:
+        """
+        Creates a subscription to updates of the given jobs.
+
+        Must be called from the event loop the updates are consumed on.
+        """
+        subscription = Subscription(self, [])
+        self.add(subscription, job_ids)
+        return subscription
+
+    def add(self, subscription: Subscription, job_ids: Iterable[str]):
+        with self._lock:
+            for job_id in job_ids:
+                subscription.job_ids.add(job_id)
+                self._subscriptions.setdefault(job_id, set()).add(subscription)
+
+    def remove(self, subscription: Subscription, job_ids: Iterable[str]):
+        with self._lock:
+            for job_id in job_ids:
+                subscription.job_ids.discard(job_id)
+                subscribers = self._subscriptions.get(job_id)
+                if subscribers is None:
+                    continue
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscriptions[job_id]
+
+    def publish(self, job: dict):
+        """Hands a job update to its subscribers, callable from any thread."""
+        with self._lock:
+            subscribers = list(self._subscriptions.get(job["id"], ()))
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, job)
+            except RuntimeError:
+                # the subscriber's event loop is closed
+                self.remove(subscription, [job["id"]])
+
+    def subscriber_count(self) -> int:
+        """Returns the number of job subscriptions."""
+        with self._lock:
+            return sum(len(subscribers) for subscribers in self._subscriptions.values())
+
+
+job_event_hub = JobEventHub()
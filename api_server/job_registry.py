@@ -0,0 +1,291 @@
+"""
+Registry of background jobs: state, progress, per-stage timings and errors.
+
+Records are kept in memory for cheap status polling and persisted to SQLite,
+so the outcome of a job survives a restart. Every row records the process
+running the job; queued or running jobs whose process is gone are marked as
+failed when a registry opens the database, so several server processes can
+share it.
+"""
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from typing import Callable, Optional
+from loguru import logger
+from video.config import job_db_path, job_retention_hours
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+# progress updates are persisted at most this often, state changes always
+PROGRESS_PERSIST_INTERVAL = 2.0
+
+COLUMNS = (
+    "id",
+    "kind",
+    "state",
+    "progress",
+    "stage",
+    "stages",
+    "error",
+    "created_at",
+    "started_at",
+    "finished_at",
+)
+
+# (pid, owner string) of this process
+_owner = (None, None)
+
+
+def _process_start_time(pid: int) -> Optional[str]:
+    """Returns the start time of a process in clock ticks since boot, None if unknown."""
+    try:
+        with open(f"/proc/{pid}/stat", "r") as f:
+            # fields after the parenthesized command name, starttime is the 20th
+            return f.read().rsplit(")", 1)[1].split()[19]
+    except (OSError, IndexError):
+        return None
+
+
+def current_owner() -> str:
+    """
+    Identifies the calling process as host:pid:start_time.
+
+    The start time tells a process apart from an earlier one that had the same
+    pid, e.g. the server of a restarted container.
+    """
+    global _owner
+    pid = os.getpid()
+    # recomputed after a fork
+    if _owner[0] != pid:
+        _owner = (pid, f"{socket.gethostname()}:{pid}:{_process_start_time(pid) or ''}")
+    return _owner[1]
+
+
+def owner_alive(owner: Optional[str]) -> bool:
+    """
+    Whether the process that owns a job is still running.
+
+    Processes on other hosts can't be checked and are assumed alive; rows
+    without an owner predate owner tracking and count as dead.
+    """
+    try:
+        host, pid, start_time = owner.rsplit(":", 2)
+        pid = int(pid)
+    except (AttributeError, ValueError):
+        return False
+    if host != socket.gethostname():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return not start_time or _process_start_time(pid) == start_time
+
+
+class JobRegistry:
+    def __init__(self, db_path: str = job_db_path, retention_hours: float = job_retention_hours):
+        """
+        Args:
+            db_path: SQLite database file
+            retention_hours: Age after which finished jobs are deleted
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._persisted_at = {}
+        self._listeners = []
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT,
+                    state TEXT NOT NULL,
+                    progress REAL NOT NULL DEFAULT 0,
+                    stage TEXT,
+                    stages TEXT NOT NULL DEFAULT '{}',
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL,
+                    owner TEXT
+                )
+                """
+            )
+            columns = [row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")]
+            if "owner" not in columns:
+                self._conn.execute("ALTER TABLE jobs ADD COLUMN owner TEXT")
+
+            # only fail the jobs of processes that are gone, other processes
+            # sharing the database may still be running theirs
+            orphaned = [
+                job_id
+                for job_id, owner in self._conn.execute(
+                    "SELECT id, owner FROM jobs WHERE state IN (?, ?)", (QUEUED, RUNNING)
+                )
+                if not owner_alive(owner)
+            ]
+            self._conn.executemany(
+                "UPDATE jobs SET state = ?, error = ?, finished_at = ? WHERE id = ? AND state IN (?, ?)",
+                [
+                    (FAILED, "interrupted by server restart", time.time(), job_id, QUEUED, RUNNING)
+                    for job_id in orphaned
+                ],
+            )
+            interrupted = len(orphaned)
+            pruned = self._conn.execute(
+                "DELETE FROM jobs WHERE finished_at < ?",
+                (time.time() - retention_hours * 3600,),
+            ).rowcount
+        logger.bind(db_path=db_path, interrupted=interrupted, pruned=pruned).debug(
+            "opened job registry"
+        )
+
+    def create(self, job_id: str, kind: str = None) -> dict:
+        """
+        Registers a queued job.
+
+        Args:
+            job_id: Job identifier, usually the output file ID
+            kind: Type of work, e.g. 'kokoro_tts' or 'merge_videos'
+
+        Returns:
+            dict: The job record
+        """
+        job = {
+            "id": job_id,
+            "kind": kind,
+            "state": QUEUED,
+            "progress": 0.0,
+            "stage": None,
+            "stages": {},
+            "error": None,
+            "created_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+        }
+        with self._lock:
+            self._jobs[job_id] = job
+            self._persist(job)
+        self._notify(job)
+        return dict(job)
+
+    def start(self, job_id: str):
+        """Marks a job as running, if it isn't already."""
+        self._update(job_id, persist=True, only_if_state=QUEUED, state=RUNNING, started_at=time.time())
+
+    def finish(self, job_id: str, error: Optional[Exception] = None):
+        """Marks a job as completed, or as failed with the given error."""
+        if error is None:
+            self._update(job_id, persist=True, state=COMPLETED, progress=100.0, stage=None, finished_at=time.time())
+        else:
+            self._update(job_id, persist=True, state=FAILED, error=str(error), stage=None, finished_at=time.time())
+
+    def set_stage(self, job_id: str, stage: str):
+        """Records the stage a job is currently in."""
+        self._update(job_id, persist=True, stage=stage)
+
+    def record_stage(self, job_id: str, stage: str, duration: float):
+        """Stores how long a stage of a job took, in seconds."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            job["stages"] = {**job["stages"], stage: round(duration, 3)}
+            self._persist(job)
+            snapshot = dict(job)
+        self._notify(snapshot)
+
+    def set_progress(self, job_id: str, progress: float):
+        """Updates the progress percentage (0-100) of a running job."""
+        self._update(job_id, persist=False, progress=round(progress, 2))
+
+    def get(self, job_id: str) -> Optional[dict]:
+        """
+        Returns a job record.
+
+        Args:
+            job_id: Job identifier
+
+        Returns:
+            dict: The job record, None if the job is unknown
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                return dict(job)
+            row = self._conn.execute(
+                f"SELECT {', '.join(COLUMNS)} FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        job = dict(zip(COLUMNS, row))
+        job["stages"] = json.loads(job["stages"])
+        return job
+
+    def delete(self, job_id: str):
+        """Removes a job record, e.g. when the job was rejected."""
+        with self._lock:
+            self._jobs.pop(job_id, None)
+            self._persisted_at.pop(job_id, None)
+            with self._conn:
+                self._conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+
+    def add_listener(self, listener: Callable[[dict], None]):
+        """
+        Registers a callback receiving a copy of a job record on every change.
+
+        Listeners are called from the thread that changed the job, so they must
+        return quickly.
+        """
+        self._listeners.append(listener)
+
+    def _update(self, job_id: str, persist: bool, only_if_state: str = None, **fields):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or (only_if_state and job["state"] != only_if_state):
+                return
+            job.update(fields)
+            if fields.get("state") in (COMPLETED, FAILED):
+                # finished jobs are served from SQLite
+                self._jobs.pop(job_id, None)
+            if persist or time.time() - self._persisted_at.get(job_id, 0) > PROGRESS_PERSIST_INTERVAL:
+                self._persist(job)
+            if job["state"] in (COMPLETED, FAILED):
+                self._persisted_at.pop(job_id, None)
+            snapshot = dict(job)
+        self._notify(snapshot)
+
+    def _notify(self, job: dict):
+        for listener in self._listeners:
+            try:
+                listener(dict(job))
+            except Exception as e:
+                logger.bind(job_id=job["id"], error=str(e)).error("job listener failed")
+
+    def _persist(self, job: dict):
+        # called with self._lock held
+        values = [job[column] for column in COLUMNS]
+        values[COLUMNS.index("stages")] = json.dumps(job["stages"])
+        values.append(current_owner())
+        try:
+            with self._conn:
+                self._conn.execute(
+                    f"INSERT OR REPLACE INTO jobs ({', '.join(COLUMNS)}, owner) VALUES ({', '.join('?' * (len(COLUMNS) + 1))})",
+                    values,
+                )
+            self._persisted_at[job["id"]] = time.time()
+        except sqlite3.Error as e:
+            logger.bind(job_id=job["id"], error=str(e)).error("failed to persist job")
+
+
+job_registry = JobRegistry()
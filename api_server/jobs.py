@@ -0,0 +1,284 @@
+"""
+Background job execution with bounded worker pools per resource class.
+
+Replaces FastAPI's BackgroundTasks, which run every task at once in the
+request threadpool. Jobs wait in a priority queue of their resource pool and
+are rejected with QueueFullError (HTTP 429) once the queue is full. A job may
+consist of several stages on different pools, e.g. TTS on the model pool
+followed by rendering on the ffmpeg pool. State, progress and stage timings
+of every job are tracked in the job registry.
+"""
+import itertools
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, List, Optional, Tuple
+from loguru import logger
+from api_server.job_registry import JobRegistry, job_registry
+from video.config import (
+    job_model_workers,
+    job_ffmpeg_workers,
+    job_io_workers,
+    job_queue_max_depth,
+)
+
+
+class QueueFullError(Exception):
+    """Raised when a job is submitted to a pool whose queue is full."""
+
+    def __init__(self, resource: str, depth: int):
+        super().__init__(f"Too many queued {resource} jobs ({depth}), retry later")
+        self.resource = resource
+        self.depth = depth
+
+
+class Job:
+    """
+    A unit of background work made of stages run one after another.
+
+    Every stage callable receives the Job, to report progress and time its
+    steps.
+    """
+
+    def __init__(
+        self,
+        job_id: str,
+        stages: List[Tuple[str, Callable]],
+        registry: JobRegistry,
+        priority: int = 0,
+        on_finish: Optional[Callable] = None,
+    ):
+        self.job_id = job_id
+        self.stages = stages
+        self.registry = registry
+        self.priority = priority
+        self.on_finish = on_finish
+        self.stage_index = 0
+        self.queued_at = None
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Times a step of the job, e.g. 'tts' or 'render'.
+
+        The step is reported as the current stage while it runs, and its
+        duration is stored in the job record.
+        """
+        self.registry.set_stage(self.job_id, name)
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.registry.record_stage(self.job_id, name, time.time() - start)
+
+    def set_progress(self, progress: float):
+        """Reports the progress percentage (0-100), e.g. from MediaUtils."""
+        self.registry.set_progress(self.job_id, progress)
+
+    def finish(self, error: Optional[Exception] = None):
+        """Records the outcome and runs the on_finish callback."""
+        self.registry.finish(self.job_id, error)
+        if self.on_finish is None:
+            return
+        try:
+            self.on_finish(error)
+        except Exception as e:
+            logger.bind(job_id=self.job_id, error=str(e)).error("job on_finish callback failed")
+
+
+class WorkerPool:
+    """
+    Fixed number of worker threads consuming a priority queue.
+
+    Lower priority values run first, jobs with equal priority in FIFO order.
+    """
+
+    def __init__(self, resource: str, workers: int, max_depth: int, manager: "JobManager"):
+        self.resource = resource
+        self.workers = workers
+        self.max_depth = max_depth
+        self.manager = manager
+        self._queue = queue.PriorityQueue()
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self._threads = []
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+
+    def put(self, job: Job, check_depth: bool = True):
+        """
+        Queues a job for its current stage.
+
+        Args:
+            job: Job to queue
+            check_depth: Whether to reject the job when the queue is full;
+                follow-up stages of admitted jobs are never rejected
+        """
+        with self._lock:
+            depth = self._queue.qsize()
+            if check_depth and depth >= self.max_depth:
+                self.rejected += 1
+                raise QueueFullError(self.resource, depth)
+            self._start_workers()
+            job.queued_at = time.time()
+            self._queue.put((job.priority, next(self._counter), job))
+
+    def _start_workers(self):
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(
+                target=self._work,
+                name=f"job-{self.resource}-{len(self._threads)}",
+                daemon=True,
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def _work(self):
+        while True:
+            _, _, job = self._queue.get()
+            resource, fn = job.stages[job.stage_index]
+            wait = time.time() - job.queued_at
+            with self._lock:
+                self.running += 1
+                self.total_wait += wait
+
+            context_logger = logger.bind(
+                job_id=job.job_id,
+                resource=resource,
+                stage=job.stage_index,
+                wait=wait,
+            )
+            context_logger.debug("running job stage")
+            job.registry.start(job.job_id)
+            start = time.time()
+            error = None
+            try:
+                fn(job)
+            except Exception as e:
+                error = e
+                context_logger.bind(error=str(e)).exception("job failed")
+
+            with self._lock:
+                self.running -= 1
+                if error is not None:
+                    self.failed += 1
+                else:
+                    self.completed += 1
+            context_logger.bind(execution_time=time.time() - start).debug("finished job stage")
+
+            if error is None and job.stage_index + 1 < len(job.stages):
+                job.stage_index += 1
+                self.manager.pool(job.stages[job.stage_index][0]).put(job, check_depth=False)
+            else:
+                job.finish(error)
+
+    def stats(self) -> dict:
+        """
+        Returns the counters of this pool.
+
+        Returns:
+            dict: workers, queued and running jobs, totals and average wait
+        """
+        with self._lock:
+            started = self.completed + self.failed + self.running
+            return {
+                "workers": self.workers,
+                "max_depth": self.max_depth,
+                "queued": self._queue.qsize(),
+                "running": self.running,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "avg_wait": self.total_wait / started if started else 0.0,
+            }
+
+
+class JobManager:
+    """Routes jobs to the worker pool of their resource class."""
+
+    def __init__(
+        self,
+        workers: dict,
+        max_depth: int = job_queue_max_depth,
+        registry: JobRegistry = job_registry,
+    ):
+        """
+        Args:
+            workers: Resource class name -> number of worker threads
+            max_depth: Maximum number of queued jobs per resource class
+            registry: Registry tracking the state of the jobs
+        """
+        self.registry = registry
+        self._pools = {
+            resource: WorkerPool(resource, count, max_depth, self)
+            for resource, count in workers.items()
+        }
+
+    def pool(self, resource: str) -> WorkerPool:
+        """Returns the worker pool of a resource class."""
+        if resource not in self._pools:
+            raise ValueError(
+                f"Unknown job resource: {resource}. Valid resources: {list(self._pools)}"
+            )
+        return self._pools[resource]
+
+    def submit(
+        self,
+        job_id: str,
+        stages: List[Tuple[str, Callable]],
+        kind: str = None,
+        priority: int = 0,
+        on_finish: Optional[Callable] = None,
+    ) -> Job:
+        """
+        Queues a job.
+
+        Args:
+            job_id: Job identifier, usually the output file ID
+            stages: (resource, callable) pairs run in order, each on the pool of
+                its resource class; a failing stage ends the job. The callables
+                are called with the Job
+            kind: Type of work recorded in the registry, e.g. 'merge_videos'
+            priority: Lower values run first (default: 0)
+            on_finish: Called with the exception (or None) once the job has
+                ended, also when it is rejected
+
+        Returns:
+            Job: The queued job
+
+        Raises:
+            QueueFullError: When the queue of the first stage's pool is full
+        """
+        job = Job(job_id, stages, self.registry, priority=priority, on_finish=on_finish)
+        self.registry.create(job_id, kind)
+        try:
+            self.pool(stages[0][0]).put(job)
+        except QueueFullError as e:
+            logger.bind(job_id=job_id, resource=e.resource, depth=e.depth).warning(
+                "rejected job, queue is full"
+            )
+            self.registry.delete(job_id)
+            if on_finish is not None:
+                on_finish(e)
+            raise
+        logger.bind(job_id=job_id, resources=[resource for resource, _ in stages]).debug(
+            "queued job"
+        )
+        return job
+
+    def stats(self) -> dict:
+        """Returns the counters of every pool."""
+        return {resource: pool.stats() for resource, pool in self._pools.items()}
+
+
+job_manager = JobManager(
+    {
+        "model": job_model_workers,
+        "ffmpeg": job_ffmpeg_workers,
+        "io": job_io_workers,
+    }
+)
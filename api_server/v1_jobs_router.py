@@ -0,0 +1,143 @@
+import asyncio
+import json
+from fastapi import APIRouter, Request, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import JSONResponse, StreamingResponse
+from loguru import logger
+from api_server.auth_middleware import is_authorized
+from api_server.jobs import job_manager
+from api_server.job_registry import job_registry
+from api_server.job_events import job_event_hub, FINISHED_STATES
+
+# seconds between SSE comments keeping idle connections open through proxies
+KEEP_ALIVE_INTERVAL = 15
+
+v1_jobs_router = APIRouter()
+
+
+@v1_jobs_router.get("/stats")
+def get_job_stats():
+    """
+    Get queued, running and finished job counts of every worker pool.
+    """
+    return {
+        **job_manager.stats(),
+        "subscribers": job_event_hub.subscriber_count(),
+    }
+
+
+@v1_jobs_router.websocket("/ws")
+async def job_updates_websocket(websocket: WebSocket):
+    """
+    Push updates of many jobs over one websocket.
+
+    Subscribe with the job_ids query parameter (comma-separated) or by sending
+    {"subscribe": [...]} / {"unsubscribe": [...]} messages. Every update is a
+    job record as returned by /jobs/{id}; the current record is sent right
+    after subscribing, and a job is unsubscribed once it has finished.
+    The auth token is read from the Authorization header or the token query
+    parameter.
+    """
+    auth_token = websocket.headers.get("Authorization") or websocket.query_params.get("token")
+    if not is_authorized(auth_token):
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    await websocket.accept()
+
+    subscription = job_event_hub.subscribe([])
+
+    async def subscribe(job_ids):
+        subscription.add(job_ids)
+        for job_id in job_ids:
+            job = await asyncio.to_thread(job_registry.get, job_id)
+            if job is None:
+                subscription.remove([job_id])
+                await websocket.send_json({"id": job_id, "error": "not_found"})
+            else:
+                subscription.deliver(job)
+
+    async def receive():
+        while True:
+            message = await websocket.receive_json()
+            await subscribe(message.get("subscribe", []))
+            subscription.remove(message.get("unsubscribe", []))
+
+    async def send():
+        while True:
+            job = await subscription.get()
+            await websocket.send_json(job)
+            if job["state"] in FINISHED_STATES:
+                subscription.remove([job["id"]])
+
+    job_ids = websocket.query_params.get("job_ids")
+    tasks = []
+    try:
+        if job_ids:
+            await subscribe([job_id.strip() for job_id in job_ids.split(",") if job_id.strip()])
+        tasks = [asyncio.create_task(receive()), asyncio.create_task(send())]
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            task.result()
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.bind(error=str(e)).error("job updates websocket failed")
+    finally:
+        for task in tasks:
+            task.cancel()
+        subscription.close()
+
+
+@v1_jobs_router.get("/{job_id}")
+def get_job(job_id: str):
+    """
+    Get the state, progress, stage timings and error of a job.
+
+    The job ID is the file ID returned by the endpoint that queued the job.
+    """
+    job = job_registry.get(job_id)
+    if job is None:
+        return JSONResponse(
+            status_code=status.HTTP_404_NOT_FOUND,
+            content={"error": f"Job with ID {job_id} not found."},
+        )
+    return job
+
+
+@v1_jobs_router.get("/{job_id}/events")
+async def stream_job_events(job_id: str, request: Request):
+    """
+    Stream updates of a job as server-sent events until it has finished.
+
+    Every "job" event carries the job record as returned by /jobs/{id},
+    starting with its current state.
+    """
+    subscription = job_event_hub.subscribe([job_id])
+    job = await asyncio.to_thread(job_registry.get, job_id)
+    if job is None:
+        subscription.close()
+        return JSONResponse(
+            status_code=status.HTTP_404_NOT_FOUND,
+            content={"error": f"Job with ID {job_id} not found."},
+        )
+
+    async def event_stream():
+        try:
+            update = job
+            while True:
+                yield f"event: job\ndata: {json.dumps(update)}\n\n"
+                if update["state"] in FINISHED_STATES:
+                    return
+                while True:
+                    try:
+                        update = await asyncio.wait_for(
+                            subscription.get(), timeout=KEEP_ALIVE_INTERVAL
+                        )
+                        break
+                    except asyncio.TimeoutError:
+                        if await request.is_disconnected():
+                            return
+                        yield ": keep-alive\n\n"
+        finally:
+            subscription.close()
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
@@ -1,16 +1,19 @@
-from fastapi import Query, Request, status, APIRouter, UploadFile, File, Form, BackgroundTasks
+from fastapi import Query, Request, status, APIRouter, UploadFile, File, Form
 from fastapi.responses import JSONResponse, StreamingResponse
 from typing import Literal, Optional
 import os
+import json
 from loguru import logger
-import matplotlib.font_manager as fm
 
-from video.tts import TTS
-from video.tts_chatterbox import TTSChatterbox
-from video.stt import STT
+from api_server.jobs import job_manager
+from api_server.job_registry import job_registry, QUEUED, RUNNING, FAILED
+from video.models import models, get_stt, get_tts, get_tts_chatterbox
+from video.tts_cache import tts_result_cache
+from video.voices import LANGUAGE_VOICE_MAP, valid_kokoro_voices
+from video.stt_cache import transcription_cache
 from video.storage import Storage
 from video.caption import Caption
-from video.media import MediaUtils
+from video.media import MediaUtils, STREAM_AUDIO_FORMATS
 from video.builder import VideoBuilder
 from utils.image import resize_image_cover
 
@@ -29,22 +32,38 @@ storage_path = os.getenv("STORAGE_PATH", os.path.join(os.path.abspath(os.getcwd(
 storage = Storage(
     storage_path=storage_path,
 )
-stt = STT()
-tts_manager = TTS()
-tts_chatterbox = TTSChatterbox()
 
 @v1_media_api_router.post("/audio-tools/transcribe")
 def transcribe(
     audio_file: UploadFile = File(..., description="Audio file to transcribe"),
     language: Optional[str] = Form(None, description="Language code (optional)"),
+    beam_size: Optional[int] = Form(5, description="Beam size for decoding (default: 5)", ge=1, le=10),
+    batch_size: Optional[int] = Form(
+        None, description="Batch size for batched decoding, 0 disables it (default: WHISPER_BATCH_SIZE)", ge=0, le=64
+    ),
+    parallel: Optional[bool] = Form(
+        False, description="Split long audio at pauses and transcribe the chunks in parallel worker processes (default: false)"
+    ),
 ):
     """
     Transcribe audio file to text.
     """
-    logger.bind(language=language, filename=audio_file.filename).info(
+    logger.bind(language=language, filename=audio_file.filename, parallel=parallel).info(
         "Transcribing audio file"
     )
-    captions, duration = stt.transcribe(audio_file.file, beam_size=5, language=language)
+    if parallel:
+        captions, duration = get_stt().transcribe_parallel(
+            audio_file.file,
+            beam_size=beam_size or 5,
+            language=language,
+        )
+    else:
+        captions, duration = get_stt().transcribe(
+            audio_file.file,
+            beam_size=beam_size or 5,
+            language=language,
+            batch_size=batch_size,
+        )
     transcription = "".join([cap["text"] for cap in captions])
 
     return {
@@ -52,15 +71,92 @@ def transcribe(
         "duration": duration,
     }
 
+
+@v1_media_api_router.post("/audio-tools/transcribe/stream")
+def stream_transcription(
+    audio_file: UploadFile = File(..., description="Audio file to transcribe"),
+    language: Optional[str] = Form(None, description="Language code (optional)"),
+    beam_size: Optional[int] = Form(5, description="Beam size for decoding (default: 5)", ge=1, le=10),
+    batch_size: Optional[int] = Form(
+        None, description="Batch size for batched decoding, 0 disables it (default: WHISPER_BATCH_SIZE)", ge=0, le=64
+    ),
+    stream_format: Literal["ndjson", "sse"] = Form(
+        "ndjson", description="Event format: ndjson or sse (default: ndjson)"
+    ),
+):
+    """
+    Transcribe audio file to text, streaming words as each segment is decoded.
+
+    Emits an "info" event with the detected language and duration, a "words"
+    event per decoded segment and a final "done" event.
+    """
+    logger.bind(
+        language=language, filename=audio_file.filename, stream_format=stream_format
+    ).info("Streaming transcription of audio file")
+
+    # the upload is closed once the endpoint returns, so keep a copy for the stream
+    _, file_extension = os.path.splitext(audio_file.filename or "")
+    audio_id = storage.upload_media(
+        media_type="tmp",
+        media_data=audio_file.file.read(),
+        file_extension=file_extension,
+    )
+    audio_path = storage.get_media_path(audio_id)
+
+    def event_stream():
+        try:
+            for event in get_stt().transcribe_stream(
+                audio_path,
+                language=language,
+                beam_size=beam_size or 5,
+                batch_size=batch_size,
+            ):
+                if stream_format == "sse":
+                    yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+                else:
+                    yield json.dumps(event) + "\n"
+        except Exception as e:
+            logger.bind(audio_id=audio_id, error=str(e)).error("streaming transcription failed")
+            error = {"type": "error", "error": str(e)}
+            if stream_format == "sse":
+                yield f"event: error\ndata: {json.dumps(error)}\n\n"
+            else:
+                yield json.dumps(error) + "\n"
+        finally:
+            storage.delete_media(audio_id)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream" if stream_format == "sse" else "application/x-ndjson",
+    )
+
+
+@v1_media_api_router.get("/audio-tools/transcribe/pool/stats")
+def get_transcription_pool_stats():
+    """
+    Get usage and queue wait times of the Whisper model pool.
+    """
+    if not models.is_loaded("whisper"):
+        return {"loaded": False}
+    return get_stt().stats()
+
+
+@v1_media_api_router.get("/audio-tools/transcribe/cache/stats")
+def get_transcription_cache_stats():
+    """
+    Get hit/miss counters of the transcription cache.
+    """
+    return transcription_cache.stats()
+
+
 @v1_media_api_router.get("/audio-tools/tts/kokoro/voices")
 def get_kokoro_voices():
-    voices = tts_manager.valid_kokoro_voices()
+    voices = valid_kokoro_voices()
     return {"voices": voices}
 
 
 @v1_media_api_router.post("/audio-tools/tts/kokoro")
 def generate_kokoro_tts(
-    background_tasks: BackgroundTasks,
     text: str = Form(..., description="Text to convert to speech"),
     voice: Optional[str] = Form(None, description="Voice name for kokoro TTS"),
     speed: Optional[float] = Form(None, description="Speed for kokoro TTS"),
@@ -70,7 +166,7 @@ def generate_kokoro_tts(
     """
     if not voice:
         voice = "af_heart"
-    voices = tts_manager.valid_kokoro_voices()
+    voices = valid_kokoro_voices()
     if voice not in voices:
         return JSONResponse(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -79,28 +175,64 @@ def generate_kokoro_tts(
     audio_id, audio_path = storage.create_media_filename_with_id(
         media_type="audio", file_extension=".wav"
     )
-    tmp_file_id = storage.create_tmp_file(audio_id)
 
-    def bg_task():
-        tts_manager.kokoro(
-            text=text,
-            output_path=audio_path,
-            voice=voice,
-            speed=speed if speed else 1.0,
-        )
-        storage.delete_media(tmp_file_id)
+    def bg_task(job):
+        with job.stage("tts"):
+            get_tts().kokoro(
+                text=text,
+                output_path=audio_path,
+                voice=voice,
+                speed=speed if speed else 1.0,
+            )
 
-    # background_tasks.add_task(bg_task)
-    logger.info(f"Adding background task for TTS generation with ID: {audio_id}")
-    background_tasks.add_task(bg_task)
-    logger.info(f"Background task added for TTS generation with ID: {audio_id}")
+    logger.info(f"Queueing TTS generation job with ID: {audio_id}")
+    job_manager.submit(audio_id, [("model", bg_task)], kind="kokoro_tts")
 
     return {"file_id": audio_id}
 
 
+@v1_media_api_router.post("/audio-tools/tts/kokoro/stream")
+def stream_kokoro_tts(
+    text: str = Form(..., description="Text to convert to speech"),
+    voice: Optional[str] = Form(None, description="Voice name for kokoro TTS"),
+    speed: Optional[float] = Form(None, description="Speed for kokoro TTS"),
+    audio_format: Literal["wav", "mp3", "opus"] = Form(
+        "wav", description="Streamed audio format: wav, mp3 or opus (default: wav)"
+    ),
+):
+    """
+    Stream audio from text using kokoro TTS, chunk by chunk as it is synthesized.
+    """
+    if not voice:
+        voice = "af_heart"
+    voices = valid_kokoro_voices()
+    if voice not in voices:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={"error": f"Invalid voice: {voice}. Valid voices: {voices}"},
+        )
+    if not text.strip():
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={"error": "Text cannot be empty or whitespace"},
+        )
+
+    logger.bind(voice=voice, audio_format=audio_format, text_length=len(text)).info(
+        "Streaming kokoro TTS"
+    )
+    return StreamingResponse(
+        get_tts().kokoro_stream_encoded(
+            text=text,
+            voice=voice,
+            speed=speed if speed else 1.0,
+            audio_format=audio_format,
+        ),
+        media_type=STREAM_AUDIO_FORMATS[audio_format],
+    )
+
+
 @v1_media_api_router.post("/audio-tools/tts/chatterbox")
 def generate_chatterbox_tts(
-    background_tasks: BackgroundTasks,
     text: str = Form(..., description="Text to convert to speech"),
     sample_audio_id: Optional[str] = Form(
         None, description="Sample audio ID for voice cloning"
@@ -118,7 +250,10 @@ def generate_chatterbox_tts(
     chunk_chars: Optional[int] = Form(1024, description="Max characters per chunk (default: 1024)"),
     chunk_silence_ms: Optional[int] = Form(
         350, description="Silence duration between chunks in milliseconds (default: 350)"
-    )
+    ),
+    seed: Optional[int] = Form(
+        None, description="Random seed for deterministic generation, enables result caching (optional)"
+    ),
 ):
     """
     Generate audio from text using Chatterbox TTS.
@@ -148,11 +283,9 @@ def generate_chatterbox_tts(
             )
         sample_audio_path = storage.get_media_path(sample_audio_id)
 
-    tmp_file_id = storage.create_tmp_file(audio_id)
-
-    def bg_task():
-        try:
-            tts_chatterbox.chatterbox(
+    def bg_task(job):
+        with job.stage("tts"):
+            get_tts_chatterbox().chatterbox(
                 text=text,
                 output_path=audio_path,
                 sample_audio_path=sample_audio_path,
@@ -161,20 +294,48 @@ def generate_chatterbox_tts(
                 temperature=temperature,
                 chunk_chars=chunk_chars,
                 chunk_silence_ms=chunk_silence_ms,
+                seed=seed,
             )
-        except Exception as e:
-            logger.error(f"Error in Chatterbox TTS: {e}")
-        finally:
-            storage.delete_media(tmp_file_id)
 
-    # background_tasks.add_task(bg_task)
-    logger.info(f"Adding background task for Chatterbox TTS generation with ID: {audio_id}")
-    background_tasks.add_task(bg_task)
-    logger.info(f"Background task added for Chatterbox TTS generation with ID: {audio_id}")
+    logger.info(f"Queueing Chatterbox TTS generation job with ID: {audio_id}")
+    job_manager.submit(audio_id, [("model", bg_task)], kind="chatterbox_tts")
 
     return {"file_id": audio_id}
 
 
+@v1_media_api_router.get("/audio-tools/tts/cache/stats")
+def get_tts_cache_stats():
+    """
+    Get hit/miss counters of the TTS result cache.
+    """
+    return tts_result_cache.stats()
+
+
+@v1_media_api_router.post("/audio-tools/tts/chatterbox/model/unload")
+def unload_chatterbox_model():
+    """
+    Release the shared Chatterbox model, e.g. to free GPU memory.
+    """
+    if not models.is_loaded("chatterbox"):
+        return {"loaded": False}
+    from video.tts_chatterbox import chatterbox_model
+
+    chatterbox_model.unload()
+    return {"loaded": chatterbox_model.is_loaded}
+
+
+@v1_media_api_router.post("/audio-tools/tts/chatterbox/model/reload")
+def reload_chatterbox_model():
+    """
+    Reload the shared Chatterbox model from the pretrained weights.
+    """
+    get_tts_chatterbox()
+    from video.tts_chatterbox import chatterbox_model
+
+    chatterbox_model.reload()
+    return {"loaded": chatterbox_model.is_loaded}
+
+
 @v1_media_api_router.post("/storage")
 def upload_file(
     file: Optional[UploadFile] = File(None, description="File to upload"),
@@ -244,18 +405,23 @@ def delete_file(file_id: str):
 def file_status(file_id: str):
     """
     Check the status of a file by its ID.
+
+    To follow a job without polling, subscribe to /api/v1/jobs/{file_id}/events
+    (SSE) or /api/v1/jobs/ws (websocket).
     """
-    tmp_id = storage.create_tmp_file_id(file_id)
-    if storage.media_exists(tmp_id):
-        return {"status": "processing"}
-    elif storage.media_exists(file_id):
+    job = job_registry.get(file_id)
+    if job is not None:
+        if job["state"] in (QUEUED, RUNNING):
+            return {"status": "processing", "progress": job["progress"], "stage": job["stage"]}
+        if job["state"] == FAILED:
+            return {"status": "failed", "error": job["error"]}
+    if storage.media_exists(file_id):
         return {"status": "ready"}
     return {"status": "not_found"}
 
 
 @v1_media_api_router.post("/video-tools/merge")
 def merge_videos(
-    background_tasks: BackgroundTasks,
     video_ids: str = Form(..., description="List of video IDs to merge"),
     background_music_id: Optional[str] = Form(
         None, description="Background music ID (optional)"
@@ -298,28 +464,28 @@ def merge_videos(
         storage.get_media_path(background_music_id) if background_music_id else None
     )
 
-    utils = MediaUtils()
-
-    temp_file_id = storage.create_tmp_file(merged_video_id)
-
-    def bg_task():
-        utils.merge_videos(
-            video_paths=video_paths,
-            output_path=merged_video_path,
-            background_music_path=background_music_path,
-            background_music_volume=background_music_volume,
-        )
-        storage.delete_media(temp_file_id)
+    def bg_task(job):
+        utils = MediaUtils(progress_callback=job.set_progress)
+        with job.stage("render"):
+            success = utils.merge_videos(
+                video_paths=video_paths,
+                output_path=merged_video_path,
+                background_music_path=background_music_path,
+                background_music_volume=background_music_volume,
+            )
+        if not success:
+            raise RuntimeError("Failed to merge videos")
 
-    logger.info(f"Adding background task for video merge with ID: {merged_video_id}")
-    background_tasks.add_task(bg_task)
-    logger.info(f"Background task added for video merge with ID: {merged_video_id}")
+    logger.info(f"Queueing video merge job with ID: {merged_video_id}")
+    job_manager.submit(merged_video_id, [("ffmpeg", bg_task)], kind="merge_videos")
 
     return {"file_id": merged_video_id}
 
 
 @v1_media_api_router.get('/fonts')
 def list_fonts():
+    import matplotlib.font_manager as fm
+
     fonts = set()
     for fname in fm.findSystemFonts(fontpaths=None, fontext='ttf'):
         try:
@@ -332,7 +498,6 @@ def list_fonts():
 
 @v1_media_api_router.post("/video-tools/generate/tts-captioned-video")
 def generate_captioned_video(
-    background_tasks: BackgroundTasks,
     background_id: str = Form(..., description="Background image ID"),
     text: Optional[str] = Form(None, description="Text to generate video from"),
     width: Optional[int] = Form(1080, description="Width of the video (default: 1080)"),
@@ -352,7 +517,8 @@ def generate_captioned_video(
         None, description="Language code for STT (optional, e.g. 'en', 'fr', 'de'), defaults to None (auto-detect language if audio_id is provided)"
     ),
     
-    image_effect: Optional[str] = Form("ken_burns", description="Effect to apply to the background image, options: ken_burns, pan (default: 'ken_burns')"),
+    image_effect: Optional[str] = Form("ken_burns", description="Effect to apply to the background image, options: ken_burns, pan, none (default: 'ken_burns')"),
+    ken_burns_engine: Optional[Literal["zoompan", "warp"]] = Form(None, description="Renderer of the ken_burns effect: zoompan (ffmpeg filter) or warp (smooth sub-pixel motion), defaults to the KEN_BURNS_ENGINE setting"),
     
     # Flattened subtitle configuration options
     caption_config_line_count: Optional[int] = Form(1, description="Number of lines per subtitle segment (default: 1)", ge=1, le=5),
@@ -409,7 +575,7 @@ def generate_captioned_video(
             status_code=status.HTTP_400_BAD_REQUEST,
             content={"error": f"Audio with ID {audio_id} not found."},
         )
-    if not audio_id and kokoro_voice not in tts_manager.valid_kokoro_voices():
+    if not audio_id and kokoro_voice not in valid_kokoro_voices():
         return JSONResponse(
             status_code=status.HTTP_400_BAD_REQUEST,
             content={"error": f"Invalid voice: {kokoro_voice}."},
@@ -433,25 +599,20 @@ def generate_captioned_video(
     builder = VideoBuilder(
         dimensions=dimensions,
     )
-    builder.set_media_utils(MediaUtils())
-
-    tmp_file_id = storage.create_tmp_file(output_id)
 
-    def bg_task(
-        tmp_file_id: str = tmp_file_id,
-    ):
-        tmp_file_ids = [tmp_file_id]
+    tmp_file_ids = []
 
+    def tts_stage(job):
         # set audio, generate captions
         captions = None
         tts_audio_id = audio_id
-        from video.tts import LANGUAGE_VOICE_MAP
         lang_config = LANGUAGE_VOICE_MAP.get(kokoro_voice, {})
         international = lang_config.get("international", False)
         
         if tts_audio_id:
             audio_path = storage.get_media_path(tts_audio_id)
-            captions = stt.transcribe(audio_path=audio_path, language=language)[0]
+            with job.stage("stt"):
+                captions = get_stt().transcribe(audio_path=audio_path, language=language)[0]
             builder.set_audio(audio_path)
         # generate TTS and set audio
         else:
@@ -459,65 +620,74 @@ def generate_captioned_video(
                 media_type="audio", file_extension=".wav"
             )
             tmp_file_ids.append(tts_audio_id)
-            captions = tts_manager.kokoro(
-                text=text,
-                output_path=audio_path,
-                voice=kokoro_voice,
-                speed=kokoro_speed,
-            )[0]
+            with job.stage("tts"):
+                captions = get_tts().kokoro(
+                    text=text,
+                    output_path=audio_path,
+                    voice=kokoro_voice,
+                    speed=kokoro_speed,
+                )[0]
             if international:
-                # use whisper to create captions
+                # align the known sentences with whisper to get word timings
                 iso_lang_code = lang_config.get("iso639_1")
-                captions = stt.transcribe(audio_path=audio_path, language=iso_lang_code)[0]
+                with job.stage("stt"):
+                    captions = get_stt().align(
+                        audio_path=audio_path,
+                        segments=captions,
+                        language=iso_lang_code,
+                    )
             
             builder.set_audio(audio_path)
 
-        # create subtitle
-        captionsManager = Caption()
-        subtitle_id, subtitle_path = storage.create_media_filename_with_id(
-            media_type="tmp", file_extension=".ass"
-        )
-        tmp_file_ids.append(subtitle_id)
+        with job.stage("subtitles"):
+            # create subtitle
+            captionsManager = Caption()
+            subtitle_id, subtitle_path = storage.create_media_filename_with_id(
+                media_type="tmp", file_extension=".ass"
+            )
+            tmp_file_ids.append(subtitle_id)
         
-        # create segments based on language
-        if international:
-            segments = captionsManager.create_subtitle_segments_english(
-                captions=captions,
-                lines=parsed_subtitle_options.get('lines', parsed_subtitle_options.get("lines", 1)),
-                max_length=parsed_subtitle_options.get('max_length', parsed_subtitle_options.get("max_length", 1)),
+            # create segments based on language
+            if international:
+                segments = captionsManager.create_subtitle_segments_english(
+                    captions=captions,
+                    lines=parsed_subtitle_options.get('lines', parsed_subtitle_options.get("lines", 1)),
+                    max_length=parsed_subtitle_options.get('max_length', parsed_subtitle_options.get("max_length", 1)),
+                )
+            else:
+                segments = captionsManager.create_subtitle_segments_international(
+                    captions=captions,
+                    lines=parsed_subtitle_options.get('lines', parsed_subtitle_options.get('lines', 1)),
+                    max_length=parsed_subtitle_options.get('max_length', parsed_subtitle_options.get('max_length', 1)),
+                )
+        
+            captionsManager.create_subtitle(
+                segments=segments,
+                output_path=subtitle_path,
+                dimensions=dimensions,
+
+                font_size=parsed_subtitle_options.get('font_size', 120),
+                shadow_blur=parsed_subtitle_options.get('shadow_blur', 10),
+                stroke_size=parsed_subtitle_options.get('stroke_size', 5),
+                shadow_color=parsed_subtitle_options.get('shadow_color', "#000"),
+                stroke_color=parsed_subtitle_options.get('stroke_color', "#000"),
+                font_name=parsed_subtitle_options.get('font_name', "Arial"),
+                font_bold=parsed_subtitle_options.get('font_bold', True),
+                font_italic=parsed_subtitle_options.get('font_italic', False),
+                subtitle_position=parsed_subtitle_options.get('subtitle_position', "top"),
+                font_color=parsed_subtitle_options.get('font_color', "#fff"),
+                shadow_transparency=parsed_subtitle_options.get('shadow_transparency', 0.4),
             )
-        else:
-            segments = captionsManager.create_subtitle_segments_international(
-                captions=captions,
-                lines=parsed_subtitle_options.get('lines', parsed_subtitle_options.get('lines', 1)),
-                max_length=parsed_subtitle_options.get('max_length', parsed_subtitle_options.get('max_length', 1)),
+            builder.set_captions(
+                file_path=subtitle_path,
             )
-        
-        captionsManager.create_subtitle(
-            segments=segments,
-            output_path=subtitle_path,
-            dimensions=dimensions,
-
-            font_size=parsed_subtitle_options.get('font_size', 120),
-            shadow_blur=parsed_subtitle_options.get('shadow_blur', 10),
-            stroke_size=parsed_subtitle_options.get('stroke_size', 5),
-            shadow_color=parsed_subtitle_options.get('shadow_color', "#000"),
-            stroke_color=parsed_subtitle_options.get('stroke_color', "#000"),
-            font_name=parsed_subtitle_options.get('font_name', "Arial"),
-            font_bold=parsed_subtitle_options.get('font_bold', True),
-            font_italic=parsed_subtitle_options.get('font_italic', False),
-            subtitle_position=parsed_subtitle_options.get('subtitle_position', "top"),
-            font_color=parsed_subtitle_options.get('font_color', "#fff"),
-            shadow_transparency=parsed_subtitle_options.get('shadow_transparency', 0.4),
-        )
-        builder.set_captions(
-            file_path=subtitle_path,
-        )
 
+    def render_stage(job):
+        builder.set_media_utils(MediaUtils(progress_callback=job.set_progress))
         # resize background image if needed
         background_path = storage.get_media_path(background_id)
         utils = MediaUtils()
-        info = utils.get_video_info(background_path)
+        info = utils.probe(background_path)["video"] or {}
         if info.get("width", 0) != width or info.get("height", 0) != height:
             logger.bind(
                 image_width=info.get("width", 0),
@@ -542,20 +712,29 @@ def generate_captioned_video(
             background_path,
             effect_config={
                 "effect": image_effect,
+                **({"engine": ken_burns_engine} if ken_burns_engine else {}),
             }
         )
 
         builder.set_output_path(output_path)
 
-        builder.execute()
-
-        for tmp_file_id in tmp_file_ids:
-            if storage.media_exists(tmp_file_id):
-                storage.delete_media(tmp_file_id)
-
-    logger.info(f"Adding background task for captioned video generation with ID: {output_id}")
-    background_tasks.add_task(bg_task, tmp_file_id=tmp_file_id)
-    logger.info(f"Background task added for captioned video generation with ID: {output_id}")
+        with job.stage("render"):
+            success = builder.execute()
+        if not success:
+            raise RuntimeError("Failed to render captioned video")
+
+    def cleanup(error):
+        for tmp_id in tmp_file_ids:
+            if storage.media_exists(tmp_id):
+                storage.delete_media(tmp_id)
+
+    logger.info(f"Queueing captioned video generation job with ID: {output_id}")
+    job_manager.submit(
+        output_id,
+        [("model", tts_stage), ("ffmpeg", render_stage)],
+        kind="captioned_video",
+        on_finish=cleanup,
+    )
 
     return {
         "file_id": output_id,
@@ -564,7 +743,6 @@ def generate_captioned_video(
 # https://ffmpeg.org/ffmpeg-filters.html#colorkey
 @v1_media_api_router.post("/video-tools/add-colorkey-overlay")
 def add_colorkey_overlay(
-    background_tasks: BackgroundTasks,
     video_id: str = Form(..., description="Video ID to overlay"),
     overlay_video_id: str = Form(..., description="Overlay image ID"),
     color: Optional[str] =  Form(
@@ -599,23 +777,22 @@ def add_colorkey_overlay(
         media_type="video", file_extension=".mp4"
     )
     
-    tmp_file_id = storage.create_tmp_file(output_id)
-    
-    def bg_task():
-        utils = MediaUtils()
-        utils.colorkey_overlay(
-            input_video_path=video_path,
-            overlay_video_path=overlay_video_path,
-            output_video_path=output_path,
-            color=color,
-            similarity=similarity,
-            blend=blend,
-        )
-        storage.delete_media(tmp_file_id)
+    def bg_task(job):
+        utils = MediaUtils(progress_callback=job.set_progress)
+        with job.stage("render"):
+            success = utils.colorkey_overlay(
+                input_video_path=video_path,
+                overlay_video_path=overlay_video_path,
+                output_video_path=output_path,
+                color=color,
+                similarity=similarity,
+                blend=blend,
+            )
+        if not success:
+            raise RuntimeError("Failed to add colorkey overlay")
     
-    logger.info(f"Adding background task for colorkey overlay with ID: {output_id}")
-    background_tasks.add_task(bg_task)
-    logger.info(f"Background task added for colorkey overlay with ID: {output_id}")
+    logger.info(f"Queueing colorkey overlay job with ID: {output_id}")
+    job_manager.submit(output_id, [("ffmpeg", bg_task)], kind="colorkey_overlay")
     
     return {
         "file_id": output_id,
@@ -646,9 +823,16 @@ def extract_frame(
     )
     
     utils = MediaUtils()
-    video_info = utils.get_video_info(video_path)
-    if video_info.get("duration", 0) <= float(timestamp):
-        timestamp = video_info.get("duration", 0) - 0.3
+    try:
+        video_duration = utils.probe(video_path)["duration"]
+    except Exception as e:
+        logger.bind(video_id=video_id, error=str(e)).error("error probing video")
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={"error": "Failed to read the video, it may be corrupted or not a video."},
+        )
+    if video_duration <= float(timestamp):
+        timestamp = video_duration - 0.3
 
     success = utils.extract_frame(
         video_path=video_path,
@@ -692,13 +876,10 @@ def extract_frame_from_url(
     )
     utils = MediaUtils()
     
-    if not length_seconds:
-        video_info = utils.get_video_info(url)
-        length_seconds = video_info.get("duration", 0)
-    
+    # extract_frames probes the duration when it isn't given
     utils.extract_frames(
         video_path=url,
-        length_seconds=length_seconds,
+        length_seconds=length_seconds or None,
         amount=amount,
         output_template=template_path,
     )
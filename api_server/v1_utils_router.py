@@ -1,7 +1,8 @@
 import os
-from fastapi import BackgroundTasks, Form, status, APIRouter
+from fastapi import Form, status, APIRouter
 from fastapi.responses import JSONResponse, StreamingResponse
 from loguru import logger
+from api_server.jobs import job_manager
 from video.storage import Storage
 from youtube_transcript_api import YouTubeTranscriptApi
 
@@ -77,7 +78,6 @@ def stitch_images(
 
 @v1_utils_router.post("/make-image-imperfect")
 def image_unaize(
-    background_tasks: BackgroundTasks,
     image_id: str = Form(..., description="ID of the image to unaize"),
     enhance_color: float = Form(None, description="Strength of the color enhancement (0-2). 0 means black and white, 1 means no change, 2 means full color enhancement"),
     enhance_contrast: float = Form(None, description="Strength of the contrast enhancement (0-2)"),
@@ -97,32 +97,25 @@ def image_unaize(
     jpg_id, jpg_path = storage.create_media_filename_with_id(
         media_type="image", file_extension=".jpg"
     )
-    tmp_file_id = storage.create_tmp_file(jpg_id)
     
     from utils.image import make_image_imperfect
     
-    def bg_task():
-        try:
-            imperfect_image = make_image_imperfect(
-                image_path,
-                enhance_color=enhance_color,
-                enhance_contrast=enhance_contrast,
-                noise_strength=noise_strength
-            )
-            imperfect_image.save(jpg_path, format='JPEG', quality=95)
-        except Exception as e:
-            logger.error(f"Error making image imperfect: {e}")
-        finally:
-            storage.delete_media(tmp_file_id)
+    def bg_task(job):
+        imperfect_image = make_image_imperfect(
+            image_path,
+            enhance_color=enhance_color,
+            enhance_contrast=enhance_contrast,
+            noise_strength=noise_strength
+        )
+        imperfect_image.save(jpg_path, format='JPEG', quality=95)
     
-    background_tasks.add_task(bg_task)
+    job_manager.submit(jpg_id, [("io", bg_task)], kind="make_image_imperfect")
     return {
         "file_id": jpg_id,
     }
 
 @v1_utils_router.post("/convert/pcm/wav")
 def convert_pcm_to_wav(
-    background_tasks: BackgroundTasks,
     pcm_id: str = Form(..., description="ID of the PCM audio file to convert"),
     sample_rate: int = Form(24000, description="Sample rate of the PCM audio"),
     channels: int = Form(1, description="Number of audio channels (1 for mono, 2 for stereo)"),
@@ -143,23 +136,19 @@ def convert_pcm_to_wav(
     wav_id, wav_path = storage.create_media_filename_with_id(
         media_type="audio", file_extension=".wav"
     )
-    tmp_file_id = storage.create_tmp_file(wav_id)
     
-    def bg_task():
-        try:
-            utils.convert_pcm_to_wav(
-                input_pcm_path=storage.get_media_path(pcm_id),
-                output_wav_path=wav_path,
-                sample_rate=sample_rate,
-                channels=channels,
-                target_sample_rate=target_sample_rate
-            )
-        except Exception as e:
-            logger.error(f"Error converting PCM to WAV: {e}")
-        finally:
-            storage.delete_media(tmp_file_id)
+    def bg_task(job):
+        success = utils.convert_pcm_to_wav(
+            input_pcm_path=storage.get_media_path(pcm_id),
+            output_wav_path=wav_path,
+            sample_rate=sample_rate,
+            channels=channels,
+            target_sample_rate=target_sample_rate
+        )
+        if not success:
+            raise RuntimeError("Failed to convert PCM to WAV")
     
-    background_tasks.add_task(bg_task)
+    job_manager.submit(wav_id, [("ffmpeg", bg_task)], kind="convert_pcm_to_wav")
     
     return {
         "file_id": wav_id,
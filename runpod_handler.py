@@ -23,11 +23,11 @@ sys.path.insert(0, '/app')
 from api_server.v1_media_router import v1_media_api_router
 from video.storage import Storage
 from video.stt import STT
-from video.tts import TTS
-from video.tts_chatterbox import TTSChatterbox
+from video.tts import TTS, kokoro_pipelines
+from video.tts_chatterbox import TTSChatterbox, chatterbox_model
 from video.media import MediaUtils
 from video.fonts import FontManager
-from video.config import device
+from video.config import device, chatterbox_preload
 
 # Initialize components
 storage = Storage()
@@ -37,6 +37,11 @@ tts_chatterbox = TTSChatterbox()
 media_utils = MediaUtils()
 font_manager = FontManager()
 
+# Load configured kokoro languages before the first job arrives
+kokoro_pipelines.warmup()
+if chatterbox_preload:
+    chatterbox_model.load()
+
 logger.info(f"RunPod handler initialized with device: {device}")
 
 def create_temp_directory() -> str:
@@ -161,6 +166,7 @@ def generate_chatterbox_tts(parameters: Dict[str, Any], temp_dir: str) -> Dict[s
     exaggeration = parameters.get("exaggeration", 0.5)
     cfg_weight = parameters.get("cfg_weight", 0.5)
     temperature = parameters.get("temperature", 0.8)
+    seed = parameters.get("seed")
     
     # Generate unique filename
     audio_filename = f"chatterbox_tts_{uuid.uuid4().hex}.wav"
@@ -188,12 +194,16 @@ def generate_chatterbox_tts(parameters: Dict[str, Any], temp_dir: str) -> Dict[s
         sample_audio_path=sample_audio_path,
         exaggeration=exaggeration,
         cfg_weight=cfg_weight,
-        temperature=temperature
+        temperature=temperature,
+        seed=seed
     )
     
     # Get audio info
-    audio_info = media_utils.get_audio_info(local_audio_path)
-    audio_length = audio_info.get("duration", 0)
+    try:
+        audio_length = media_utils.probe(local_audio_path)["duration"]
+    except Exception as e:
+        logger.error(f"Failed to read generated audio: {e}")
+        return {"error": "Failed to read the generated audio"}
     
     # Store to persistent storage
     storage_key = f"tts_output/{audio_filename}"
@@ -213,10 +223,11 @@ def get_kokoro_voices(parameters: Dict[str, Any]) -> Dict[str, Any]:
     """Get available Kokoro TTS voices."""
     lang_code = parameters.get("lang_code")
     
-    voices = tts_manager.valid_kokoro_voices(lang_code)
+    from video.voices import LANGUAGE_VOICE_MAP, valid_kokoro_voices
+
+    voices = valid_kokoro_voices(lang_code)
     
     # Get detailed voice information
-    from video.tts import LANGUAGE_VOICE_MAP
     
     voice_details = []
     for voice in voices:
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Benchmark the render speed of VideoBuilder's image background effects.
+
+Usage:
+    python scripts/benchmark_ken_burns.py --seconds 30 --size 1080x1920 --direction zoom-to-center
+
+Renders a generated image over a silent track of the given length once per
+effect and engine, without captions. Render fps is output frames per second
+of wall time, higher is better.
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+EFFECTS = [
+    ("zoompan", {"effect": "ken_burns", "engine": "zoompan"}),
+    ("warp", {"effect": "ken_burns", "engine": "warp"}),
+    ("pan", {"effect": "pan"}),
+    ("none", {"effect": "none"}),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=30, help="Length of the rendered video")
+    parser.add_argument("--size", default="1080x1920", help="Output dimensions, WIDTHxHEIGHT")
+    parser.add_argument("--direction", default="zoom-to-center", help="Ken Burns zoom direction")
+    parser.add_argument("--zoom-factor", type=float, default=0.001, help="Ken Burns zoom per frame")
+    parser.add_argument("--image", default=None, help="Background image, generated when omitted")
+    args = parser.parse_args()
+
+    from loguru import logger
+    from PIL import Image
+    from video.builder import IMAGE_BACKGROUND_FPS, VideoBuilder
+    from video.config import num_cores
+    from video.media import MediaUtils
+
+    logger.remove()
+    width, height = (int(v) for v in args.size.split("x"))
+    work_dir = tempfile.mkdtemp(prefix="ken-burns-benchmark-")
+
+    try:
+        image_path = args.image
+        if not image_path:
+            # a gradient with fine detail, so motion artifacts would show
+            image_path = os.path.join(work_dir, "background.png")
+            Image.radial_gradient("L").resize((width, height)).convert("RGB").effect_spread(4).save(image_path)
+        audio_path = os.path.join(work_dir, "audio.wav")
+        subprocess.run(
+            [
+                "ffmpeg", "-y", "-v", "error",
+                "-f", "lavfi", "-i", f"anullsrc=r=24000:cl=mono:d={args.seconds}",
+                audio_path,
+            ],
+            check=True,
+        )
+
+        frames = int(args.seconds * IMAGE_BACKGROUND_FPS)
+        print(f"🎞️ {width}x{height}, {args.seconds:g}s ({frames} frames), CPU cores: {num_cores}")
+        print(f"{'effect':>10} {'time (s)':>10} {'render fps':>11} {'ok':>4}")
+
+        for label, effect_config in EFFECTS:
+            effect_config = {
+                **effect_config,
+                "direction": args.direction,
+                "zoom_factor": args.zoom_factor,
+            }
+            if effect_config["effect"] == "pan":
+                effect_config["direction"] = "left-to-right"
+
+            builder = VideoBuilder(dimensions=(width, height))
+            builder.set_media_utils(MediaUtils())
+            builder.set_segments(1)
+            builder.set_background_image(image_path, effect_config=effect_config)
+            builder.set_audio(audio_path)
+            builder.set_output_path(os.path.join(work_dir, f"{label}.mp4"))
+
+            start = time.time()
+            ok = builder.execute()
+            elapsed = time.time() - start
+            print(f"{label:>10} {elapsed:>10.2f} {frames / elapsed:>11.1f} {'✓' if ok else '✗':>4}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Benchmark merge_videos with parallel clip normalization against the single
+filter-graph merge.
+
+Usage:
+    python scripts/benchmark_merge_parallel.py --clips 10,50,100 --workers 1,4,8
+
+Test clips are generated with ffmpeg: every other clip has a different size
+and frame rate than the first one, so half of them need re-encoding. CPU
+utilization is the CPU time of the ffmpeg processes divided by wall time
+times the number of cores.
+"""
+import argparse
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def generate_clip(path: str, index: int, seconds: float):
+    size, rate = ("720x1280", 30) if index % 2 == 0 else ("540x960", 25)
+    subprocess.run(
+        [
+            "ffmpeg", "-y", "-v", "error",
+            "-f", "lavfi", "-i", f"testsrc2=size={size}:rate={rate}:duration={seconds}",
+            "-f", "lavfi", "-i", f"sine=frequency={220 + index * 10}:duration={seconds}",
+            "-c:v", "libx264", "-preset", "veryfast", "-profile:v", "high", "-pix_fmt", "yuv420p",
+            "-c:a", "aac", "-ar", "48000", "-ac", "2", "-shortest", path,
+        ],
+        check=True,
+    )
+
+
+def children_cpu_time() -> float:
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clips", default="10,50,100", help="Comma-separated clip counts")
+    parser.add_argument("--workers", default="1,4", help="Comma-separated normalization worker counts")
+    parser.add_argument("--seconds", type=float, default=3, help="Length of each test clip")
+    parser.add_argument("--skip-filter-graph", action="store_true", help="Don't run the single filter-graph merge")
+    args = parser.parse_args()
+
+    from loguru import logger
+    from video.config import num_cores
+    from video.media import MediaUtils
+
+    logger.remove()
+    media_utils = MediaUtils()
+    work_dir = tempfile.mkdtemp(prefix="merge-benchmark-")
+    clip_counts = [int(c) for c in args.clips.split(",")]
+
+    print(f"🎬 Clips of {args.seconds:g}s, half of them mismatched, CPU cores: {num_cores}")
+    print(f"{'clips':>6} {'mode':>14} {'time (s)':>10} {'cpu (s)':>10} {'cpu util':>9} {'ok':>4}")
+
+    try:
+        clips = []
+        for clip_count in clip_counts:
+            while len(clips) < clip_count:
+                path = os.path.join(work_dir, f"clip_{len(clips):04d}.mp4")
+                generate_clip(path, len(clips), args.seconds)
+                clips.append(path)
+
+            modes = [] if args.skip_filter_graph else [("filter graph", False, 1)]
+            modes += [(f"concat x{w}", True, w) for w in (int(w) for w in args.workers.split(","))]
+            for label, stream_copy, workers in modes:
+                output_path = os.path.join(work_dir, "merged.mp4")
+                cpu_start = children_cpu_time()
+                start = time.time()
+                ok = media_utils.merge_videos(
+                    clips[:clip_count],
+                    output_path,
+                    stream_copy=stream_copy,
+                    normalize_workers=workers,
+                )
+                elapsed = time.time() - start
+                cpu = children_cpu_time() - cpu_start
+                utilization = cpu / (elapsed * num_cores)
+                print(f"{clip_count:>6} {label:>14} {elapsed:>10.2f} {cpu:>10.2f} {utilization:>8.0%} {'✓' if ok else '✗':>4}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Benchmark chunked parallel transcription against the single model path on CPU.
+
+Usage:
+    python scripts/benchmark_stt_parallel.py audio.wav --workers 2,4,8 --chunk-seconds 300
+
+The real-time factor (RTF) is processing time divided by audio duration,
+lower is better. The transcription cache is bypassed for every run.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("audio_path", help="Long audio file to transcribe")
+    parser.add_argument("--workers", default="2,4", help="Comma-separated worker counts")
+    parser.add_argument("--chunk-seconds", type=float, default=300, help="Target chunk length in seconds")
+    parser.add_argument("--language", default=None, help="Language code, detected when omitted")
+    args = parser.parse_args()
+
+    from video.config import num_cores, whisper_model, whisper_compute_type
+    from video.stt import STT
+    from video.process_pools import get_process_pool, shutdown_process_pools
+    from video.stt_workers import init_worker
+
+    stt = STT()
+    print(f"🎙️ Model: {whisper_model} ({whisper_compute_type}), CPU cores: {num_cores}")
+    print(f"{'mode':>12} {'time (s)':>10} {'audio (s)':>10} {'RTF':>8} {'words':>8}")
+
+    start = time.time()
+    captions, duration = stt.transcribe(args.audio_path, language=args.language, batch_size=0, use_cache=False)
+    elapsed = time.time() - start
+    print(f"{'single':>12} {elapsed:>10.2f} {duration:>10.2f} {elapsed / duration:>8.3f} {len(captions):>8}")
+
+    for workers in [int(w) for w in args.workers.split(",")]:
+        # start the workers so model loading isn't measured
+        pool = get_process_pool(init_worker, workers, num_cores)
+        for future in [pool.submit(time.sleep, 0) for _ in range(workers)]:
+            future.result()
+
+        start = time.time()
+        captions, duration = stt.transcribe_parallel(
+            args.audio_path,
+            language=args.language,
+            workers=workers,
+            chunk_seconds=args.chunk_seconds,
+            use_cache=False,
+        )
+        elapsed = time.time() - start
+        label = f"parallel x{workers}"
+        print(f"{label:>12} {elapsed:>10.2f} {duration:>10.2f} {elapsed / duration:>8.3f} {len(captions):>8}")
+
+    shutdown_process_pools()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Benchmark sharded kokoro TTS on CPU: real-time factor vs. worker count.
+
+Usage:
+    python scripts/benchmark_tts_workers.py --workers 1,2,4,8 --repeat 20
+
+The real-time factor (RTF) is processing time divided by audio duration,
+lower is better. Workers=1 runs the regular single process path.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SAMPLE_TEXT = (
+    "The quick brown fox jumps over the lazy dog. "
+    "Artificial intelligence is changing how we create videos. "
+    "Each sentence in this benchmark is synthesized and stitched back together. "
+    "Short sentences keep the matrix operations small, which is where a single process wastes cores. "
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", default="1,2,4", help="Comma-separated worker counts")
+    parser.add_argument("--repeat", type=int, default=20, help="Times the sample text is repeated")
+    parser.add_argument("--voice", default="af_heart", help="Kokoro voice")
+    args = parser.parse_args()
+
+    from video.config import num_cores
+    from video.tts import TTS
+    from video.process_pools import shutdown_process_pools
+
+    tts = TTS()
+    text = SAMPLE_TEXT * args.repeat
+    print(f"📝 Text length: {len(text)} chars, CPU cores: {num_cores}")
+    print(f"{'workers':>8} {'time (s)':>10} {'audio (s)':>10} {'RTF':>8}")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        output_path = os.path.join(temp_dir, "benchmark.wav")
+        for workers in [int(w) for w in args.workers.split(",")]:
+            # warm up the pipelines so model loading isn't measured
+            warmup_text = " ".join(["Warm up."] * workers)
+            if workers > 1:
+                tts.kokoro_sharded(warmup_text, output_path, args.voice, workers=workers)
+            else:
+                tts.kokoro(warmup_text, output_path, args.voice, use_cache=False)
+            start = time.time()
+            if workers > 1:
+                _, duration = tts.kokoro_sharded(text, output_path, args.voice, workers=workers)
+            else:
+                _, duration = tts.kokoro(text, output_path, args.voice, use_cache=False)
+            elapsed = time.time() - start
+            print(f"{workers:>8} {elapsed:>10.2f} {duration:>10.2f} {elapsed / duration:>8.3f}")
+
+    shutdown_process_pools()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,17 @@
 import asyncio
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, APIRouter
+from fastapi import FastAPI, APIRouter, Request, status
+from fastapi.responses import JSONResponse
 import sys
 from loguru import logger
 
 from api_server.auth_middleware import auth_middleware
+from api_server.jobs import QueueFullError
+from api_server.v1_jobs_router import v1_jobs_router
 from api_server.v1_utils_router import v1_utils_router
 from api_server.v1_media_router import v1_media_api_router
-from video.config import device
+from video.config import preload_models
+from video.models import models
 
 logger.remove()
 logger.add(
@@ -19,20 +23,43 @@ logger.add(
 
 logger.info("This server was created by the 'AI Agents A-Z' YouTube channel")
 logger.info("https://www.youtube.com/@aiagentsaz")
-logger.info("Using device: {}", device)
+
+# set once the models in PRELOAD_MODELS have been loaded (or failed to)
+preload_done = asyncio.Event()
+
+
+async def preload():
+    if preload_models:
+        logger.info("Preloading models: {}", preload_models)
+        await asyncio.to_thread(models.warmup, preload_models)
+    preload_done.set()
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("Starting up the server...")
+    # load models in the background so the server accepts requests (and
+    # answers /health) right away; /ready reports when preloading is done
+    preload_task = asyncio.create_task(preload())
     yield
+    preload_task.cancel()
     logger.info("Shutting down the server...")
 
 app = FastAPI(lifespan=lifespan)
 
 
-# add middleware to app, besides the /health endpoint
+# add middleware to app, besides the /health and /ready endpoints
 app.middleware("http")(auth_middleware)
 
+
+@app.exception_handler(QueueFullError)
+async def queue_full_handler(request: Request, exc: QueueFullError):
+    return JSONResponse(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        content={"error": str(exc)},
+        headers={"Retry-After": "10"},
+    )
+
 @app.api_route("/", methods=["GET", "HEAD"])
 def root():
     return {
@@ -46,6 +73,17 @@ def root():
 def healthcheck():
     return {"status": "ok"}
 
+@app.api_route("/ready", methods=["GET", "HEAD"])
+def readiness():
+    model_status = models.status()
+    ready = preload_done.is_set() and all(
+        model_status.get(name) == "loaded" for name in preload_models if name in model_status
+    )
+    return JSONResponse(
+        status_code=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"status": "ready" if ready else "loading", "models": model_status},
+    )
+
 api_router = APIRouter()
 v1_api_router = APIRouter()
 
@@ -67,6 +105,7 @@ and response formatting.
 # Include routers for API functionality
 v1_api_router.include_router(v1_media_api_router, prefix="/v1/media")
 v1_api_router.include_router(v1_utils_router, prefix="/v1/utils")
+v1_api_router.include_router(v1_jobs_router, prefix="/v1/jobs")
 api_router.include_router(v1_api_router, prefix="/api")
 app.include_router(api_router)
 
@@ -0,0 +1,12 @@
+import os
+import sys
+import tempfile
+
+# the modules create their caches, job database and storage at import, keep
+# them out of the working tree
+_tmp_dir = tempfile.mkdtemp(prefix="ai-agent-tools-tests-")
+os.environ.setdefault("CACHE_PATH", os.path.join(_tmp_dir, "cache"))
+os.environ.setdefault("STORAGE_PATH", os.path.join(_tmp_dir, "media"))
+os.environ.setdefault("JOB_DB_PATH", os.path.join(_tmp_dir, "jobs.sqlite"))
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,236 @@
+import re
+
+import pytest
+
+from video import builder as builder_module
+from video.builder import IMAGE_BACKGROUND_FPS, STILL_LOOP_SECONDS, VideoBuilder
+
+ASS_HEADER = """[Script Info]
+ScriptType: v4.00+
+
+[Events]
+Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
+"""
+
+
+def write_subtitles(path, cues) -> str:
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(ASS_HEADER)
+        for start, end in cues:
+            f.write(f"Dialogue: 0,{start},{end},Default,,0,0,0,,Hello, world\n")
+    return str(path)
+
+
+class FakeMediaUtils:
+    """Records the ffmpeg commands of a build and creates their output files."""
+
+    def __init__(self, duration: float, video: dict = None):
+        self.duration = duration
+        self.video = video
+        self.commands = []
+
+    def probe(self, path):
+        return {"duration": self.duration, "video": self.video}
+
+    def write_concat_list(self, paths, work_dir):
+        return f"{work_dir}/concat.txt"
+
+    def execute_ffmpeg_command(self, cmd, description, **kwargs):
+        self.commands.append(description)
+        open(cmd[-1], "wb").close()
+        return True
+
+
+@pytest.mark.parametrize(
+    "cues, loops, expected",
+    [
+        # empty subtitles
+        ([], 5, []),
+        # a cue ending exactly on a loop boundary doesn't reach the next loop
+        ([("0:00:00.50", "0:00:02.00")], 5, [(0, 1)]),
+        ([("0:00:02.00", "0:00:04.00")], 5, [(1, 1)]),
+        # adjacent cues merge into one run
+        ([("0:00:00.50", "0:00:01.50"), ("0:00:02.50", "0:00:03.50")], 5, [(0, 2)]),
+        ([("0:00:00.00", "0:00:02.00"), ("0:00:02.00", "0:00:04.00")], 5, [(0, 2)]),
+        # a loop without text splits the runs
+        ([("0:00:00.50", "0:00:01.50"), ("0:00:04.50", "0:00:05.00")], 5, [(0, 1), (2, 1)]),
+        # empty cues and cues past the timeline
+        ([("0:00:03.00", "0:00:03.00")], 5, []),
+        ([("0:00:08.00", "0:00:30.00")], 5, [(4, 1)]),
+    ],
+)
+def test_caption_runs(tmp_path, cues, loops, expected):
+    builder = VideoBuilder(dimensions=(1080, 1920))
+    builder.set_captions(file_path=write_subtitles(tmp_path / "captions.ass", cues))
+
+    assert builder.caption_runs(loops) == expected
+
+
+def test_caption_runs_without_captions():
+    assert VideoBuilder(dimensions=(1080, 1920)).caption_runs(5) == []
+
+
+@pytest.mark.parametrize(
+    "cues, expected_share, expected_commands",
+    [
+        # captions on one loop of five: the still loop is reused
+        (
+            [("0:00:00.50", "0:00:01.50")],
+            0.2,
+            ["encode still loop", "build caption segment 0", "join still background"],
+        ),
+        # captions nearly everywhere: one pass is as fast
+        ([("0:00:00.50", "0:00:09.00")], 1.0, ["build video"]),
+    ],
+)
+def test_still_background_falls_back_to_single_pass(tmp_path, cues, expected_share, expected_commands):
+    image_path = tmp_path / "background.png"
+    image_path.write_bytes(b"not decoded by the fake")
+    duration = 5 * STILL_LOOP_SECONDS
+    media_utils = FakeMediaUtils(duration)
+
+    builder = VideoBuilder(dimensions=(1080, 1920))
+    builder.set_media_utils(media_utils)
+    builder.set_segments(1)
+    builder.set_background_image(str(image_path), effect_config={"effect": "none"})
+    builder.set_audio(str(tmp_path / "audio.wav"))
+    builder.set_captions(file_path=write_subtitles(tmp_path / "captions.ass", cues))
+    builder.set_output_path(str(tmp_path / "output.mp4"))
+
+    assert builder.captioned_share(duration) == pytest.approx(expected_share)
+    assert builder.execute()
+    assert media_utils.commands == expected_commands
+
+
+@pytest.mark.parametrize(
+    "duration, segments, expected",
+    [
+        # too short to split
+        (45.0, 4, [(0.0, 45.0)]),
+        (120.0, 1, [(0.0, 120.0)]),
+        # ranges start on keyframe interval multiples
+        (120.0, 4, [(0.0, 30), (30.0, 30), (60.0, 30), (90.0, 30.0)]),
+        (100.0, 3, [(0.0, 34), (34.0, 34), (68.0, 32.0)]),
+        # the last range takes the remainder instead of leaving a sliver
+        (121.5, 4, [(0.0, 32), (32.0, 32), (64.0, 32), (96.0, 25.5)]),
+        # more segments than the timeline has room for
+        (65.0, 100, [(0.0, 34), (34.0, 31.0)]),
+    ],
+)
+def test_segment_ranges(duration, segments, expected):
+    builder = VideoBuilder(dimensions=(1080, 1920)).set_segments(segments)
+    ranges = builder.segment_ranges(duration)
+
+    assert ranges == expected
+    assert ranges[0][0] == 0
+    assert sum(length for _, length in ranges) == pytest.approx(duration)
+    for (start, length), (next_start, _) in zip(ranges, ranges[1:]):
+        assert start + length == next_start
+    # every seam is on a whole frame at integer frame rates
+    for start, _ in ranges:
+        for fps in (24, 25, 30, 60):
+            assert (start * fps).is_integer()
+
+
+def test_segment_ranges_with_more_segments_than_frames(monkeypatch):
+    monkeypatch.setattr(builder_module, "render_segment_min_seconds", 0.01)
+    builder = VideoBuilder(dimensions=(1080, 1920)).set_segments(100)
+
+    # 5 frames at 25 fps
+    assert builder.segment_ranges(0.2) == [(0.0, 0.2)]
+    assert builder.segment_ranges(5.0) == [(0.0, 2), (2.0, 3.0)]
+
+
+def image_builder(tmp_path, duration: float, effect_config: dict) -> VideoBuilder:
+    builder = VideoBuilder(dimensions=(1080, 1920))
+    builder.set_media_utils(FakeMediaUtils(duration))
+    builder.set_background_image(str(tmp_path / "background.png"), effect_config=effect_config)
+    builder.set_audio(str(tmp_path / "audio.wav"))
+    return builder
+
+
+def filter_complex(cmd: list) -> str:
+    return cmd[cmd.index("-filter_complex") + 1]
+
+
+def segment_frames(builder: VideoBuilder, ranges: list, frame_value) -> list:
+    """Evaluates a per-frame value of every segment's command, in timeline order."""
+    values = []
+    for start, duration in ranges:
+        cmd = builder.build_command(start=start, duration=duration, output_path="segment.mp4")
+        frames = round(duration * IMAGE_BACKGROUND_FPS)
+        values.extend(frame_value(filter_complex(cmd), frame) for frame in range(frames))
+    return values
+
+
+def test_segment_zoom_continues_the_single_pass_zoom(tmp_path):
+    zoom_factor = 0.0015
+    builder = image_builder(
+        tmp_path,
+        duration=10.0,
+        effect_config={"effect": "ken_burns", "engine": "zoompan", "zoom_factor": zoom_factor},
+    )
+    assert f"z='zoom+{zoom_factor}'" in filter_complex(builder.build_command())
+
+    def zoom(graph, frame):
+        factor, offset = re.search(r"z='1\+([\d.e-]+)\*\(on\+(\d+)\)'", graph).groups()
+        return 1 + float(factor) * (frame + int(offset))
+
+    # zoompan's z='zoom+factor' over the whole timeline, zoom starting at 1
+    expected = []
+    previous = 1.0
+    for _ in range(round(10.0 * IMAGE_BACKGROUND_FPS)):
+        previous += zoom_factor
+        expected.append(previous)
+
+    zooms = segment_frames(builder, [(0.0, 4.0), (4.0, 2.0), (6.0, 4.0)], zoom)
+    assert zooms == pytest.approx(expected)
+
+
+def test_segment_pan_continues_the_single_pass_pan(tmp_path):
+    builder = image_builder(
+        tmp_path,
+        duration=10.0,
+        effect_config={"effect": "pan", "direction": "left-to-right", "speed": "fast"},
+    )
+
+    def crop_position(graph, t):
+        x, y = re.search(r"crop=1080:1920:([^:]+):([^\[]+)\[bg\]", graph).groups()
+        return [eval(x, {"t": t}), eval(y, {"t": t})]
+
+    single_pass = filter_complex(builder.build_command())
+    expected = [
+        value
+        for frame in range(round(10.0 * IMAGE_BACKGROUND_FPS))
+        for value in crop_position(single_pass, frame / IMAGE_BACKGROUND_FPS)
+    ]
+
+    positions = segment_frames(
+        builder,
+        [(0.0, 4.0), (4.0, 2.0), (6.0, 4.0)],
+        lambda graph, frame: crop_position(graph, frame / IMAGE_BACKGROUND_FPS),
+    )
+    assert [value for position in positions for value in position] == pytest.approx(expected)
+
+
+def test_segment_subtitles_use_timeline_time(tmp_path):
+    builder = image_builder(tmp_path, duration=10.0, effect_config={"effect": "none"})
+    builder.set_captions(file_path=write_subtitles(tmp_path / "captions.ass", []))
+
+    cmd = builder.build_command(start=6.0, duration=4.0, output_path="segment.mp4")
+    assert "setpts=PTS+6.0/TB,subtitles=" in filter_complex(cmd)
+    assert filter_complex(cmd).endswith("setpts=PTS-6.0/TB[v]")
+    assert cmd[cmd.index("-t", cmd.index("-force_key_frames")) + 1] == "4.0"
+
+
+def test_segment_video_background_runs_at_an_integer_frame_rate(tmp_path):
+    builder = VideoBuilder(dimensions=(1080, 1920))
+    builder.set_media_utils(FakeMediaUtils(10.0, video={"fps": 30000 / 1001}))
+    builder.set_background_video(str(tmp_path / "background.mp4"))
+    builder.set_audio(str(tmp_path / "audio.wav"))
+
+    segment = builder.build_command(start=4.0, duration=2.0, output_path="segment.mp4")
+    assert filter_complex(segment).startswith("[0]scale=1080:1920,fps=30[bg]")
+    assert segment[segment.index("-ss") + 1] == "4.0"
+    # the single pass keeps the background frame rate
+    assert "fps=" not in filter_complex(builder.build_command())
@@ -0,0 +1,146 @@
+import os
+import socket
+import sqlite3
+import subprocess
+import sys
+
+import pytest
+
+from api_server import v1_media_router
+from api_server.job_registry import (
+    COMPLETED,
+    FAILED,
+    QUEUED,
+    RUNNING,
+    JobRegistry,
+    current_owner,
+    owner_alive,
+)
+
+
+def dead_pid() -> int:
+    """Returns the pid of a process that has exited."""
+    result = subprocess.run(
+        [sys.executable, "-c", "import os; print(os.getpid())"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return int(result.stdout)
+
+
+def insert_job(db_path: str, job_id: str, state: str, owner):
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(
+            "INSERT INTO jobs (id, state, created_at, owner) VALUES (?, ?, 0, ?)",
+            (job_id, state, owner),
+        )
+
+
+def test_owner_alive():
+    host = socket.gethostname()
+    pid = os.getpid()
+    assert owner_alive(current_owner())
+    # same pid, but an earlier process
+    assert not owner_alive(f"{host}:{pid}:0")
+    assert not owner_alive(f"{host}:{dead_pid()}:1")
+    # other hosts can't be checked
+    assert owner_alive(f"other-{host}:{pid}:0")
+    assert not owner_alive(None)
+    assert not owner_alive("garbage")
+
+
+def test_orphaned_jobs_are_failed_on_startup(tmp_path):
+    db_path = str(tmp_path / "jobs.sqlite")
+    host = socket.gethostname()
+    JobRegistry(db_path)
+    insert_job(db_path, "live", RUNNING, current_owner())
+    insert_job(db_path, "dead", RUNNING, f"{host}:{dead_pid()}:1")
+    insert_job(db_path, "reused-pid", QUEUED, f"{host}:{os.getpid()}:0")
+    insert_job(db_path, "other-host", RUNNING, f"other-{host}:1:1")
+    insert_job(db_path, "legacy", QUEUED, None)
+    insert_job(db_path, "done", COMPLETED, f"{host}:{dead_pid()}:1")
+
+    registry = JobRegistry(db_path)
+
+    states = {
+        job_id: registry.get(job_id)["state"]
+        for job_id in ("live", "dead", "reused-pid", "other-host", "legacy", "done")
+    }
+    assert states == {
+        "live": RUNNING,
+        "dead": FAILED,
+        "reused-pid": FAILED,
+        "other-host": RUNNING,
+        "legacy": FAILED,
+        "done": COMPLETED,
+    }
+    assert registry.get("dead")["error"] == "interrupted by server restart"
+
+
+def test_owner_column_is_added_to_old_databases(tmp_path):
+    db_path = str(tmp_path / "jobs.sqlite")
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(
+            """
+            CREATE TABLE jobs (
+                id TEXT PRIMARY KEY,
+                kind TEXT,
+                state TEXT NOT NULL,
+                progress REAL NOT NULL DEFAULT 0,
+                stage TEXT,
+                stages TEXT NOT NULL DEFAULT '{}',
+                error TEXT,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL
+            )
+            """
+        )
+        conn.execute("INSERT INTO jobs (id, state, created_at) VALUES ('old', 'running', 0)")
+
+    registry = JobRegistry(db_path)
+    assert registry.get("old")["state"] == FAILED
+    registry.create("new")
+    with sqlite3.connect(db_path) as conn:
+        owner = conn.execute("SELECT owner FROM jobs WHERE id = 'new'").fetchone()[0]
+    assert owner == current_owner()
+
+
+@pytest.fixture
+def file_status(tmp_path, monkeypatch):
+    registry = JobRegistry(str(tmp_path / "jobs.sqlite"))
+    monkeypatch.setattr(v1_media_router, "job_registry", registry)
+    return registry, v1_media_router.storage, v1_media_router.file_status
+
+
+def test_file_status_reads_the_registry(file_status):
+    registry, storage, status = file_status
+    file_id, _ = storage.create_media_filename_with_id(media_type="video", file_extension=".mp4")
+
+    registry.create(file_id, "merge_videos")
+    assert status(file_id) == {"status": "processing", "progress": 0.0, "stage": None}
+
+    registry.start(file_id)
+    registry.set_stage(file_id, "render")
+    registry.set_progress(file_id, 25)
+    assert status(file_id) == {"status": "processing", "progress": 25, "stage": "render"}
+
+    registry.finish(file_id, RuntimeError("ffmpeg failed"))
+    assert status(file_id) == {"status": "failed", "error": "ffmpeg failed"}
+
+
+def test_file_status_ignores_tmp_markers(file_status):
+    registry, storage, status = file_status
+    file_id, path = storage.create_media_filename_with_id(media_type="video", file_extension=".mp4")
+    # markers written by the old background tasks no longer mean processing
+    open(storage.get_media_path(storage.create_tmp_file_id(file_id)), "w").close()
+    assert status(file_id) == {"status": "not_found"}
+
+    open(path, "w").close()
+    assert status(file_id) == {"status": "ready"}
+
+    registry.create(file_id)
+    registry.finish(file_id)
+    assert registry.get(file_id)["state"] == COMPLETED
+    assert status(file_id) == {"status": "ready"}
@@ -0,0 +1,147 @@
+import threading
+import time
+
+import pytest
+
+from api_server.job_registry import COMPLETED, RUNNING, JobRegistry
+from api_server.jobs import JobManager, QueueFullError
+
+
+def wait_for(predicate, timeout: float = 5.0):
+    deadline = time.time() + timeout
+    while not predicate():
+        if time.time() > deadline:
+            raise AssertionError("timed out waiting for the job pool")
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def registry(tmp_path):
+    return JobRegistry(str(tmp_path / "jobs.sqlite"))
+
+
+@pytest.fixture
+def blocked_manager(registry):
+    """A manager with one model worker, held busy by a running job until released."""
+    manager = JobManager({"model": 1}, max_depth=2, registry=registry)
+    release = threading.Event()
+    manager.submit("blocker", [("model", lambda job: release.wait(5))])
+    wait_for(lambda: manager.pool("model").stats()["running"] == 1)
+    yield manager, release
+    release.set()
+
+
+def test_submit_raises_queue_full_at_max_depth(blocked_manager, registry):
+    manager, release = blocked_manager
+    rejected = []
+    manager.submit("queued-1", [("model", lambda job: None)])
+    manager.submit("queued-2", [("model", lambda job: None)])
+
+    with pytest.raises(QueueFullError) as excinfo:
+        manager.submit("rejected", [("model", lambda job: None)], on_finish=rejected.append)
+
+    assert excinfo.value.resource == "model"
+    assert excinfo.value.depth == 2
+    assert rejected == [excinfo.value]
+    # rejected jobs leave no record behind
+    assert registry.get("rejected") is None
+    assert manager.pool("model").stats()["rejected"] == 1
+
+
+def test_follow_up_stages_are_not_rejected(blocked_manager, registry):
+    manager, release = blocked_manager
+    finished = threading.Event()
+    manager.submit(
+        "two-stages",
+        [("model", lambda job: None), ("model", lambda job: None)],
+        on_finish=lambda error: finished.set(),
+    )
+    manager.submit("queued", [("model", lambda job: None)])
+
+    release.set()
+    assert finished.wait(5)
+    assert registry.get("two-stages")["state"] == COMPLETED
+
+
+@pytest.mark.parametrize(
+    "priorities, expected",
+    [
+        ([0, 0, 0], ["job-0", "job-1", "job-2"]),
+        ([5, 0, 5, 0], ["job-1", "job-3", "job-0", "job-2"]),
+        ([2, 1, 0], ["job-2", "job-1", "job-0"]),
+    ],
+)
+def test_jobs_run_by_priority_then_fifo(registry, priorities, expected):
+    manager = JobManager({"model": 1}, max_depth=len(priorities), registry=registry)
+    release = threading.Event()
+    order = []
+    manager.submit("blocker", [("model", lambda job: release.wait(5))])
+    wait_for(lambda: manager.pool("model").stats()["running"] == 1)
+
+    for i, priority in enumerate(priorities):
+        manager.submit(
+            f"job-{i}",
+            [("model", lambda job: order.append(job.job_id))],
+            priority=priority,
+        )
+    release.set()
+
+    wait_for(lambda: len(order) == len(priorities))
+    assert order == expected
+
+
+def test_stage_progress_and_timing_are_persisted(registry, tmp_path):
+    manager = JobManager({"model": 1}, registry=registry)
+    in_stage = threading.Event()
+    release = threading.Event()
+    finished = threading.Event()
+
+    def tts(job):
+        job.set_progress(40)
+        with job.stage("tts"):
+            in_stage.set()
+            release.wait(5)
+            time.sleep(0.05)
+
+    manager.submit("job", [("model", tts)], kind="kokoro_tts", on_finish=lambda error: finished.set())
+    assert in_stage.wait(5)
+
+    # a second registry reads the database, not the memory of the first one
+    reader = JobRegistry(str(tmp_path / "jobs.sqlite"))
+    job = reader.get("job")
+    assert job["state"] == RUNNING
+    assert job["kind"] == "kokoro_tts"
+    assert job["stage"] == "tts"
+    assert job["progress"] == 40
+
+    release.set()
+    assert finished.wait(5)
+    job = reader.get("job")
+    assert job["state"] == COMPLETED
+    assert job["progress"] == 100
+    assert job["stage"] is None
+    assert job["stages"]["tts"] >= 0.05
+    assert job["started_at"] <= job["finished_at"]
+
+
+def test_failing_stage_ends_the_job(registry):
+    manager = JobManager({"model": 1, "ffmpeg": 1}, registry=registry)
+    finished = []
+    done = threading.Event()
+    render = []
+
+    def tts(job):
+        raise RuntimeError("no voice")
+
+    manager.submit(
+        "job",
+        [("model", tts), ("ffmpeg", render.append)],
+        on_finish=lambda error: (finished.append(error), done.set()),
+    )
+
+    assert done.wait(5)
+    assert render == []
+    assert str(finished[0]) == "no voice"
+    job = registry.get("job")
+    assert job["state"] == "failed"
+    assert job["error"] == "no voice"
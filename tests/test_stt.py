@@ -0,0 +1,214 @@
+import pytest
+
+from video import stt
+from video.stt import STT
+
+
+def speech(*ranges):
+    return [{"start": start, "end": end} for start, end in ranges]
+
+
+@pytest.mark.parametrize(
+    "segments, audio_length, chunk_samples, expected",
+    [
+        # no silence found: one chunk covering everything
+        ([], 1000, 250, [(0, 1000)]),
+        (speech((0, 1000)), 1000, 250, [(0, 1000)]),
+        # everything fits one chunk
+        (speech((0, 100), (200, 300)), 400, 1000, [(0, 400)]),
+        # cuts in the middle of the pause before the overflowing segment
+        (
+            speech((0, 100), (200, 300), (400, 500)),
+            600,
+            250,
+            [(0, 150), (150, 350), (350, 600)],
+        ),
+        # a segment longer than a chunk isn't cut
+        (speech((0, 100), (120, 900)), 1000, 250, [(0, 110), (110, 1000)]),
+        (speech((0, 900)), 1000, 250, [(0, 1000)]),
+        # empty audio
+        ([], 0, 250, []),
+    ],
+)
+def test_split_at_silences(monkeypatch, segments, audio_length, chunk_samples, expected):
+    monkeypatch.setattr(stt, "get_speech_timestamps", lambda audio, options: segments)
+    chunks = STT.split_at_silences([0.0] * audio_length, chunk_samples)
+
+    assert chunks == expected
+    # the chunks cover the audio without gaps
+    assert all(end == start for (_, end), (start, _) in zip(chunks, chunks[1:]))
+
+
+def word(text, start_ts, end_ts):
+    return {"text": text, "start_ts": start_ts, "end_ts": end_ts}
+
+
+@pytest.mark.parametrize(
+    "previous, current, duplicate",
+    [
+        # decoded again by the next chunk, ending before the previous word
+        (word(" world", 9.5, 10.0), word(" hello", 9.0, 9.4), True),
+        # the same word on both sides of the seam
+        (word(" world", 9.5, 10.0), word(" world", 9.6, 10.2), True),
+        (word(" World", 9.5, 10.0), word("world ", 9.6, 10.2), True),
+        # a seam inside a word: both halves are kept
+        (word(" some", 9.8, 10.0), word("thing", 9.9, 10.3), False),
+        # a word said twice in a row, touching within the tolerance
+        (word(" the", 9.8, 10.0), word(" the", 9.97, 10.2), False),
+        # the next word of the transcript
+        (word(" hello", 9.0, 9.4), word(" world", 9.5, 10.0), False),
+    ],
+)
+def test_is_seam_duplicate(previous, current, duplicate):
+    assert STT.is_seam_duplicate(previous, current) is duplicate
+
+
+@pytest.mark.parametrize(
+    "segment, expected",
+    [
+        # empty transcript
+        (word("", 0.0, 1.0), [word("", 0.0, 1.0)]),
+        (word("   ", 0.0, 1.0), [word("   ", 0.0, 1.0)]),
+        (word(" hello", 0.0, 1.0), [word(" hello", 0.0, 1.0)]),
+        # durations proportional to the word length
+        (
+            word("ab abcd  ab", 1.0, 2.6),
+            [word(" ab", 1.0, 1.4), word(" abcd", 1.4, 2.2), word(" ab", 2.2, 2.6)],
+        ),
+    ],
+)
+def test_distribute_words(segment, expected):
+    words = STT.distribute_words(segment)
+
+    assert [w["text"] for w in words] == [w["text"] for w in expected]
+    for actual, wanted in zip(words, expected):
+        assert actual["start_ts"] == pytest.approx(wanted["start_ts"])
+        assert actual["end_ts"] == pytest.approx(wanted["end_ts"])
+
+
+@pytest.mark.parametrize(
+    "segments, expected",
+    [
+        ([], []),
+        # one sentence split into several pipeline results
+        (
+            [word("Hola mundo.", 0.0, 1.0), word("Hola mundo.", 1.0, 1.8), word(" Adiós.", 1.8, 2.5)],
+            [word("Hola mundo.", 0.0, 1.8), word(" Adiós.", 1.8, 2.5)],
+        ),
+        # the same sentence said twice, apart
+        (
+            [word("Hola.", 0.0, 1.0), word("Hola.", 2.0, 3.0)],
+            [word("Hola.", 0.0, 1.0), word("Hola.", 2.0, 3.0)],
+        ),
+    ],
+)
+def test_merge_repeated_segments(segments, expected):
+    assert STT.merge_repeated_segments(segments) == expected
+
+
+class FakeFeatureExtractor:
+    sampling_rate = 100
+    n_samples = 3000
+    hop_length = 1
+
+    def __call__(self, chunk):
+        return chunk
+
+
+class FakeModel:
+    """Stands in for faster-whisper's WhisperModel, recording find_alignment calls."""
+
+    feature_extractor = FakeFeatureExtractor()
+    hf_tokenizer = None
+
+    class model:
+        is_multilingual = True
+
+    def __init__(self, alignments):
+        self.alignments = list(alignments)
+        self.aligned_frames = []
+
+    def encode(self, features):
+        return features
+
+    def find_alignment(self, tokenizer, text_tokens, encoder_output, num_frames):
+        self.aligned_frames.append(num_frames)
+        alignment = self.alignments.pop(0)
+        if isinstance(alignment, Exception):
+            raise alignment
+        return [alignment]
+
+
+class FakeTokenizer:
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def encode(self, text):
+        return list(text)
+
+
+@pytest.fixture
+def aligner(monkeypatch):
+    monkeypatch.setattr(stt, "decode_audio", lambda path, sampling_rate: [0.0] * 10000)
+    monkeypatch.setattr(stt, "pad_or_trim", lambda features: features)
+    monkeypatch.setattr(stt, "Tokenizer", FakeTokenizer)
+
+    def create(alignments=()):
+        instance = STT.__new__(STT)
+        instance.model = FakeModel(alignments)
+        return instance
+
+    return create
+
+
+def aligned(text, start, end):
+    return {"word": text, "start": start, "end": end}
+
+
+def test_align_shifts_words_to_the_segment(aligner):
+    instance = aligner([[aligned(" Hola", 0.0, 0.4), aligned(" mundo.", 0.4, 2.0)]])
+    captions = instance.align("audio.wav", [word("Hola mundo.", 1.0, 2.5)], "es")
+
+    assert captions == [word(" Hola", 1.0, 1.4), word(" mundo.", 1.4, 2.5)]
+
+
+def test_align_merges_repeated_segments_first(aligner):
+    instance = aligner([[aligned(" Hola", 0.0, 0.4), aligned(" mundo.", 0.4, 1.6)]])
+    captions = instance.align(
+        "audio.wav", [word("Hola mundo.", 0.0, 1.0), word("Hola mundo.", 1.0, 1.8)], "es"
+    )
+
+    assert [caption["text"] for caption in captions] == [" Hola", " mundo."]
+    # aligned once, against the audio of both results
+    assert instance.model.aligned_frames == [180]
+
+
+@pytest.mark.parametrize(
+    "segments, alignments, expected",
+    [
+        # empty transcript
+        ([], [], []),
+        ([word("  ", 0.0, 1.0)], [], []),
+        # find_alignment fails
+        (
+            [word("ab ab", 0.0, 1.0)],
+            [RuntimeError("no alignment")],
+            [word(" ab", 0.0, 0.5), word(" ab", 0.5, 1.0)],
+        ),
+        # longer than one Whisper window
+        (
+            [word("ab ab", 0.0, 40.0)],
+            [],
+            [word(" ab", 0.0, 20.0), word(" ab", 20.0, 40.0)],
+        ),
+        # no audio in the segment
+        (
+            [word("ab ab", 200.0, 201.0)],
+            [],
+            [word(" ab", 200.0, 200.5), word(" ab", 200.5, 201.0)],
+        ),
+    ],
+)
+def test_align_falls_back_to_distributed_words(aligner, segments, alignments, expected):
+    instance = aligner(alignments)
+    assert instance.align("audio.wav", segments, "es") == expected
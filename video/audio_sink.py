@@ -0,0 +1,87 @@
+import numpy as np
+import soundfile as sf
+from video.config import tts_output_channels
+
+
+class WavSink:
+    """
+    Appends audio chunks to an open WAV file as they are generated.
+
+    Chunks are written straight to disk instead of being accumulated, so peak
+    memory is bounded by the chunk size rather than the clip length. Mono
+    chunks are upmixed on write when the sink has more than one channel.
+    """
+
+    def __init__(
+        self,
+        output_path: str,
+        sample_rate: int,
+        channels: int = tts_output_channels,
+        subtype: str = "PCM_16",
+    ):
+        """
+        Args:
+            output_path: Path of the WAV file to write
+            sample_rate: Sample rate of the audio chunks
+            channels: Number of channels in the output file (default: TTS_OUTPUT_CHANNELS)
+            subtype: soundfile subtype of the samples (default: PCM_16)
+        """
+        self.output_path = output_path
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.frames = 0
+        self._file = sf.SoundFile(
+            output_path,
+            mode="w",
+            samplerate=sample_rate,
+            channels=channels,
+            format="WAV",
+            subtype=subtype,
+        )
+
+    @property
+    def duration(self) -> float:
+        """Duration of the audio written so far, in seconds."""
+        return self.frames / self.sample_rate
+
+    def write(self, audio) -> float:
+        """
+        Appends a mono audio chunk.
+
+        Args:
+            audio: Mono samples as a numpy array or torch tensor, in [-1, 1]
+
+        Returns:
+            float: Duration of the chunk in seconds
+        """
+        if hasattr(audio, "detach"):
+            audio = audio.detach().cpu().numpy()
+        audio = np.asarray(audio, dtype=np.float32).reshape(-1)
+        if self.channels > 1:
+            audio = np.repeat(audio[:, np.newaxis], self.channels, axis=1)
+        self._file.write(audio)
+        self.frames += len(audio)
+        return len(audio) / self.sample_rate
+
+    def write_silence(self, seconds: float) -> float:
+        """
+        Appends silence.
+
+        Args:
+            seconds: Duration of the silence
+
+        Returns:
+            float: Duration of the silence actually written, in seconds
+        """
+        return self.write(np.zeros(int(self.sample_rate * seconds), dtype=np.float32))
+
+    def close(self):
+        """Finalizes the WAV header and closes the file."""
+        if not self._file.closed:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
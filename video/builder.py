@@ -1,7 +1,63 @@
 from video.media import MediaUtils
+from video.motion import KenBurnsRenderer
+from video.still_cache import still_loop_cache
+from video.config import (
+    ken_burns_engine,
+    num_cores,
+    render_segments,
+    render_segment_min_seconds,
+    still_background_enabled,
+)
+from concurrent.futures import ThreadPoolExecutor
+import math
+import os
+import shutil
+import tempfile
+import threading
 import time
 from loguru import logger
 
+# seconds between keyframes of segmented renders; segment boundaries are
+# multiples of it, so the joined video has a regular GOP structure
+SEGMENT_KEYFRAME_INTERVAL = 2
+
+# frame rate of image backgrounds
+IMAGE_BACKGROUND_FPS = 25
+
+# length of the cached loop of a still background; captions are re-encoded in
+# whole loops, so the rest of the timeline is the loop repeated
+STILL_LOOP_SECONDS = 2
+STILL_LOOP_FRAMES = STILL_LOOP_SECONDS * IMAGE_BACKGROUND_FPS
+
+# share of the loops that may show captions for a still build; above it the
+# caption runs re-encode about as much as a single pass, which is used instead
+STILL_MAX_CAPTIONED_SHARE = 0.5
+
+# encoder settings of still loops and caption segments: they are joined by
+# stream copy, so they must produce the same parameter sets. Every loop is a
+# single GOP, starting with a keyframe. The preset is the one of build_command,
+# caption runs never encode slower than the single pass
+STILL_ENCODER_ARGS = [
+    "-c:v",
+    "libx264",
+    "-preset",
+    "ultrafast",
+    "-tune",
+    "stillimage",
+    "-crf",
+    "23",
+    "-profile:v",
+    "high",
+    "-pix_fmt",
+    "yuv420p",
+    "-g",
+    str(STILL_LOOP_FRAMES),
+    "-keyint_min",
+    str(STILL_LOOP_FRAMES),
+    "-sc_threshold",
+    "0",
+]
+
 
 class VideoBuilder:
     """
@@ -20,6 +76,7 @@ class VideoBuilder:
         self.audio_file = None
         self.captions = None
         self.output_path = "output.mp4"
+        self.segments = render_segments
 
         # Internal state
         self.media_utils = None
@@ -35,8 +92,10 @@ class VideoBuilder:
         Args:
             file_path: Path to the image file
             effect_config: Configuration for visual effects. Supported effects:
-                - Ken Burns (zoom): {"effect": "ken_burns", "zoom_factor": 0.001, "direction": "zoom-to-top-left"}
+                - Ken Burns (zoom): {"effect": "ken_burns", "zoom_factor": 0.001, "direction": "zoom-to-top-left", "engine": "zoompan"}
                 - Pan: {"effect": "pan", "direction": "left-to-right", "speed": "normal"}
+                Ken Burns engines: "zoompan" (ffmpeg filter) or "warp" (sub-pixel
+                affine warp rendered in Python and piped to ffmpeg), default KEN_BURNS_ENGINE
         """
         self.background = {
             "type": "image", 
@@ -77,8 +136,32 @@ class VideoBuilder:
         self.output_path = output_path
         return self
 
-    def build_command(self):
-        """Build the complete FFmpeg command."""
+    def set_segments(self, segments: int):
+        """Set the maximum number of time ranges rendered in parallel (1 renders in one pass)."""
+        self.segments = max(1, segments)
+        return self
+
+    def build_command(
+        self,
+        start: float = None,
+        duration: float = None,
+        output_path: str = None,
+        threads: int = 0,
+    ):
+        """Build the complete FFmpeg command.
+
+        With start and duration the command renders only that time range of
+        the timeline, without audio, as one segment of a segmented render:
+        effect expressions and subtitles are offset by start so consecutive
+        segments join seamlessly.
+
+        Args:
+            start: Start of the segment in seconds
+            duration: Length of the segment in seconds
+            output_path: Output file (default: the builder's output path)
+            threads: ffmpeg threads (0 lets ffmpeg decide)
+        """
+        segment = start is not None
         if not self.background:
             raise ValueError("Background must be set (image or video).")
 
@@ -107,8 +190,7 @@ class VideoBuilder:
                 raise ValueError(
                     "Media manager must be set to determine audio duration."
                 )
-            media_info = self.media_utils.get_audio_info(self.audio_file)
-            audio_duration = media_info.get("duration")
+            audio_duration = self.media_utils.probe(self.audio_file)["duration"]
             if not audio_duration:
                 raise ValueError("Could not determine audio duration")
 
@@ -118,40 +200,57 @@ class VideoBuilder:
         filter_parts = []
         input_index = 0
 
+        input_duration = duration if segment else audio_duration
+
         # Add background input
         if self.background["type"] == "image":
-            cmd.extend(
-                ["-loop", "1", "-t", str(audio_duration), "-i", self.background["file"]]
-            )
-
-            # Get effect configuration with backward compatibility
-            effect_config = self.background.get("effect_config", {"effect": "ken_burns"})
-            
-            # Handle backward compatibility for old ken_burns config
-            if "ken_burns" in self.background and "effect_config" not in self.background:
-                # Old format: {"ken_burns": {"zoom_factor": 0.001, "direction": "zoom-to-top-left"}}
-                old_ken_burns = self.background.get("ken_burns", {})
-                effect_config = {
-                    "effect": "ken_burns",
-                    "zoom_factor": old_ken_burns.get("zoom_factor", 0.001),
-                    "direction": old_ken_burns.get("direction", "zoom-to-top-left")
-                }
-            
+            effect_config = self.effect_config()
             effect_type = effect_config.get("effect", "ken_burns")
 
-            fps = 25
-            duration_frames = int(audio_duration * fps)
-            
-            if effect_type == "ken_burns":
+            fps = IMAGE_BACKGROUND_FPS
+            duration_frames = int(input_duration * fps)
+            warp = self.uses_warp_engine()
+
+            if warp:
+                # frames come from background_frames through stdin
+                cmd.extend(
+                    [
+                        "-f",
+                        "rawvideo",
+                        "-pix_fmt",
+                        "rgb24",
+                        "-s",
+                        f"{self.width}x{self.height}",
+                        "-framerate",
+                        str(fps),
+                        "-i",
+                        "pipe:0",
+                    ]
+                )
+            else:
+                cmd.extend(
+                    ["-loop", "1", "-t", str(input_duration), "-i", self.background["file"]]
+                )
+
+            if warp:
+                filter_parts.append(f"[{input_index}]setsar=1:1[bg]")
+
+            elif effect_type == "ken_burns":
                 # Ken Burns (zoom) effect
                 zoom_factor = effect_config.get("zoom_factor", 0.001)
                 direction = effect_config.get("direction", "zoom-to-top-left")
 
+                # segments compute the zoom from the frame number, as the
+                # incremental zoom+factor restarts at 1 in every segment
+                zoom = f"zoom+{zoom_factor}"
+                if segment:
+                    zoom = f"1+{zoom_factor}*(on+{round(start * fps) + 1})"
+
                 # todo without upscaling we can't use the top and center zooms. upscaling increases the render time
                 zoom_expressions = {
-                    "zoom-to-top": f"z='zoom+{zoom_factor}':x=iw/2-(iw/zoom/2):y=0",
-                    "zoom-to-center": f"z='zoom+{zoom_factor}':x=iw/2-(iw/zoom/2):y=ih/2-(ih/zoom/2)",
-                    "zoom-to-top-left": f"z='zoom+{zoom_factor}':x=0:y=0",
+                    "zoom-to-top": f"z='{zoom}':x=iw/2-(iw/zoom/2):y=0",
+                    "zoom-to-center": f"z='{zoom}':x=iw/2-(iw/zoom/2):y=ih/2-(ih/zoom/2)",
+                    "zoom-to-top-left": f"z='{zoom}':x=0:y=0",
                 }
                 zoom_expr = zoom_expressions.get(direction, zoom_expressions["zoom-to-top-left"])
 
@@ -215,8 +314,9 @@ class VideoBuilder:
                 
                 # Create pan expression
                 # Linear interpolation from start to end position over the duration
-                pan_x_expr = f"{start_x}+({end_x}-{start_x})*t/{audio_duration}*{speed_mult}"
-                pan_y_expr = f"{start_y}+({end_y}-{start_y})*t/{audio_duration}*{speed_mult}"
+                t = f"(t+{start})" if segment else "t"
+                pan_x_expr = f"{start_x}+({end_x}-{start_x})*{t}/{audio_duration}*{speed_mult}"
+                pan_y_expr = f"{start_y}+({end_y}-{start_y})*{t}/{audio_duration}*{speed_mult}"
                 
                 filter_parts.append(
                     f"[{input_index}]scale={scaled_width}:{scaled_height},setsar=1:1,"
@@ -230,7 +330,31 @@ class VideoBuilder:
                 )
 
         elif self.background["type"] == "video":
-            if audio_duration:
+            background_filter = f"scale={self.width}:{self.height}"
+            if segment:
+                # the looped background continues where the previous segment stopped
+                background_probe = self.media_utils.probe(self.background["file"])
+                background_duration = background_probe["duration"]
+                offset = start % background_duration if background_duration else 0
+                # segments are whole frames only at an integer frame rate
+                # (30000/1001 isn't), otherwise every seam drops or repeats a
+                # frame and the joined video drifts against the audio
+                background_fps = (background_probe["video"] or {}).get("fps")
+                segment_fps = round(background_fps) if background_fps else IMAGE_BACKGROUND_FPS
+                background_filter += f",fps={segment_fps}"
+                cmd.extend(
+                    [
+                        "-stream_loop",
+                        "-1",
+                        "-ss",
+                        str(offset),
+                        "-t",
+                        str(duration),
+                        "-i",
+                        self.background["file"],
+                    ]
+                )
+            elif audio_duration:
                 cmd.extend(
                     [
                         "-stream_loop",
@@ -243,14 +367,14 @@ class VideoBuilder:
                 )
             else:
                 cmd.extend(["-i", self.background["file"]])
-            filter_parts.append(f"[{input_index}]scale={self.width}:{self.height}[bg]")
+            filter_parts.append(f"[{input_index}]{background_filter}[bg]")
 
         input_index += 1
         current_video = "[bg]"
 
         # Add audio input
         audio_input_index = None
-        if self.audio_file:
+        if self.audio_file and not segment:
             cmd.extend(["-i", self.audio_file])
             audio_input_index = input_index
             input_index += 1
@@ -258,7 +382,14 @@ class VideoBuilder:
         # Add subtitles or caption images if provided
         if self.captions:
             subtitle_file = self.captions.get("file")
-            if subtitle_file:
+            if subtitle_file and segment:
+                # render the subtitles at timeline time, then restore the segment time
+                filter_parts.append(
+                    f"{current_video}setpts=PTS+{start}/TB,subtitles={subtitle_file},"
+                    f"setpts=PTS-{start}/TB[v]"
+                )
+                current_video = "[v]"
+            elif subtitle_file:
                 filter_parts.append(f"{current_video}subtitles={subtitle_file}[v]")
                 current_video = "[v]"
         else:
@@ -281,15 +412,426 @@ class VideoBuilder:
 
         cmd.extend(["-crf", "23", "-pix_fmt", "yuv420p"])
 
+        if segment:
+            cmd.extend(
+                [
+                    "-force_key_frames",
+                    f"expr:gte(t,n_forced*{SEGMENT_KEYFRAME_INTERVAL})",
+                    "-an",
+                    "-t",
+                    str(duration),
+                ]
+            )
+            if threads:
+                cmd.extend(["-threads", str(threads)])
+            cmd.append(output_path or self.output_path)
+            return cmd
+
         # Audio codec settings
         if self.audio_file:
             cmd.extend(["-c:a", "aac", "-b:a", "192k"])
             if audio_duration:
                 cmd.extend(["-t", str(audio_duration)])
 
-        cmd.append(self.output_path)
+        cmd.append(output_path or self.output_path)
         return cmd
 
+    def effect_config(self) -> dict:
+        """Returns the effect configuration of an image background."""
+        # Get effect configuration with backward compatibility
+        effect_config = self.background.get("effect_config", {"effect": "ken_burns"})
+
+        # Handle backward compatibility for old ken_burns config
+        if "ken_burns" in self.background and "effect_config" not in self.background:
+            # Old format: {"ken_burns": {"zoom_factor": 0.001, "direction": "zoom-to-top-left"}}
+            old_ken_burns = self.background.get("ken_burns", {})
+            effect_config = {
+                "effect": "ken_burns",
+                "zoom_factor": old_ken_burns.get("zoom_factor", 0.001),
+                "direction": old_ken_burns.get("direction", "zoom-to-top-left")
+            }
+        return effect_config
+
+    def uses_warp_engine(self) -> bool:
+        """Whether the background is a Ken Burns effect rendered by KenBurnsRenderer."""
+        if not self.background or self.background["type"] != "image":
+            return False
+        effect_config = self.effect_config()
+        return (
+            effect_config.get("effect", "ken_burns") == "ken_burns"
+            and effect_config.get("engine", ken_burns_engine) == "warp"
+        )
+
+    def background_frames(
+        self, start: float = 0.0, duration: float = None, workers: int = 0
+    ):
+        """
+        Returns the raw frames piped to ffmpeg for a warp engine background.
+
+        Args:
+            start: Start of the rendered time range in seconds
+            duration: Length of the time range (default: the whole audio)
+            workers: Threads rendering frames (0 uses every core)
+
+        Returns:
+            Iterator of RGB24 frames, or None if the background isn't piped
+        """
+        if not self.uses_warp_engine():
+            return None
+
+        effect_config = self.effect_config()
+        fps = IMAGE_BACKGROUND_FPS
+        audio_duration = self.media_utils.probe(self.audio_file)["duration"]
+        if duration is None:
+            duration = audio_duration
+
+        renderer = KenBurnsRenderer(
+            self.background["file"],
+            self.width,
+            self.height,
+            zoom_factor=effect_config.get("zoom_factor", 0.001),
+            direction=effect_config.get("direction", "zoom-to-top-left"),
+            total_frames=int(audio_duration * fps) + 1,
+            workers=workers or num_cores,
+        )
+        # one frame more than needed, like zoompan's d; ffmpeg's -t cuts the rest
+        return renderer.frames(round(start * fps), int(duration * fps) + 1)
+
+    def uses_still_background(self) -> bool:
+        """Whether the background is an image without motion, built from a cached loop."""
+        if not still_background_enabled or not self.audio_file:
+            return False
+        if not self.background or self.background["type"] != "image":
+            return False
+        return self.effect_config().get("effect", "ken_burns") not in ("ken_burns", "pan")
+
+    def encode_still_loop(self, output_path: str) -> bool:
+        """Encodes STILL_LOOP_SECONDS of the background image, without audio."""
+        cmd = [
+            self.ffmpeg_path,
+            "-y",
+            "-loop",
+            "1",
+            "-framerate",
+            str(IMAGE_BACKGROUND_FPS),
+            "-i",
+            self.background["file"],
+            "-vf",
+            f"scale={self.width}:{self.height},setsar=1:1",
+            *STILL_ENCODER_ARGS,
+            "-frames:v",
+            str(STILL_LOOP_FRAMES),
+            "-an",
+            output_path,
+        ]
+        return self.media_utils.execute_ffmpeg_command(
+            cmd, "encode still loop", show_progress=False
+        )
+
+    @staticmethod
+    def subtitle_intervals(subtitle_file: str) -> list:
+        """
+        Reads the display times of the events of an ASS subtitle file.
+
+        Args:
+            subtitle_file: Path to the ASS file
+
+        Returns:
+            list: (start, end) tuples in seconds
+        """
+
+        def parse_time(value: str) -> float:
+            hours, minutes, seconds = value.strip().split(":")
+            return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+        intervals = []
+        with open(subtitle_file, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.startswith("Dialogue:"):
+                    continue
+                # Format: Layer, Start, End, Style, ...
+                fields = line[len("Dialogue:"):].split(",", 3)
+                intervals.append((parse_time(fields[1]), parse_time(fields[2])))
+        return intervals
+
+    def caption_runs(self, loops: int) -> list:
+        """
+        Finds the consecutive still loops of the timeline that show captions.
+
+        Args:
+            loops: Number of STILL_LOOP_SECONDS loops in the timeline
+
+        Returns:
+            list: (first_loop, loop_count) tuples, in timeline order
+        """
+        subtitle_file = self.captions.get("file") if self.captions else None
+        if not subtitle_file:
+            return []
+
+        has_text = [False] * loops
+        for start, end in self.subtitle_intervals(subtitle_file):
+            if end <= start:
+                continue
+            first = int(start // STILL_LOOP_SECONDS)
+            last = min(loops, math.ceil(end / STILL_LOOP_SECONDS))
+            for loop in range(first, last):
+                has_text[loop] = True
+
+        runs = []
+        for loop, text in enumerate(has_text):
+            if not text:
+                continue
+            if runs and runs[-1][0] + runs[-1][1] == loop:
+                runs[-1] = (runs[-1][0], runs[-1][1] + 1)
+            else:
+                runs.append((loop, 1))
+        return runs
+
+    def captioned_share(self, duration: float) -> float:
+        """
+        Returns the share of the still loops of the timeline that show captions.
+
+        Args:
+            duration: Length of the timeline in seconds
+
+        Returns:
+            float: Captioned loops divided by all loops, 0 to 1
+        """
+        loops = max(1, math.ceil(duration / STILL_LOOP_SECONDS))
+        return sum(loop_count for _, loop_count in self.caption_runs(loops)) / loops
+
+    def execute_still(self, duration: float) -> bool:
+        """
+        Builds the video from the cached still loop of the background image.
+
+        The loop is repeated with stream copy; the runs of loops that show
+        captions are re-encoded with the subtitles burned in, in parallel up
+        to the segment count. The audio is muxed in once.
+
+        Args:
+            duration: Length of the timeline in seconds
+
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        key = still_loop_cache.key(
+            self.background["file"],
+            width=self.width,
+            height=self.height,
+            frames=STILL_LOOP_FRAMES,
+            fps=IMAGE_BACKGROUND_FPS,
+            encoder=STILL_ENCODER_ARGS,
+        )
+        work_dir = tempfile.mkdtemp(dir=os.path.dirname(os.path.abspath(self.output_path)))
+        try:
+            # the concat demuxer opens the loop lazily, so it's read from a
+            # link in work_dir that eviction by a concurrent job can't delete
+            loop_path = still_loop_cache.get(
+                key, self.encode_still_loop, os.path.join(work_dir, "loop.mp4")
+            )
+            if not loop_path:
+                return False
+
+            loops = max(1, math.ceil(duration / STILL_LOOP_SECONDS))
+            runs = self.caption_runs(loops)
+            subtitle_file = self.captions.get("file") if runs else None
+
+            run_paths = [
+                os.path.join(work_dir, f"captions_{i:04d}.mp4") for i in range(len(runs))
+            ]
+            workers = max(1, min(len(runs), self.segments))
+            threads = max(1, num_cores // workers)
+
+            def render(i):
+                first_loop, loop_count = runs[i]
+                start = first_loop * STILL_LOOP_SECONDS
+                cmd = [
+                    self.ffmpeg_path,
+                    "-y",
+                    "-loop",
+                    "1",
+                    "-framerate",
+                    str(IMAGE_BACKGROUND_FPS),
+                    "-i",
+                    self.background["file"],
+                    "-vf",
+                    # render the subtitles at timeline time, then restore the run time
+                    f"scale={self.width}:{self.height},setsar=1:1,"
+                    f"setpts=PTS+{start}/TB,subtitles={subtitle_file},setpts=PTS-{start}/TB",
+                    *STILL_ENCODER_ARGS,
+                    "-frames:v",
+                    str(loop_count * STILL_LOOP_FRAMES),
+                    "-an",
+                    "-threads",
+                    str(threads),
+                    run_paths[i],
+                ]
+                return self.media_utils.execute_ffmpeg_command(
+                    cmd, f"build caption segment {i}", show_progress=False
+                )
+
+            if runs:
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    results = list(executor.map(render, range(len(runs))))
+                if not all(results):
+                    return False
+
+            clip_paths = [loop_path] * loops
+            for i, (first_loop, loop_count) in enumerate(runs):
+                clip_paths[first_loop : first_loop + loop_count] = [None] * loop_count
+                clip_paths[first_loop] = run_paths[i]
+            clip_paths = [clip_path for clip_path in clip_paths if clip_path]
+
+            list_path = self.media_utils.write_concat_list(clip_paths, work_dir)
+            cmd = [
+                self.ffmpeg_path,
+                "-y",
+                "-f",
+                "concat",
+                "-safe",
+                "0",
+                "-i",
+                list_path,
+                "-i",
+                self.audio_file,
+                "-map",
+                "0:v",
+                "-map",
+                "1:a",
+                "-c:v",
+                "copy",
+                "-c:a",
+                "aac",
+                "-b:a",
+                "192k",
+                "-t",
+                str(duration),
+                self.output_path,
+            ]
+            return self.media_utils.execute_ffmpeg_command(
+                cmd,
+                "join still background",
+                expected_duration=duration,
+                show_progress=True,
+            )
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    def segment_ranges(self, duration: float) -> list:
+        """
+        Splits the timeline into the time ranges of a segmented render.
+
+        Ranges are at least render_segment_min_seconds long and start on
+        multiples of SEGMENT_KEYFRAME_INTERVAL.
+
+        Args:
+            duration: Length of the timeline in seconds
+
+        Returns:
+            list: (start, duration) tuples; a single range when the timeline
+                isn't worth splitting
+        """
+        count = min(self.segments, int(duration // render_segment_min_seconds))
+        if count <= 1:
+            return [(0.0, duration)]
+
+        length = (
+            math.ceil(duration / count / SEGMENT_KEYFRAME_INTERVAL)
+            * SEGMENT_KEYFRAME_INTERVAL
+        )
+        ranges = []
+        start = 0.0
+        # the last range takes the remainder instead of leaving a sliver
+        while duration - start >= length + SEGMENT_KEYFRAME_INTERVAL:
+            ranges.append((start, length))
+            start += length
+        ranges.append((start, duration - start))
+        return ranges
+
+    def execute_segments(self, ranges: list, duration: float) -> bool:
+        """
+        Renders the time ranges in parallel ffmpeg processes, then joins them
+        with the concat demuxer (video stream copy) and muxes in the audio,
+        encoded once for the whole timeline.
+
+        Args:
+            ranges: (start, duration) tuples from segment_ranges
+            duration: Length of the timeline in seconds
+
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        work_dir = tempfile.mkdtemp(dir=os.path.dirname(os.path.abspath(self.output_path)))
+        try:
+            segment_paths = [
+                os.path.join(work_dir, f"segment_{i:04d}.mp4") for i in range(len(ranges))
+            ]
+            # each segment is its own ffmpeg process: split the cores between them
+            threads = max(1, num_cores // len(ranges))
+            rendered = []
+            lock = threading.Lock()
+
+            def render(i):
+                start, length = ranges[i]
+                cmd = self.build_command(
+                    start=start,
+                    duration=length,
+                    output_path=segment_paths[i],
+                    threads=threads,
+                )
+                success = self.media_utils.execute_ffmpeg_command(
+                    cmd,
+                    f"build video segment {i}",
+                    show_progress=False,
+                    input_chunks=self.background_frames(start, length, workers=threads),
+                )
+                if success and self.media_utils.progress_callback:
+                    with lock:
+                        rendered.append(i)
+                        # the final mux is quick, leave a little room for it
+                        self.media_utils.progress_callback(95 * len(rendered) / len(ranges))
+                return success
+
+            with ThreadPoolExecutor(max_workers=len(ranges)) as executor:
+                results = list(executor.map(render, range(len(ranges))))
+            if not all(results):
+                return False
+
+            list_path = self.media_utils.write_concat_list(segment_paths, work_dir)
+            cmd = [
+                self.ffmpeg_path,
+                "-y",
+                "-f",
+                "concat",
+                "-safe",
+                "0",
+                "-i",
+                list_path,
+                "-i",
+                self.audio_file,
+                "-map",
+                "0:v",
+                "-map",
+                "1:a",
+                "-c:v",
+                "copy",
+                "-c:a",
+                "aac",
+                "-b:a",
+                "192k",
+                "-t",
+                str(duration),
+                self.output_path,
+            ]
+            success = self.media_utils.execute_ffmpeg_command(
+                cmd, "join video segments", show_progress=False
+            )
+            if success and self.media_utils.progress_callback:
+                self.media_utils.progress_callback(100.0)
+            return success
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
     def execute(self):
         """Build and execute the FFmpeg command using MediaUtils for progress tracking."""
         if not self.media_utils:
@@ -313,23 +855,42 @@ class VideoBuilder:
             # Calculate expected duration for progress tracking
             expected_duration = None
             if self.audio_file:
-                audio_info = self.media_utils.get_audio_info(self.audio_file)
-                expected_duration = audio_info.get("duration")
+                expected_duration = self.media_utils.probe(self.audio_file)["duration"]
             elif self.background and self.background.get("type") == "video":
-                video_info = self.media_utils.get_video_info(self.background["file"])
-                expected_duration = video_info.get("duration")
-
-            context_logger.bind(
-                command=" ".join(cmd),
-                expected_duration=expected_duration,
-            ).debug("executing video build command")
-            # Execute using MediaUtils for proper logging and progress tracking
-            success = self.media_utils.execute_ffmpeg_command(
-                cmd,
-                "build video",
-                expected_duration=expected_duration,
-                show_progress=True,
-            )
+                expected_duration = self.media_utils.probe(self.background["file"])["duration"]
+
+            # segmented renders need the audio to slice the timeline and mux it back
+            ranges = []
+            if self.audio_file and self.segments > 1:
+                ranges = self.segment_ranges(expected_duration)
+
+            if (
+                self.uses_still_background()
+                and self.captioned_share(expected_duration) <= STILL_MAX_CAPTIONED_SHARE
+            ):
+                context_logger.bind(
+                    expected_duration=expected_duration,
+                ).debug("executing still background video build")
+                success = self.execute_still(expected_duration)
+            elif len(ranges) > 1:
+                context_logger.bind(
+                    segments=len(ranges),
+                    expected_duration=expected_duration,
+                ).debug("executing segmented video build")
+                success = self.execute_segments(ranges, expected_duration)
+            else:
+                context_logger.bind(
+                    command=" ".join(cmd),
+                    expected_duration=expected_duration,
+                ).debug("executing video build command")
+                # Execute using MediaUtils for proper logging and progress tracking
+                success = self.media_utils.execute_ffmpeg_command(
+                    cmd,
+                    "build video",
+                    expected_duration=expected_duration,
+                    show_progress=True,
+                    input_chunks=self.background_frames(),
+                )
 
             if success:
                 context_logger.bind(execution_time=time.time() - start).info(
@@ -0,0 +1,202 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from loguru import logger
+
+HASH_CHUNK_SIZE = 1024 * 1024  # 1MB chunks
+DIGEST_CACHE_SIZE = 1024
+
+_digest_cache = OrderedDict()
+_digest_lock = threading.Lock()
+
+
+def file_sha256(file_path: str) -> str:
+    """
+    Returns the sha256 hex digest of a file's content.
+
+    Digests are memoized by (path, size, mtime_ns), so repeated lookups of an
+    unchanged file don't re-read it.
+
+    Args:
+        file_path: Path to the file
+
+    Returns:
+        str: Hex digest of the file content
+    """
+    stat = os.stat(file_path)
+    key = (os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
+    with _digest_lock:
+        digest = _digest_cache.get(key)
+        if digest is not None:
+            _digest_cache.move_to_end(key)
+            return digest
+
+    sha256 = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        while chunk := f.read(HASH_CHUNK_SIZE):
+            sha256.update(chunk)
+    digest = sha256.hexdigest()
+
+    with _digest_lock:
+        _digest_cache[key] = digest
+        while len(_digest_cache) > DIGEST_CACHE_SIZE:
+            _digest_cache.popitem(last=False)
+    return digest
+
+
+def stream_sha256(stream) -> str:
+    """
+    Returns the sha256 hex digest of a seekable binary file object.
+
+    The stream position is restored afterwards, so it can still be read.
+
+    Args:
+        stream: Seekable binary file object
+
+    Returns:
+        str: Hex digest of the stream content
+    """
+    position = stream.tell()
+    stream.seek(0)
+    sha256 = hashlib.sha256()
+    while chunk := stream.read(HASH_CHUNK_SIZE):
+        sha256.update(chunk)
+    stream.seek(position)
+    return sha256.hexdigest()
+
+
+class DiskCache:
+    """
+    Directory of cache entries bounded by total size.
+
+    An entry is every file named <key><suffix> for a given key. Entries are
+    evicted least recently used first, using the file mtime as access time.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        """
+        Args:
+            directory: Directory holding the cache entries
+            max_bytes: Maximum total size of the directory in bytes
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+
+    def path(self, key: str, suffix: str = "") -> str:
+        """Returns the file path of the entry with the given key and suffix."""
+        return os.path.join(self.directory, f"{key}{suffix}")
+
+    def touch(self, path: str):
+        """Marks an entry file as recently used."""
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+
+    def record(self, hit: bool):
+        """Updates the hit/miss counters."""
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def stats(self) -> dict:
+        """
+        Returns the hit/miss counters of this cache.
+
+        Returns:
+            dict: hits, misses and hit_rate
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+    def evict(self):
+        """Deletes the least recently used entries until the cache fits max_bytes."""
+        with self._lock:
+            entries = {}
+            total_size = 0
+            for entry in os.scandir(self.directory):
+                if not entry.is_file():
+                    continue
+                stat = entry.stat()
+                key = entry.name.split(".", 1)[0]
+                size, mtime, paths = entries.get(key, (0, 0, []))
+                paths.append(entry.path)
+                entries[key] = (size + stat.st_size, max(mtime, stat.st_mtime), paths)
+                total_size += stat.st_size
+
+            if total_size <= self.max_bytes:
+                return
+
+            start = time.time()
+            evicted = 0
+            for key, (size, _, paths) in sorted(entries.items(), key=lambda e: e[1][1]):
+                if total_size <= self.max_bytes:
+                    break
+                for path in paths:
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass
+                total_size -= size
+                evicted += 1
+
+            logger.bind(
+                directory=self.directory,
+                evicted=evicted,
+                total_size=total_size,
+                execution_time=time.time() - start,
+            ).debug("evicted cache entries")
+
+
+class DigestCache:
+    """
+    Base of the caches storing entries in a DiskCache under a digest of the
+    inputs that produced them.
+
+    Subclasses build their keys with digest() and write entries through
+    tmp_path() and commit(), so readers never see a partial file.
+    """
+
+    def __init__(self, disk_cache: DiskCache):
+        self.disk_cache = disk_cache
+
+    @staticmethod
+    def digest(payload: dict) -> str:
+        """
+        Returns the sha256 hex digest of a JSON serializable payload.
+
+        Args:
+            payload: Inputs identifying the entry, key order doesn't matter
+
+        Returns:
+            str: Hex digest usable as cache key
+        """
+        serialized = json.dumps(payload, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+    def tmp_path(self, key: str, suffix: str) -> str:
+        """Returns a unique temporary path for an entry file, keeping its extension."""
+        return self.disk_cache.path(key, f".{uuid.uuid4().hex}.tmp{suffix}")
+
+    def commit(self, tmp_path: str, key: str, suffix: str):
+        """Moves a file written to tmp_path() into place."""
+        os.replace(tmp_path, self.disk_cache.path(key, suffix))
+
+    def stats(self) -> dict:
+        """Returns the hit/miss counters of the cache."""
+        return self.disk_cache.stats()
@@ -1,14 +1,13 @@
 import os
-import torch
+import threading
 from loguru import logger
 
-device = "cpu"
-if torch.cuda.is_available():
-    device = torch.device("cuda")
-elif torch.backends.mps.is_available():
-    device = torch.device("mps")
-else:
-    device = torch.device("cpu")
+
+def get_cpu_core_count() -> int:
+    """
+    Returns the number of CPU cores available to this process, honouring the
+    cgroup v2 CPU quota (/sys/fs/cgroup/cpu.max) when one is set.
+    """
     num_cores = os.cpu_count()
     if os.path.exists("/sys/fs/cgroup/cpu.max"):
         with open("/sys/fs/cgroup/cpu.max", "r") as f:
@@ -21,7 +20,7 @@ else:
                 else:
                     cpu_max = int(line.split()[0])
                     cpu_period = int(line.split()[1])
-                    num_cores = cpu_max // cpu_period
+                    num_cores = max(1, cpu_max // cpu_period)
                     logger.info("Using {} cores", num_cores)
             else:
                 logger.warning(
@@ -29,25 +28,156 @@ else:
                 )
     else:
         logger.info("File /sys/fs/cgroup/cpu.max not found, using os.cpu_count()")
+    return num_cores
+
+
+num_cores = get_cpu_core_count()
+
+_device = None
+_device_lock = threading.Lock()
+
+
+def get_device():
+    """
+    Returns the torch device to run models on, importing torch on first use.
+
+    On CPU this also sets the torch thread counts. torch.load is patched to
+    map tensors to the device, so checkpoints saved on GPU load anywhere.
+    """
+    global _device
+    with _device_lock:
+        if _device is None:
+            _device = _init_device()
+    return _device
 
-    logger.info("number of CPU cores: {}", num_cores)
-    num_threads = os.environ.get("NUM_THREADS", num_cores)
-    logger.info("number of threads to use with torch: {}", num_threads)
-    torch.set_num_threads(int(num_threads))
-    torch.set_num_interop_threads(int(num_threads))
 
-map_location = torch.device(device)
+def _init_device():
+    import torch
 
-torch_load_original = torch.load
+    if torch.cuda.is_available():
+        device = torch.device("cuda")
+    elif torch.backends.mps.is_available():
+        device = torch.device("mps")
+    else:
+        device = torch.device("cpu")
+        logger.info("number of CPU cores: {}", num_cores)
+        num_threads = os.environ.get("NUM_THREADS", num_cores)
+        logger.info("number of threads to use with torch: {}", num_threads)
+        torch.set_num_threads(int(num_threads))
+        torch.set_num_interop_threads(int(num_threads))
+
+    torch_load_original = torch.load
 
+    def patched_torch_load(*args, **kwargs):
+        if "map_location" not in kwargs:
+            kwargs["map_location"] = device
+        return torch_load_original(*args, **kwargs)
 
-def patched_torch_load(*args, **kwargs):
-    if "map_location" not in kwargs:
-        kwargs["map_location"] = map_location
-    return torch_load_original(*args, **kwargs)
+    torch.load = patched_torch_load
+    return device
 
 
-torch.load = patched_torch_load
+def __getattr__(name):
+    # torch-dependent settings are resolved on first access, so importing
+    # this module (and the API routers) doesn't import torch
+    if name in ("device", "map_location"):
+        return get_device()
+    if name == "kokoro_max_batch_tokens":
+        return int(
+            os.environ.get(
+                "KOKORO_MAX_BATCH_TOKENS", 4096 if get_device().type == "cuda" else 0
+            )
+        )
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 whisper_model = os.environ.get("WHISPER_MODEL", "small")
 whisper_compute_type = os.environ.get("WHISPER_COMPUTE_TYPE", "int8")
+
+kokoro_pipeline_cache_size = int(os.environ.get("KOKORO_PIPELINE_CACHE_SIZE", 4))
+kokoro_preload_lang_codes = [
+    lang_code.strip()
+    for lang_code in os.environ.get("KOKORO_PRELOAD_LANG_CODES", "").split(",")
+    if lang_code.strip()
+]
+
+chatterbox_preload = os.environ.get("CHATTERBOX_PRELOAD", "false").lower() in ("1", "true", "yes")
+
+cache_path = os.environ.get("CACHE_PATH", os.path.join(os.path.abspath(os.getcwd()), "cache"))
+chatterbox_conds_cache_size = int(os.environ.get("CHATTERBOX_CONDS_CACHE_SIZE", 16))
+chatterbox_conds_cache_max_mb = int(os.environ.get("CHATTERBOX_CONDS_CACHE_MAX_MB", 256))
+
+tts_cache_enabled = os.environ.get("TTS_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+tts_cache_max_mb = int(os.environ.get("TTS_CACHE_MAX_MB", 1024))
+
+tts_output_channels = int(os.environ.get("TTS_OUTPUT_CHANNELS", 1))
+
+# KOKORO_MAX_BATCH_TOKENS (0 disables batched synthesis of international
+# kokoro voices) defaults to 4096 on GPU and is resolved in __getattr__
+
+# number of worker processes for sharded kokoro synthesis on CPU, 0 disables it
+tts_shard_workers = int(os.environ.get("TTS_SHARD_WORKERS", 0))
+tts_shard_min_chars = int(os.environ.get("TTS_SHARD_MIN_CHARS", 1000))
+
+# 0 uses the sequential faster-whisper decoder, > 0 the batched pipeline
+whisper_batch_size = int(os.environ.get("WHISPER_BATCH_SIZE", 0))
+
+stt_cache_enabled = os.environ.get("STT_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+stt_cache_max_mb = int(os.environ.get("STT_CACHE_MAX_MB", 256))
+
+# parallel transcription of long audio: worker processes (0 = one per 4 cores)
+# and the target length of the VAD-split chunks each worker decodes
+stt_parallel_workers = int(os.environ.get("STT_PARALLEL_WORKERS", 0))
+stt_chunk_seconds = float(os.environ.get("STT_CHUNK_SECONDS", 300))
+
+# number of Whisper model replicas serving concurrent transcriptions; the CPU
+# cores are split evenly between them. STT_NUM_WORKERS is CTranslate2's
+# num_workers per replica
+stt_pool_size = max(1, int(os.environ.get("STT_POOL_SIZE", 1)))
+stt_num_workers = max(1, int(os.environ.get("STT_NUM_WORKERS", 1)))
+
+# models loaded in the FastAPI lifespan instead of on first request:
+# comma-separated list of whisper, kokoro, chatterbox
+preload_models = [
+    name.strip().lower()
+    for name in os.environ.get("PRELOAD_MODELS", "").split(",")
+    if name.strip()
+]
+if kokoro_preload_lang_codes and "kokoro" not in preload_models:
+    preload_models.append("kokoro")
+if chatterbox_preload and "chatterbox" not in preload_models:
+    preload_models.append("chatterbox")
+
+# background jobs run on a bounded pool of worker threads per resource class:
+# model (TTS/STT inference), ffmpeg (encoding) and io (light file work).
+# Submissions are rejected with 429 once JOB_QUEUE_MAX_DEPTH jobs wait in a pool
+job_model_workers = max(1, int(os.environ.get("JOB_MODEL_WORKERS", 1)))
+job_ffmpeg_workers = max(1, int(os.environ.get("JOB_FFMPEG_WORKERS", max(1, num_cores // 4))))
+job_io_workers = max(1, int(os.environ.get("JOB_IO_WORKERS", 4)))
+job_queue_max_depth = max(1, int(os.environ.get("JOB_QUEUE_MAX_DEPTH", 64)))
+
+# clips normalized concurrently by merge_videos before joining them with the
+# concat demuxer; each ffmpeg process gets num_cores / workers threads.
+# 1 (the default) keeps mismatched first clips on the single filter-graph merge
+merge_normalize_workers = max(1, int(os.environ.get("MERGE_NORMALIZE_WORKERS", 1)))
+
+# default Ken Burns engine of VideoBuilder: zoompan (ffmpeg filter) or warp
+# (sub-pixel affine warp rendered with Pillow and piped to ffmpeg)
+ken_burns_engine = os.environ.get("KEN_BURNS_ENGINE", "zoompan").lower()
+
+# image backgrounds without motion are assembled from a short loop of the
+# image, encoded once and cached, instead of encoding every frame; captions are
+# re-encoded only on the parts of the timeline that show text
+still_background_enabled = os.environ.get("STILL_BACKGROUND_ENABLED", "true").lower() in ("1", "true", "yes")
+still_cache_max_mb = int(os.environ.get("STILL_CACHE_MAX_MB", 256))
+
+# VideoBuilder splits timelines into up to RENDER_SEGMENTS time ranges of at
+# least RENDER_SEGMENT_MIN_SECONDS, encodes them in parallel and joins them
+# with stream copy. 1 renders the whole timeline in one ffmpeg process
+render_segments = max(1, int(os.environ.get("RENDER_SEGMENTS", 1)))
+render_segment_min_seconds = float(os.environ.get("RENDER_SEGMENT_MIN_SECONDS", 30))
+
+# SQLite file persisting job state, progress and timings; finished jobs are
+# pruned after JOB_RETENTION_HOURS
+job_db_path = os.environ.get("JOB_DB_PATH", os.path.join(cache_path, "jobs.sqlite"))
+job_retention_hours = float(os.environ.get("JOB_RETENTION_HOURS", 24 * 7))
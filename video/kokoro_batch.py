@@ -0,0 +1,239 @@
+from typing import Callable, Iterable, Iterator, List
+import numpy as np
+import torch
+from loguru import logger
+from torch.nn.utils.rnn import pack_padded_sequence, pad_packed_sequence
+
+# phoneme sequences longer than this don't fit the kokoro context window
+MAX_PHONEME_LENGTH = 510
+
+# maximum absolute sample difference accepted by the parity check
+PARITY_TOLERANCE = 1e-3
+
+# result of the parity check per KModel instance (id -> bool)
+_parity = {}
+
+
+def phonemes_to_input_ids(model, phonemes: str) -> List[int]:
+    """
+    Maps a phoneme string to kokoro input ids, including the boundary tokens.
+
+    Args:
+        model: KModel instance
+        phonemes: Phonemes produced by the pipeline G2P
+
+    Returns:
+        List[int]: Input ids, same as KModel.forward builds them
+    """
+    input_ids = [i for i in (model.vocab.get(p) for p in phonemes) if i is not None]
+    return [0, *input_ids, 0]
+
+
+def group_batches(
+    items: Iterable,
+    length: Callable[[object], int],
+    max_batch_tokens: int,
+    first_batch_size: int = 0,
+) -> Iterator[list]:
+    """
+    Groups consecutive items into batches bounded by their padded size.
+
+    Items are consumed lazily: a batch is yielded as soon as the next item
+    doesn't fit it, so the first batch doesn't wait for the whole input.
+
+    Args:
+        items: Items to group, in order
+        length: Returns the token length of an item
+        max_batch_tokens: Maximum of batch_size * longest item per batch
+        first_batch_size: Maximum size of the first batch (0 = no limit), a
+            small first batch keeps the time to first audio low
+
+    Yields:
+        list: Items of a batch, order preserved
+    """
+    current = []
+    current_max = 0
+    first = True
+    for item in items:
+        item_length = length(item)
+        new_max = max(current_max, item_length)
+        if current and (
+            new_max * (len(current) + 1) > max_batch_tokens
+            or (first and first_batch_size and len(current) >= first_batch_size)
+        ):
+            yield current
+            current = []
+            first = False
+            new_max = item_length
+        current.append(item)
+        current_max = new_max
+    if current:
+        yield current
+
+
+def _packed_lstm(lstm, x: torch.Tensor, lengths: torch.Tensor) -> torch.Tensor:
+    """Runs a batch_first LSTM over padded input without reading the padding."""
+    packed = pack_padded_sequence(
+        x, lengths.cpu(), batch_first=True, enforce_sorted=False
+    )
+    output, _ = lstm(packed)
+    output, _ = pad_packed_sequence(output, batch_first=True, total_length=x.shape[1])
+    return output
+
+
+@torch.no_grad()
+def predict_durations(model, input_ids: List[List[int]], ref_s: torch.Tensor, speed: float = 1):
+    """
+    Runs the token level stages of KModel.forward_with_tokens on a padded batch.
+
+    These stages (BERT, text and duration encoders) mask the padding at every
+    layer, so each item gets the same result as when run alone.
+
+    Args:
+        model: KModel instance
+        input_ids: Input ids per item, from phonemes_to_input_ids
+        ref_s: Voice style per item, shape [batch, 256]
+        speed: Speech speed
+
+    Returns:
+        tuple: (pred_dur [batch, tokens], d [batch, tokens, dim],
+            t_en [batch, dim, tokens], lengths [batch])
+    """
+    device = model.device
+    batch_size = len(input_ids)
+    lengths = torch.tensor([len(ids) for ids in input_ids], dtype=torch.long, device=device)
+    max_length = int(lengths.max())
+
+    tokens = torch.zeros((batch_size, max_length), dtype=torch.long, device=device)
+    for b, ids in enumerate(input_ids):
+        tokens[b, : len(ids)] = torch.tensor(ids, dtype=torch.long, device=device)
+    text_mask = torch.arange(max_length, device=device).unsqueeze(0) + 1 > lengths.unsqueeze(1)
+    ref_s = ref_s.to(device)
+
+    bert_dur = model.bert(tokens, attention_mask=(~text_mask).int())
+    d_en = model.bert_encoder(bert_dur).transpose(-1, -2)
+    s = ref_s[:, 128:]
+    d = model.predictor.text_encoder(d_en, s, lengths, text_mask)
+    x = _packed_lstm(model.predictor.lstm, d, lengths)
+    duration = model.predictor.duration_proj(x)
+    duration = torch.sigmoid(duration).sum(axis=-1) / speed
+    pred_dur = torch.round(duration).clamp(min=1).long().masked_fill(text_mask, 0)
+    t_en = model.text_encoder(tokens, lengths, text_mask)
+    return pred_dur, d, t_en, lengths
+
+
+@torch.no_grad()
+def decode_item(model, pred_dur, d, t_en, length: int, ref_s: torch.Tensor) -> np.ndarray:
+    """
+    Runs the frame level stages of KModel.forward_with_tokens for one item.
+
+    Prosody prediction and the decoder normalize over the whole frame axis, so
+    they run unpadded, at the item's own length.
+
+    Args:
+        model: KModel instance
+        pred_dur: Token durations of the item, [tokens]
+        d: Duration encoder output of the item, [tokens, dim]
+        t_en: Text encoder output of the item, [dim, tokens]
+        length: Number of tokens of the item
+        ref_s: Voice style of the item, shape [1, 256]
+
+    Returns:
+        np.ndarray: Mono 24kHz audio
+    """
+    device = model.device
+    pred_dur = pred_dur[:length]
+    indices = torch.repeat_interleave(torch.arange(length, device=device), pred_dur)
+    alignment = torch.zeros((length, indices.shape[0]), device=device)
+    alignment[indices, torch.arange(indices.shape[0], device=device)] = 1
+    alignment = alignment.unsqueeze(0)
+
+    ref_s = ref_s.to(device)
+    en = d[:length].unsqueeze(0).transpose(-1, -2) @ alignment
+    f0_pred, n_pred = model.predictor.F0Ntrain(en, ref_s[:, 128:])
+    asr = t_en[:, :length].unsqueeze(0) @ alignment
+    audio = model.decoder(asr, f0_pred, n_pred, ref_s[:, :128]).squeeze()
+    return audio.float().cpu().numpy()
+
+
+def synthesize_batch(
+    model, input_ids: List[List[int]], ref_s: torch.Tensor, speed: float = 1
+) -> List[np.ndarray]:
+    """
+    Batched version of KModel.forward_with_tokens.
+
+    The token level stages run as one padded batch, the frame level stages
+    per item, so no padding reaches the audio.
+
+    Args:
+        model: KModel instance
+        input_ids: Input ids per item, from phonemes_to_input_ids
+        ref_s: Voice style per item, shape [batch, 256]
+        speed: Speech speed
+
+    Returns:
+        List[np.ndarray]: Mono 24kHz audio per item, in input order
+    """
+    pred_dur, d, t_en, lengths = predict_durations(model, input_ids, ref_s, speed)
+    return [
+        decode_item(model, pred_dur[b], d[b], t_en[b], int(lengths[b]), ref_s[b : b + 1])
+        for b in range(len(input_ids))
+    ]
+
+
+@torch.no_grad()
+def check_parity(model, input_ids: List[List[int]], ref_s: torch.Tensor, speed: float = 1) -> bool:
+    """
+    Compares synthesize_batch with KModel.forward_with_tokens, once per model.
+
+    The durations of the shortest item, predicted inside the padded batch,
+    must equal the unbatched ones; its audio must match within
+    PARITY_TOLERANCE under the same random seed (the decoder adds noise).
+    Batching is disabled for the model when they don't, e.g. after kokoro
+    changed its internals.
+
+    Args:
+        model: KModel instance
+        input_ids: Input ids of a batch with at least two items
+        ref_s: Voice style per item, shape [batch, 256]
+        speed: Speech speed
+
+    Returns:
+        bool: True if the batched path matches
+    """
+    if id(model) in _parity:
+        return _parity[id(model)]
+
+    shortest = min(range(len(input_ids)), key=lambda b: len(input_ids[b]))
+    item_ids = torch.tensor([input_ids[shortest]], dtype=torch.long, device=model.device)
+    item_ref_s = ref_s[shortest : shortest + 1].to(model.device)
+    # the decoder draws its noise on the model device
+    rng_devices = [model.device] if model.device.type == "cuda" else []
+    error = None
+    try:
+        with torch.random.fork_rng(devices=rng_devices):
+            torch.manual_seed(0)
+            expected_audio, expected_dur = model.forward_with_tokens(item_ids, item_ref_s, speed)
+        pred_dur, d, t_en, lengths = predict_durations(model, input_ids, ref_s, speed)
+        length = int(lengths[shortest])
+        matches = torch.equal(pred_dur[shortest, :length].cpu(), expected_dur.squeeze().cpu())
+        if matches:
+            with torch.random.fork_rng(devices=rng_devices):
+                torch.manual_seed(0)
+                audio = decode_item(
+                    model, pred_dur[shortest], d[shortest], t_en[shortest], length, item_ref_s
+                )
+            expected_audio = expected_audio.squeeze().float().cpu().numpy()
+            matches = audio.shape == expected_audio.shape and bool(
+                np.abs(audio - expected_audio).max() <= PARITY_TOLERANCE
+            )
+    except Exception as e:
+        matches = False
+        error = str(e)
+
+    if not matches:
+        logger.bind(error=error).warning(
+            "batched kokoro synthesis doesn't match forward_with_tokens, batching disabled"
+        )
+    _parity[id(model)] = matches
+    return matches
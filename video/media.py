@@ -1,18 +1,62 @@
+import os
 import subprocess
 import json
+import shutil
+import tempfile
+import threading
 import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, Optional
 from loguru import logger
+from video.config import merge_normalize_workers, num_cores
+
+STREAM_CHUNK_SIZE = 4096
+
+# number of ffprobe results kept by MediaUtils
+PROBE_CACHE_SIZE = 512
+
+# x264 -profile:v values for the H.264 profiles reported by ffprobe
+X264_PROFILES = {
+    "Constrained Baseline": "baseline",
+    "Baseline": "baseline",
+    "Main": "main",
+    "High": "high",
+}
+
+# seconds between forced keyframes in normalized clips
+NORMALIZE_KEYFRAME_INTERVAL = 2
+
+# media types of the audio formats that can be streamed
+STREAM_AUDIO_FORMATS = {
+    "wav": "audio/wav",
+    "mp3": "audio/mpeg",
+    "opus": "audio/ogg",
+}
+
+# ffmpeg output arguments for the formats supported by encode_pcm_stream
+STREAM_ENCODER_ARGS = {
+    "mp3": ["-c:a", "libmp3lame", "-b:a", "128k", "-f", "mp3"],
+    "opus": ["-c:a", "libopus", "-b:a", "64k", "-ar", "48000", "-f", "ogg"],
+}
 
 
 class MediaUtils:
-    def __init__(self, ffmpeg_path="ffmpeg"):
+    # ffprobe results shared by all instances, keyed by (path, size, mtime_ns)
+    _probe_cache = OrderedDict()
+    _probe_cache_lock = threading.Lock()
+
+    def __init__(self, ffmpeg_path="ffmpeg", progress_callback: Optional[Callable[[float], None]] = None):
         """
         Initializes the MediaUtils class.
 
         Args:
             ffmpeg_path: Path to the ffmpeg executable
+            progress_callback: Called with the progress percentage (0-100) of
+                ffmpeg commands that report it
         """
         self.ffmpeg_path = ffmpeg_path
+        self.progress_callback = progress_callback
 
     def merge_videos(
         self,
@@ -20,6 +64,8 @@ class MediaUtils:
         output_path: str,
         background_music_path: str = None,
         background_music_volume: float = 0.5,
+        stream_copy: bool = True,
+        normalize_workers: int = None,
     ) -> bool:
         """
         Merges multiple video files into one, optionally with background music.
@@ -29,6 +75,13 @@ class MediaUtils:
             output_path: Path for the merged output video
             background_music: Optional path to background music file
             bg_music_volume: Volume level for background music (0.0 to 1.0, default 0.5)
+            stream_copy: Join clips that share codec parameters with the
+                concat demuxer without re-encoding; clips that differ from the
+                first one are re-encoded to match it first
+            normalize_workers: Number of clips re-encoded concurrently before
+                the join (default: MERGE_NORMALIZE_WORKERS). Above 1, inputs
+                that can't be stream copied at all are normalized in parallel
+                too, instead of being merged in one filter graph
 
         Returns:
             bool: True if successful, False otherwise
@@ -46,14 +99,27 @@ class MediaUtils:
         )
 
         try:
-            # Get dimensions from the first video
-            first_video_info = self.get_video_info(video_paths[0])
-            if not first_video_info:
+            # probe every input once for dimensions, audio and duration
+            probes = [self.probe(video_path) for video_path in video_paths]
+            first_video = probes[0]["video"]
+            if first_video is None:
                 context_logger.error("failed to get video info from first video")
                 return False
 
-            target_width = first_video_info.get("width", 1080)
-            target_height = first_video_info.get("height", 1920)
+            if stream_copy:
+                merged = self.merge_videos_stream_copy(
+                    video_paths,
+                    probes,
+                    output_path,
+                    background_music_path=background_music_path,
+                    background_music_volume=background_music_volume,
+                    workers=normalize_workers or merge_normalize_workers,
+                )
+                if merged is not None:
+                    return merged
+
+            target_width = first_video.get("width") or 1080
+            target_height = first_video.get("height") or 1920
             target_dimensions = f"{target_width}:{target_height}"
 
             context_logger.bind(
@@ -77,8 +143,7 @@ class MediaUtils:
             if len(video_paths) == 1:
                 # Single video - re-encode to ensure consistency
                 # Check if the video has audio
-                audio_info = self.get_audio_info(video_paths[0])
-                has_audio = bool(audio_info.get('duration', 0) > 0)
+                has_audio = probes[0]["has_audio"]
                 
                 if background_music_path:
                     if has_audio:
@@ -118,8 +183,7 @@ class MediaUtils:
                         )
                     else:
                         # No audio in video and no background music, create silent audio
-                        video_info = self.get_video_info(video_paths[0])
-                        video_duration = video_info.get('duration', 10)  # fallback to 10 seconds
+                        video_duration = probes[0]["duration"] or 10  # fallback to 10 seconds
                         cmd.extend(
                             [
                                 "-filter_complex",
@@ -134,11 +198,8 @@ class MediaUtils:
                 # Multiple videos - normalize and concatenate with re-encoding
                 # First, check which videos have audio streams
                 videos_with_audio = []
-                for i, video_path in enumerate(video_paths):
-                    video_info = self.get_video_info(video_path)
-                    # Check if video has audio by trying to get audio info
-                    audio_info = self.get_audio_info(video_path)
-                    has_audio = bool(audio_info.get('duration', 0) > 0)
+                for i, probe in enumerate(probes):
+                    has_audio = probe["has_audio"]
                     videos_with_audio.append(has_audio)
                     context_logger.bind(video_index=i, has_audio=has_audio).debug("checked audio stream")
 
@@ -154,8 +215,7 @@ class MediaUtils:
                 for i in range(len(video_paths)):
                     if not videos_with_audio[i]:
                         # Get video duration for silent audio generation
-                        video_info = self.get_video_info(video_paths[i])
-                        video_duration = video_info.get('duration', 10)  # fallback to 10 seconds
+                        video_duration = probes[i]["duration"] or 10  # fallback to 10 seconds
                         audio_filters.append(f"anullsrc=channel_layout=stereo:sample_rate=48000:duration={video_duration}[a{i}n]")
                     else:
                         audio_filters.append(f"[{i}:a]aformat=sample_rates=48000:channel_layouts=stereo[a{i}n]")
@@ -218,10 +278,7 @@ class MediaUtils:
             # Execute the command using the new method
 
             # calculate expected duration for progress tracking
-            expected_duration = 0
-            for video_path in video_paths:
-                video_info = self.get_video_info(video_path)
-                expected_duration += video_info.get("duration", 0)
+            expected_duration = sum(probe["duration"] for probe in probes)
 
             success = self.execute_ffmpeg_command(
                 cmd,
@@ -245,55 +302,534 @@ class MediaUtils:
             )
             return False
 
-    def get_video_info(self, file_path: str) -> dict:
+    def _probe(self, file_path: str) -> dict:
         """
-        Retrieves video information such as duration, width, height, codec, fps, etc.
+        Returns the ffprobe JSON (format and all streams) of a media file.
+
+        Results for local files are cached by (path, size, mtime_ns), so probing
+        the same unchanged file again doesn't spawn ffprobe. URLs are always
+        probed. The returned dict is shared and must not be modified.
 
         Args:
-            file_path: Path to the video file
+            file_path: Path or URL of the media file
 
         Returns:
-            Dictionary containing video information
+            dict: Parsed ffprobe output
+
+        Raises:
+            Exception: If ffprobe fails
+        """
+        key = None
+        if os.path.isfile(file_path):
+            stat = os.stat(file_path)
+            key = (os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
+            with self._probe_cache_lock:
+                probe_data = self._probe_cache.get(key)
+                if probe_data is not None:
+                    self._probe_cache.move_to_end(key)
+                    return probe_data
+
+        cmd = [
+            "ffprobe",
+            "-v",
+            "quiet",
+            "-print_format",
+            "json",
+            "-show_format",
+            "-show_streams",
+            file_path,
+        ]
+        success, stdout, stderr = self.execute_ffprobe_command(cmd, "probe media")
+        if not success:
+            raise Exception(f"ffprobe failed: {stderr}")
+        probe_data = json.loads(stdout)
+
+        if key is not None:
+            with self._probe_cache_lock:
+                self._probe_cache[key] = probe_data
+                while len(self._probe_cache) > PROBE_CACHE_SIZE:
+                    self._probe_cache.popitem(last=False)
+        return probe_data
+
+    @staticmethod
+    def stream_signature(probe: dict) -> Optional[tuple]:
         """
+        Returns the codec parameters that must match for stream-copy concat.
+
+        Args:
+            probe: Result of probe()
+
+        Returns:
+            tuple: Video and audio codec parameters, None without video or audio
+        """
+        video = probe["video"]
+        audio = probe["audio"]
+        if video is None or audio is None:
+            return None
+        return (
+            video["codec"],
+            video["profile"],
+            video["level"],
+            video["width"],
+            video["height"],
+            video["frame_rate"],
+            video["pix_fmt"],
+            audio["codec"],
+            audio["sample_rate"],
+            audio["channels"],
+        )
+
+    def merge_videos_stream_copy(
+        self,
+        video_paths: list,
+        probes: list,
+        output_path: str,
+        background_music_path: str = None,
+        background_music_volume: float = 0.5,
+        workers: int = 1,
+    ) -> Optional[bool]:
+        """
+        Merges clips with the concat demuxer and stream copy.
+
+        The first clip is the reference: clips with the same codec parameters
+        (see stream_signature) are copied as they are, the others are re-encoded
+        to match it. Background music is mixed in with only the audio re-encoded.
+
+        With more than one worker the clips are re-encoded concurrently, one
+        ffmpeg process per clip, and a first clip that isn't H.264/AAC is
+        replaced by normalization_target, so every clip gets re-encoded.
+
+        Args:
+            video_paths: List of paths to video files to merge
+            probes: probe() results of the video files
+            output_path: Path for the merged output video
+            background_music_path: Optional path to background music file
+            background_music_volume: Volume level for background music
+            workers: Number of clips re-encoded concurrently
+
+        Returns:
+            bool: True if successful, False otherwise; None if the fast path
+                doesn't apply (the first clip isn't H.264/AAC and workers is 1)
+        """
+        workers = max(1, workers)
+        reference = probes[0]
+        signature = self.stream_signature(reference)
+        if (
+            signature is None
+            or signature[0] != "h264"
+            or signature[1] not in X264_PROFILES
+            or signature[7] != "aac"
+        ):
+            if workers == 1:
+                return None
+            reference = self.normalization_target(probes[0])
+            signature = None
+        conforming = [
+            signature is not None and self.stream_signature(probe) == signature
+            for probe in probes
+        ]
+        pending = [i for i, ok in enumerate(conforming) if not ok]
+        workers = min(workers, len(pending)) or 1
+
+        context_logger = logger.bind(
+            number_of_videos=len(video_paths),
+            conforming=sum(conforming),
+            workers=workers,
+            output_path=output_path,
+        )
+        context_logger.debug("merging videos with stream copy")
+
+        start = time.time()
+        work_dir = tempfile.mkdtemp(dir=os.path.dirname(os.path.abspath(output_path)))
         try:
-            cmd = [
-                "ffprobe",
-                "-v",
-                "quiet",
-                "-print_format",
-                "json",
-                "-show_format",
-                "-show_streams",
-                "-select_streams",
-                "v:0",  # Select first video stream
-                file_path,
+            clip_paths = list(video_paths)
+            for i in pending:
+                clip_paths[i] = os.path.join(work_dir, f"clip_{i:04d}.mp4")
+
+            # each clip is its own ffmpeg process: split the cores between them
+            threads = max(1, num_cores // workers)
+
+            def normalize(i):
+                return self.normalize_clip(
+                    video_paths[i], clip_paths[i], probes[i], reference, threads=threads
+                )
+
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(normalize, pending))
+            failed = [i for i, ok in zip(pending, results) if not ok]
+            if failed:
+                context_logger.bind(video_indexes=failed).error("failed to normalize clips")
+                return False
+            if pending:
+                context_logger.bind(execution_time=time.time() - start).debug(
+                    "clips normalized"
+                )
+
+            success = self.concat_copy(
+                clip_paths,
+                output_path,
+                work_dir,
+                background_music_path=background_music_path,
+                background_music_volume=background_music_volume,
+                expected_duration=sum(probe["duration"] for probe in probes),
+            )
+            if success:
+                context_logger.bind(execution_time=time.time() - start).debug(
+                    "videos merged with stream copy"
+                )
+            return success
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    @staticmethod
+    def normalization_target(probe: dict) -> dict:
+        """
+        Returns the codec parameters clips are normalized to when the first
+        clip can't serve as the stream copy reference.
+
+        Keeps the dimensions of the first clip and uses H.264 High at 30 fps
+        with 48 kHz stereo AAC, in the shape of a probe() result.
+
+        Args:
+            probe: probe() result of the first clip
+
+        Returns:
+            dict: {"video": {...}, "audio": {...}} usable as normalize_clip reference
+        """
+        video = probe["video"] or {}
+        return {
+            "video": {
+                "width": video.get("width") or 1080,
+                "height": video.get("height") or 1920,
+                "frame_rate": "30/1",
+                "fps": 30.0,
+                "pix_fmt": "yuv420p",
+                "profile": "High",
+                "level": None,
+            },
+            "audio": {
+                "sample_rate": 48000,
+                "channels": 2,
+                "channel_layout": "stereo",
+            },
+        }
+
+    def normalize_clip(
+        self,
+        input_path: str,
+        output_path: str,
+        probe: dict,
+        reference: dict,
+        threads: int = 0,
+    ) -> bool:
+        """
+        Re-encodes a clip to the codec parameters of a reference clip.
+
+        The result can be joined with the reference by stream copy: same
+        dimensions (scaled and padded), frame rate, pixel format, H.264
+        profile and level, and AAC sample rate and channels. The audio is
+        padded with silence to the length of the video, clips without audio
+        get silence only. Keyframes are forced every
+        NORMALIZE_KEYFRAME_INTERVAL seconds from the start of the clip.
+
+        Args:
+            input_path: Clip to re-encode
+            output_path: Path of the normalized clip
+            probe: probe() result of the clip
+            reference: probe() result of the reference clip
+            threads: ffmpeg threads for this clip (0 lets ffmpeg decide)
+
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        video = reference["video"]
+        audio = reference["audio"]
+        dimensions = f"{video['width']}:{video['height']}"
+        level = video["level"]
+
+        cmd = [self.ffmpeg_path, "-y", "-i", input_path]
+        filter_complex = (
+            f"[0:v]scale={dimensions}:force_original_aspect_ratio=decrease,"
+            f"pad={dimensions}:(ow-iw)/2:(oh-ih)/2:black,fps={video['frame_rate']},"
+            f"format={video['pix_fmt']}[v]"
+        )
+        # the audio is padded with silence (or is only silence) with no end,
+        # -shortest cuts it at the end of the video, so every clip's audio
+        # covers its video exactly, whatever duration the probe reported
+        if probe["has_audio"]:
+            filter_complex += ";[0:a:0]apad[a]"
+        else:
+            filter_complex += (
+                f";anullsrc=channel_layout={audio['channel_layout'] or 'stereo'}:"
+                f"sample_rate={audio['sample_rate']}[a]"
+            )
+        cmd.extend(["-filter_complex", filter_complex, "-map", "[v]", "-map", "[a]", "-shortest"])
+        cmd.extend(
+            [
+                "-c:v",
+                "libx264",
+                "-preset",
+                "veryfast",
+                "-crf",
+                "23",
+                "-profile:v",
+                X264_PROFILES[video["profile"]],
+                "-force_key_frames",
+                f"expr:gte(t,n_forced*{NORMALIZE_KEYFRAME_INTERVAL})",
+            ]
+        )
+        if level and level > 0:
+            cmd.extend(["-level:v", f"{level / 10:.1f}"])
+        if threads:
+            cmd.extend(["-threads", str(threads)])
+        cmd.extend(
+            [
+                "-c:a",
+                "aac",
+                "-b:a",
+                "192k",
+                "-ar",
+                str(audio["sample_rate"]),
+                "-ac",
+                str(audio["channels"]),
+                output_path,
             ]
+        )
+        return self.execute_ffmpeg_command(cmd, "normalize clip", show_progress=False)
+
+    def concat_copy(
+        self,
+        clip_paths: list,
+        output_path: str,
+        work_dir: str,
+        background_music_path: str = None,
+        background_music_volume: float = 0.5,
+        expected_duration: float = None,
+    ) -> bool:
+        """
+        Joins clips with identical codec parameters using the concat demuxer.
+
+        Video is always stream copied; audio too, unless background music is
+        mixed in.
+
+        Args:
+            clip_paths: Clips to join, in order
+            output_path: Path for the joined video
+            work_dir: Directory for the concat list file
+            background_music_path: Optional path to background music file
+            background_music_volume: Volume level for background music
+            expected_duration: Total duration for progress tracking
 
-            success, stdout, stderr = self.execute_ffprobe_command(
-                cmd, "get video info"
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        list_path = self.write_concat_list(clip_paths, work_dir)
+
+        cmd = [self.ffmpeg_path, "-y", "-f", "concat", "-safe", "0", "-i", list_path]
+        if background_music_path:
+            cmd.extend(["-stream_loop", "-1", "-i", background_music_path])
+            cmd.extend(
+                [
+                    "-filter_complex",
+                    f"[1:a]volume={background_music_volume}[bg];[0:a][bg]amix=inputs=2:duration=first[a]",
+                    "-map",
+                    "0:v",
+                    "-map",
+                    "[a]",
+                    "-c:v",
+                    "copy",
+                    "-c:a",
+                    "aac",
+                    "-b:a",
+                    "192k",
+                ]
             )
+        else:
+            cmd.extend(["-map", "0:v", "-map", "0:a", "-c", "copy"])
+        cmd.extend(["-movflags", "+faststart", output_path])
+
+        return self.execute_ffmpeg_command(
+            cmd,
+            "concat videos",
+            expected_duration=expected_duration,
+            show_progress=bool(expected_duration),
+        )
+
+    @staticmethod
+    def write_concat_list(clip_paths: list, work_dir: str) -> str:
+        """
+        Writes the file list read by the concat demuxer (-f concat -safe 0).
+
+        Args:
+            clip_paths: Clips to join, in order
+            work_dir: Directory for the list file
 
-            if not success:
-                raise Exception(f"ffprobe failed: {stderr}")
+        Returns:
+            str: Path of the list file
+        """
+        list_path = os.path.join(work_dir, "concat.txt")
+        with open(list_path, "w") as f:
+            for clip_path in clip_paths:
+                escaped_path = os.path.abspath(clip_path).replace("'", "'\\''")
+                f.write(f"file '{escaped_path}'\n")
+        return list_path
+
+    def probe(self, file_path: str, keyframes: bool = False) -> dict:
+        """
+        Retrieves format and stream information of a media file with one ffprobe call.
 
-            probe_data = json.loads(stdout)
+        Args:
+            file_path: Path or URL of the media file
+            keyframes: Also measure the average keyframe interval of the first
+                video stream (reads the packet index, one extra ffprobe call)
 
-            # Extract format information
-            format_info = probe_data.get("format", {})
-            streams = probe_data.get("streams", [])
+        Returns:
+            dict: {
+                "duration": container duration in seconds,
+                "format": {"name", "duration", "size", "bit_rate"},
+                "streams": [{"index", "type", "codec", "duration", ...}],
+                "video": first video stream or None,
+                "audio": first audio stream or None,
+                "has_video": bool,
+                "has_audio": bool,
+            }
+            Every stream has a bit_rate (0 when unknown). Video streams add
+            width, height, pix_fmt, profile, level, aspect_ratio, frame_rate (rational string
+            such as "30000/1001"), fps (float), attached_pic (cover art) and,
+            with keyframes, keyframe_interval in seconds. Audio streams add sample_rate,
+            channels and channel_layout.
+
+        Raises:
+            Exception: If ffprobe fails
+        """
+        probe_data = self._probe(file_path)
+        format_info = probe_data.get("format", {})
+
+        streams = []
+        for stream in probe_data.get("streams", []):
+            info = {
+                "index": stream.get("index"),
+                "type": stream.get("codec_type"),
+                "codec": stream.get("codec_name"),
+                "duration": float(stream.get("duration", 0) or 0),
+                "bit_rate": int(stream.get("bit_rate", 0) or 0),
+            }
+            if info["type"] == "video":
+                frame_rate = stream.get("avg_frame_rate", "0/0")
+                if frame_rate in ("0/0", "0/1"):
+                    frame_rate = stream.get("r_frame_rate", "0/1")
+                numerator, _, denominator = frame_rate.partition("/")
+                info.update(
+                    {
+                        "width": stream.get("width"),
+                        "height": stream.get("height"),
+                        "pix_fmt": stream.get("pix_fmt"),
+                        "profile": stream.get("profile"),
+                        "level": stream.get("level"),
+                        "aspect_ratio": stream.get("display_aspect_ratio"),
+                        "frame_rate": frame_rate,
+                        "fps": float(numerator) / float(denominator)
+                        if denominator and float(denominator)
+                        else 0.0,
+                        "attached_pic": bool(
+                            stream.get("disposition", {}).get("attached_pic")
+                        ),
+                    }
+                )
+            elif info["type"] == "audio":
+                info.update(
+                    {
+                        "sample_rate": int(stream.get("sample_rate", 0) or 0),
+                        "channels": stream.get("channels", 0),
+                        "channel_layout": stream.get("channel_layout"),
+                    }
+                )
+            streams.append(info)
+
+        video = next(
+            (
+                stream
+                for stream in streams
+                if stream["type"] == "video" and not stream["attached_pic"]
+            ),
+            None,
+        )
+        audio = next((stream for stream in streams if stream["type"] == "audio"), None)
+        if keyframes and video is not None:
+            video["keyframe_interval"] = self._keyframe_interval(file_path)
+
+        duration = float(format_info.get("duration", 0) or 0)
+        return {
+            "duration": duration,
+            "format": {
+                "name": format_info.get("format_name"),
+                "duration": duration,
+                "size": int(format_info.get("size", 0) or 0),
+                "bit_rate": int(format_info.get("bit_rate", 0) or 0),
+            },
+            "streams": streams,
+            "video": video,
+            "audio": audio,
+            "has_video": video is not None,
+            "has_audio": audio is not None,
+        }
+
+    def _keyframe_interval(self, file_path: str) -> float:
+        """
+        Returns the average time between keyframes of the first video stream.
 
-            if not streams:
-                raise Exception("No video stream found in file")
+        Only the packet index is read, no frames are decoded.
+        """
+        cmd = [
+            "ffprobe",
+            "-v",
+            "quiet",
+            "-select_streams",
+            "v:0",
+            "-show_entries",
+            "packet=pts_time,flags",
+            "-of",
+            "csv=print_section=0",
+            file_path,
+        ]
+        success, stdout, stderr = self.execute_ffprobe_command(cmd, "probe keyframes")
+        if not success:
+            raise Exception(f"ffprobe failed: {stderr}")
+
+        keyframe_times = []
+        for line in stdout.splitlines():
+            pts_time, _, flags = line.partition(",")
+            if "K" in flags and pts_time not in ("", "N/A"):
+                keyframe_times.append(float(pts_time))
+        if len(keyframe_times) < 2:
+            return 0.0
+        keyframe_times.sort()
+        return (keyframe_times[-1] - keyframe_times[0]) / (len(keyframe_times) - 1)
+
+    def get_video_info(self, file_path: str) -> dict:
+        """
+        Retrieves video information such as duration, width, height, codec, fps, etc.
+
+        Args:
+            file_path: Path to the video file
+
+        Returns:
+            Dictionary containing video information
+        """
+        try:
+            probe = self.probe(file_path)
+            video_stream = probe["video"]
 
-            video_stream = streams[0]
+            if video_stream is None:
+                raise Exception("No video stream found in file")
 
             video_info = {
-                "duration": float(format_info.get("duration", 0)),
-                "width": video_stream.get("width"),
-                "height": video_stream.get("height"),
-                "fps": video_stream.get("avg_frame_rate", "0/1").split("/")[0],
-                "aspect_ratio": video_stream.get("display_aspect_ratio", "1:1"),
-                "codec": video_stream.get("codec_name"),
+                "duration": probe["duration"],
+                "width": video_stream["width"],
+                "height": video_stream["height"],
+                "fps": video_stream["frame_rate"].split("/")[0],
+                "aspect_ratio": video_stream["aspect_ratio"] or "1:1",
+                "codec": video_stream["codec"],
             }
 
             return video_info
@@ -315,43 +851,18 @@ class MediaUtils:
             Dictionary containing audio information
         """
         try:
-            cmd = [
-                "ffprobe",
-                "-v",
-                "quiet",
-                "-print_format",
-                "json",
-                "-show_format",
-                "-show_streams",
-                "-select_streams",
-                "a:0",  # Select first audio stream
-                file_path,
-            ]
-
-            success, stdout, stderr = self.execute_ffprobe_command(
-                cmd, "get audio info"
-            )
-
-            if not success:
-                raise Exception(f"ffprobe failed: {stderr}")
+            probe = self.probe(file_path)
+            audio_stream = probe["audio"]
 
-            probe_data = json.loads(stdout)
-
-            # Extract format information
-            format_info = probe_data.get("format", {})
-            streams = probe_data.get("streams", [])
-
-            if not streams:
+            if audio_stream is None:
                 raise Exception("No audio stream found in file")
 
-            audio_stream = streams[0]
-
             audio_info = {
-                "duration": float(format_info.get("duration", 0)),
-                "channels": audio_stream.get("channels", 0),
-                "sample_rate": audio_stream.get("sample_rate", "0"),
-                "codec": audio_stream.get("codec_name", ""),
-                "bitrate": audio_stream.get("bit_rate", "0"),
+                "duration": probe["duration"],
+                "channels": audio_stream["channels"],
+                "sample_rate": str(audio_stream["sample_rate"]),
+                "codec": audio_stream["codec"] or "",
+                "bitrate": str(audio_stream["bit_rate"]),
             }
 
             return audio_info
@@ -441,8 +952,7 @@ class MediaUtils:
         try:
             # Get video duration if not provided
             if length_seconds is None:
-                video_info = self.get_video_info(video_path)
-                length_seconds = video_info.get("duration", 0)
+                length_seconds = self.probe(video_path)["duration"]
 
             if length_seconds <= 0:
                 logger.error("invalid video duration for frame extraction")
@@ -513,6 +1023,7 @@ class MediaUtils:
         operation_name: str,
         expected_duration: float = None,
         show_progress: bool = True,
+        input_chunks: Iterable[bytes] = None,
     ) -> bool:
         """
         Execute an ffmpeg command with proper logging and progress tracking.
@@ -522,10 +1033,14 @@ class MediaUtils:
             operation_name: Name of the operation for logging
             expected_duration: Expected duration for progress calculation
             show_progress: Whether to show progress information
+            input_chunks: Bytes written to ffmpeg's stdin (pipe:0) from a
+                separate thread, e.g. raw video frames
 
         Returns:
             bool: True if successful, False otherwise
         """
+        feeder = None
+        feed_error = []
         try:
             logger.bind(command=" ".join(cmd), operation=operation_name).debug(
                 f"executing ffmpeg command for {operation_name}"
@@ -533,11 +1048,33 @@ class MediaUtils:
 
             process = subprocess.Popen(
                 cmd,
+                stdin=subprocess.PIPE if input_chunks is not None else None,
                 stderr=subprocess.PIPE,
                 universal_newlines=True,
                 text=True,
             )
 
+            if input_chunks is not None:
+
+                def feed():
+                    try:
+                        for chunk in input_chunks:
+                            # stdin is opened in text mode, write to its binary buffer
+                            process.stdin.buffer.write(chunk)
+                    except BrokenPipeError:
+                        # ffmpeg exited, its return code tells why
+                        pass
+                    except Exception as e:
+                        feed_error.append(e)
+                    finally:
+                        try:
+                            process.stdin.close()
+                        except BrokenPipeError:
+                            pass
+
+                feeder = threading.Thread(target=feed, daemon=True)
+                feeder.start()
+
             # Process the output line by line as it becomes available
             for line in process.stderr:
                 # Extract time information for progress tracking
@@ -559,6 +1096,8 @@ class MediaUtils:
                         logger.info(
                             f"{operation_name}: {progress:.2f}% complete (Time: {time_str} / Total: {self.format_time(expected_duration)})"
                         )
+                        if self.progress_callback:
+                            self.progress_callback(progress)
                     except (ValueError, IndexError):
                         # If parsing fails, continue silently
                         pass
@@ -632,15 +1171,24 @@ class MediaUtils:
 
             # Wait for the process to complete and check the return code
             return_code = process.wait()
+            if feeder:
+                feeder.join()
             if return_code != 0:
                 logger.bind(return_code=return_code, operation=operation_name).error(
                     f"ffmpeg exited with code: {return_code} for {operation_name}"
                 )
                 return False
+            if feed_error:
+                logger.bind(error=str(feed_error[0]), operation=operation_name).error(
+                    f"error feeding ffmpeg input for {operation_name}"
+                )
+                return False
 
             logger.bind(operation=operation_name).debug(
                 f"{operation_name} completed successfully"
             )
+            if show_progress and expected_duration and self.progress_callback:
+                self.progress_callback(100.0)
             return True
 
         except Exception as e:
@@ -692,6 +1240,85 @@ class MediaUtils:
             )
             return False, "", str(e)
 
+    def encode_pcm_stream(
+        self,
+        pcm_chunks: Iterable[bytes],
+        sample_rate: int = 24000,
+        channels: int = 1,
+        audio_format: str = "mp3",
+    ) -> Iterator[bytes]:
+        """
+        Encodes a stream of 16 bit PCM chunks through an ffmpeg pipe.
+
+        The PCM chunks are written to ffmpeg's stdin from a separate thread,
+        so encoded bytes are yielded as soon as ffmpeg produces them.
+
+        Args:
+            pcm_chunks: Iterable of little endian 16 bit PCM chunks
+            sample_rate: Sample rate of the PCM input
+            channels: Number of channels of the PCM input
+            audio_format: Output format, one of STREAM_ENCODER_ARGS
+
+        Yields:
+            bytes: Encoded audio
+        """
+        if audio_format not in STREAM_ENCODER_ARGS:
+            raise ValueError(f"Unsupported stream audio format: {audio_format}")
+
+        cmd = [
+            self.ffmpeg_path,
+            "-hide_banner",
+            "-loglevel", "error",
+            "-f", "s16le",
+            "-ar", str(sample_rate),
+            "-ac", str(channels),
+            "-i", "pipe:0",
+            *STREAM_ENCODER_ARGS[audio_format],
+            "-flush_packets", "1",
+            "pipe:1",
+        ]
+        context_logger = logger.bind(command=" ".join(cmd), audio_format=audio_format)
+        context_logger.debug("starting ffmpeg stream encoder")
+
+        process = subprocess.Popen(
+            cmd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        feed_error = []
+
+        def feed():
+            try:
+                for chunk in pcm_chunks:
+                    process.stdin.write(chunk)
+                    process.stdin.flush()
+            except Exception as e:
+                feed_error.append(e)
+            finally:
+                try:
+                    process.stdin.close()
+                except BrokenPipeError:
+                    pass
+
+        feeder = threading.Thread(target=feed, daemon=True)
+        feeder.start()
+        try:
+            while chunk := process.stdout.read1(STREAM_CHUNK_SIZE):
+                yield chunk
+        finally:
+            process.stdout.close()
+            if process.poll() is None:
+                process.kill()
+            process.wait()
+            feeder.join()
+
+        if feed_error:
+            context_logger.bind(error=str(feed_error[0])).error(
+                "error feeding ffmpeg stream encoder"
+            )
+            raise feed_error[0]
+
     @staticmethod
     def is_hex_color(color: str) -> bool:
         """
@@ -730,8 +1357,13 @@ class MediaUtils:
         """
         
         start = time.time()
-        info = self.get_video_info(input_video_path)
-        video_duration = info.get("duration", 0)
+        try:
+            video_duration = self.probe(input_video_path)["duration"]
+        except Exception as e:
+            logger.bind(input_video_path=input_video_path, error=str(e)).error(
+                "error probing input video"
+            )
+            video_duration = 0
         
         if not video_duration:
             logger.error("failed to get video duration from input video")
@@ -0,0 +1,184 @@
+"""
+Registry of the model-backed services, created lazily on first use.
+
+Importing this module doesn't import torch, faster-whisper, kokoro or
+chatterbox, so API processes start quickly and nodes that never transcribe or
+synthesize never load a model. Models listed in PRELOAD_MODELS are loaded in
+the FastAPI lifespan instead.
+"""
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+from loguru import logger
+from video.config import kokoro_preload_lang_codes
+
+
+class ModelRegistry:
+    """
+    Named services created by a factory on first get().
+
+    Each service is created once per process; concurrent first calls wait for
+    the same creation instead of loading the model twice.
+    """
+
+    def __init__(self):
+        self._factories: Dict[str, Callable] = {}
+        self._warmups: Dict[str, Optional[Callable]] = {}
+        self._instances = {}
+        self._errors: Dict[str, str] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+
+    def register(self, name: str, factory: Callable, warmup: Callable = None):
+        """
+        Registers a service.
+
+        Args:
+            name: Service name, as used in PRELOAD_MODELS
+            factory: Creates the service instance
+            warmup: Optional hook run with the instance by warmup(), e.g. to load
+                weights the instance would otherwise load on first request
+        """
+        self._factories[name] = factory
+        self._warmups[name] = warmup
+        self._locks[name] = threading.Lock()
+
+    def get(self, name: str):
+        """
+        Returns the service instance, creating it on first use.
+
+        Args:
+            name: Registered service name
+
+        Returns:
+            The service instance
+        """
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+        if name not in self._factories:
+            raise KeyError(f"Unknown model: {name}. Valid models: {self.names()}")
+
+        with self._locks[name]:
+            instance = self._instances.get(name)
+            if instance is None:
+                start = time.time()
+                try:
+                    instance = self._factories[name]()
+                except Exception as e:
+                    self._errors[name] = str(e)
+                    raise
+                self._instances[name] = instance
+                self._errors.pop(name, None)
+                logger.bind(model=name, execution_time=time.time() - start).info(
+                    "loaded model"
+                )
+            return instance
+
+    def is_loaded(self, name: str) -> bool:
+        """Whether the service has been created."""
+        return name in self._instances
+
+    def names(self) -> List[str]:
+        """Returns the registered service names."""
+        return list(self._factories)
+
+    def warmup(self, names: List[str]):
+        """
+        Creates the given services and runs their warm-up hooks.
+
+        Failures are logged and reported by status() rather than raised, so one
+        broken model doesn't stop the others from loading.
+
+        Args:
+            names: Service names, unknown names are skipped with a warning
+        """
+        for name in names:
+            if name not in self._factories:
+                logger.bind(model=name, valid_models=self.names()).warning(
+                    "skipping unknown model in PRELOAD_MODELS"
+                )
+                continue
+            try:
+                instance = self.get(name)
+                if self._warmups[name] is not None:
+                    start = time.time()
+                    self._warmups[name](instance)
+                    logger.bind(model=name, execution_time=time.time() - start).info(
+                        "warmed up model"
+                    )
+            except Exception as e:
+                self._errors[name] = str(e)
+                logger.bind(model=name, error=str(e)).error("failed to preload model")
+
+    def status(self) -> Dict[str, str]:
+        """
+        Returns the state of every registered service.
+
+        Returns:
+            dict: name -> "loaded", "not_loaded" or "failed"
+        """
+        status = {}
+        for name in self._factories:
+            if name in self._errors:
+                status[name] = "failed"
+            elif name in self._instances:
+                status[name] = "loaded"
+            else:
+                status[name] = "not_loaded"
+        return status
+
+    def error(self, name: str) -> Optional[str]:
+        """Returns the last load error of the service, if any."""
+        return self._errors.get(name)
+
+
+def _create_whisper():
+    from video.stt import STTPool
+
+    return STTPool()
+
+
+def _create_kokoro():
+    from video.tts import TTS
+
+    return TTS()
+
+
+def _warmup_kokoro(tts):
+    from video.tts import kokoro_pipelines
+
+    # default to American English, the language of the default voice
+    kokoro_pipelines.warmup(kokoro_preload_lang_codes or ["a"])
+
+
+def _create_chatterbox():
+    from video.tts_chatterbox import TTSChatterbox
+
+    return TTSChatterbox()
+
+
+def _warmup_chatterbox(tts_chatterbox):
+    from video.tts_chatterbox import chatterbox_model
+
+    chatterbox_model.load()
+
+
+models = ModelRegistry()
+models.register("whisper", _create_whisper)
+models.register("kokoro", _create_kokoro, warmup=_warmup_kokoro)
+models.register("chatterbox", _create_chatterbox, warmup=_warmup_chatterbox)
+
+
+def get_stt():
+    """Returns the shared STTPool."""
+    return models.get("whisper")
+
+
+def get_tts():
+    """Returns the shared kokoro TTS service."""
+    return models.get("kokoro")
+
+
+def get_tts_chatterbox():
+    """Returns the shared Chatterbox TTS service."""
+    return models.get("chatterbox")
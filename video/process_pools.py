@@ -0,0 +1,53 @@
+"""
+Shared spawn process pools of the worker modules (stt_workers, tts_workers).
+
+This module only imports the standard library, so worker modules can import
+it and still set their thread count before video.config is imported.
+"""
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_process_pool(
+    initializer: Callable[[int], None], workers: int, num_cores: int
+) -> ProcessPoolExecutor:
+    """
+    Returns the shared process pool for the given initializer and worker count.
+
+    Each worker gets an equal share of the CPU cores, passed to the initializer
+    as its thread count. Pools are kept alive so workers load their model only
+    once.
+
+    Args:
+        initializer: Module level function run in every worker with its thread count
+        workers: Number of worker processes
+        num_cores: CPU cores to split between the workers
+
+    Returns:
+        ProcessPoolExecutor: Pool using the spawn start method
+    """
+    key = (initializer.__module__, initializer.__qualname__, workers)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=initializer,
+                initargs=(max(1, num_cores // workers),),
+            )
+            _pools[key] = pool
+        return pool
+
+
+def shutdown_process_pools():
+    """Stops every worker process."""
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.shutdown(wait=False, cancel_futures=True)
+        _pools.clear()
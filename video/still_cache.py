@@ -0,0 +1,92 @@
+import os
+import shutil
+from typing import Callable, Optional
+from loguru import logger
+from video.cache import DigestCache, DiskCache, file_sha256
+from video.config import cache_path, still_cache_max_mb
+
+
+class StillLoopCache(DigestCache):
+    """
+    Cache of short H.264 loops encoded from still images.
+
+    Each entry is an mp4 keyed by a hash of the image sha256, the output
+    dimensions and the encoder parameters, so a background image is encoded
+    once and reused by every video rendered on it.
+    """
+
+    def key(self, image_path: str, **params) -> str:
+        """
+        Builds the cache key of a still loop.
+
+        Args:
+            image_path: Path to the image
+            **params: Parameters that influence the encoded loop (width,
+                height, encoder arguments, ...)
+
+        Returns:
+            str: Hex digest identifying the loop
+        """
+        return self.digest({"image": file_sha256(image_path), "params": params})
+
+    def get(self, key: str, encode: Callable[[str], bool], output_path: str) -> Optional[str]:
+        """
+        Places a cached loop at output_path, encoding it on a miss.
+
+        The loop is hard-linked (copied across file systems) out of the cache,
+        so evict() in a concurrent job can't delete it while the caller still
+        reads it, e.g. lazily from a concat list.
+
+        Args:
+            key: Cache key from key()
+            encode: Called with an output path, writes the loop there and
+                returns True on success
+            output_path: Where to place the loop, outside the cache
+
+        Returns:
+            str: output_path, None if encoding failed
+        """
+        path = self.disk_cache.path(key, ".mp4")
+        if self._place(path, output_path):
+            self.disk_cache.touch(path)
+            self.disk_cache.record(hit=True)
+            logger.bind(cache_key=key).debug("still loop cache hit")
+            return output_path
+
+        self.disk_cache.record(hit=False)
+        # tmp_path keeps the .mp4 extension, ffmpeg picks the muxer from it
+        tmp_path = self.tmp_path(key, ".mp4")
+        try:
+            if not encode(tmp_path):
+                return None
+            # placed before committing, the new entry may be evicted right away
+            if not self._place(tmp_path, output_path):
+                return None
+            self.commit(tmp_path, key, ".mp4")
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        self.disk_cache.evict()
+        return output_path
+
+    @staticmethod
+    def _place(path: str, output_path: str) -> bool:
+        """Hard-links or copies path to output_path, False if path is gone."""
+        try:
+            os.link(path, output_path)
+        except FileNotFoundError:
+            return False
+        except OSError:
+            try:
+                shutil.copyfile(path, output_path)
+            except FileNotFoundError:
+                return False
+        return True
+
+
+still_loop_cache = StillLoopCache(
+    DiskCache(
+        os.path.join(cache_path, "stills"),
+        max_bytes=still_cache_max_mb * 1024 * 1024,
+    )
+)
@@ -1,41 +1,577 @@
-from faster_whisper import WhisperModel
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, List
+from faster_whisper import BatchedInferencePipeline, WhisperModel
+from faster_whisper.audio import decode_audio, pad_or_trim
+from faster_whisper.tokenizer import Tokenizer
+from faster_whisper.vad import VadOptions, get_speech_timestamps
 from loguru import logger
-from video.config import device, whisper_model, whisper_compute_type
+from video.config import (
+    device,
+    whisper_model,
+    whisper_compute_type,
+    whisper_batch_size,
+    stt_cache_enabled,
+    stt_parallel_workers,
+    stt_chunk_seconds,
+    stt_pool_size,
+    stt_num_workers,
+    num_cores,
+)
+from video.stt_cache import transcription_cache
+from video.process_pools import get_process_pool
+from video.stt_workers import detect_language, init_worker, transcribe_chunk
+
+# words of neighbouring chunks overlapping by more than this are seam duplicates
+SEAM_TOLERANCE = 0.05
+
+# sample rate faster-whisper decodes audio to
+WHISPER_SAMPLING_RATE = 16000
+
+# audio passed to language detection, Whisper looks at one 30 second window
+LANGUAGE_DETECTION_SECONDS = 30
 
 
 class STT:
-    def __init__(self):
+    def __init__(self, cpu_threads: int = 0, num_workers: int = 1):
+        """
+        Args:
+            cpu_threads: CTranslate2 threads on CPU, 0 uses its default
+            num_workers: Concurrent transcriptions the model accepts
+        """
         self.model = WhisperModel(
-            model_size_or_path=whisper_model, 
-            compute_type=whisper_compute_type
+            model_size_or_path=whisper_model,
+            compute_type=whisper_compute_type,
+            cpu_threads=cpu_threads,
+            num_workers=num_workers,
+        )
+        self.batched_model = None
+
+    def get_batched_model(self) -> BatchedInferencePipeline:
+        """Returns the batched pipeline sharing this instance's Whisper model."""
+        if self.batched_model is None:
+            self.batched_model = BatchedInferencePipeline(model=self.model)
+        return self.batched_model
+
+    def transcribe(self, audio_path, language = None, beam_size=5, batch_size=None, use_cache=True):
+        """
+        Transcribes audio into word level captions.
+
+        Args:
+            audio_path: Path or file object of the audio
+            language: Language code, detected when None
+            beam_size: Beam size of the decoder
+            batch_size: > 0 decodes VAD-split chunks in parallel batches, 0 decodes
+                sequentially, None uses WHISPER_BATCH_SIZE
+            use_cache: Whether to look up / store the result in the transcription cache
+
+        Returns:
+            tuple: (captions, duration)
+        """
+        result = self.transcribe_with_info(
+            audio_path,
+            language=language,
+            beam_size=beam_size,
+            batch_size=batch_size,
+            use_cache=use_cache,
         )
+        return result["captions"], result["duration"]
+
+    def transcribe_with_info(self, audio_path, language = None, beam_size=5, batch_size=None, use_cache=True) -> dict:
+        """
+        Transcribes audio like transcribe(), also returning the detected language.
+
+        Returns:
+            dict: captions, duration and language
+        """
+        result = {"captions": [], "duration": 0.0, "language": language}
+        for event in self.transcribe_stream(
+            audio_path,
+            language=language,
+            beam_size=beam_size,
+            batch_size=batch_size,
+            use_cache=use_cache,
+        ):
+            if event["type"] == "words":
+                result["captions"].extend(event["words"])
+            elif event["type"] == "done":
+                result["duration"] = event["duration"]
+                result["language"] = event["language"]
+        return result
+
+    def transcribe_stream(self, audio_path, language = None, beam_size=5, batch_size=None, use_cache=True) -> Iterator[dict]:
+        """
+        Transcribes audio, yielding word captions as each segment is decoded.
+
+        faster-whisper decodes segments lazily, so the first words are available
+        long before the whole file has been processed. Results are cached by the
+        sha256 of the audio and every parameter that affects decoding; a cache
+        hit yields the stored words in a single event. The result is only
+        stored when the generator runs to completion.
+
+        Args:
+            audio_path: Path or file object of the audio
+            language: Language code, detected when None
+            beam_size: Beam size of the decoder
+            batch_size: > 0 decodes VAD-split chunks in parallel batches, 0 decodes
+                sequentially, None uses WHISPER_BATCH_SIZE
+            use_cache: Whether to look up / store the result in the transcription cache
+
+        Yields:
+            dict: {"type": "info", "language", "duration"} first, then
+                {"type": "words", "words"} per segment, then
+                {"type": "done", "language", "duration"}
+        """
+        if batch_size is None:
+            batch_size = whisper_batch_size
+
+        cache_key = None
+        if use_cache and stt_cache_enabled:
+            cache_key = transcription_cache.key(
+                audio_path,
+                model=whisper_model,
+                compute_type=whisper_compute_type,
+                language=language,
+                beam_size=beam_size,
+                batch_size=batch_size,
+            )
+            cached = transcription_cache.load(cache_key)
+            if cached is not None:
+                yield {"type": "info", "language": cached["language"], "duration": cached["duration"]}
+                yield {"type": "words", "words": cached["captions"]}
+                yield {"type": "done", "language": cached["language"], "duration": cached["duration"]}
+                return
 
-    def transcribe(self, audio_path, language = None, beam_size=5):
         logger.bind(
             device=device.type,
             model_size=whisper_model,
             compute_type=whisper_compute_type,
             audio_path=audio_path,
             language=language,
+            beam_size=beam_size,
+            batch_size=batch_size,
         ).debug(
             "transcribing audio with Whisper model",
         )
-        segments, info = self.model.transcribe(
-            audio_path,
-            beam_size=beam_size,
-            word_timestamps=True,
+        if batch_size > 0:
+            segments, info = self.get_batched_model().transcribe(
+                audio_path,
+                batch_size=batch_size,
+                beam_size=beam_size,
+                word_timestamps=True,
+                language=language,
+            )
+        else:
+            segments, info = self.model.transcribe(
+                audio_path,
+                beam_size=beam_size,
+                word_timestamps=True,
+                language=language,
+            )
+
+        yield {"type": "info", "language": info.language, "duration": info.duration}
+
+        captions = []
+        for segment in segments:
+            words = [
+                {
+                    "text": word.word,
+                    "start_ts": word.start,
+                    "end_ts": word.end,
+                }
+                for word in segment.words
+            ]
+            if not words:
+                continue
+            captions.extend(words)
+            yield {"type": "words", "words": words}
+
+        if cache_key is not None:
+            transcription_cache.store(
+                cache_key,
+                {
+                    "captions": captions,
+                    "duration": info.duration,
+                    "language": info.language,
+                },
+            )
+        yield {"type": "done", "language": info.language, "duration": info.duration}
+
+    def transcribe_parallel(
+        self,
+        audio_path,
+        language=None,
+        beam_size=5,
+        workers=None,
+        chunk_seconds=None,
+        use_cache=True,
+    ):
+        """
+        Transcribes long audio by decoding silence-split chunks in worker processes.
+
+        The audio is split at pauses found by faster-whisper's Silero VAD into
+        chunks of about chunk_seconds, which are transcribed concurrently by a
+        pool of Whisper models, each with an equal share of the CPU cores. Word
+        timestamps are shifted by the chunk offset and duplicates at the seams
+        are dropped. Meant for multi-hour audio on CPU; short audio is better
+        served by transcribe().
+
+        The language is detected by a pool worker too, so this doesn't use the
+        model of this instance.
+
+        Args:
+            audio_path: Path or file object of the audio
+            language: Language code, detected on the first 30 seconds when None
+            beam_size: Beam size of the decoder
+            workers: Number of worker processes, None uses STT_PARALLEL_WORKERS
+                (0 picks one worker per 4 cores)
+            chunk_seconds: Target chunk length, None uses STT_CHUNK_SECONDS
+            use_cache: Whether to look up / store the result in the transcription cache
+
+        Returns:
+            tuple: (captions, duration)
+        """
+        if workers is None:
+            workers = stt_parallel_workers
+        if not workers:
+            workers = max(1, num_cores // 4)
+        if chunk_seconds is None:
+            chunk_seconds = stt_chunk_seconds
+
+        cache_key = None
+        if use_cache and stt_cache_enabled:
+            cache_key = transcription_cache.key(
+                audio_path,
+                model=whisper_model,
+                compute_type=whisper_compute_type,
+                language=language,
+                beam_size=beam_size,
+                mode="parallel",
+                chunk_seconds=chunk_seconds,
+            )
+            cached = transcription_cache.load(cache_key)
+            if cached is not None:
+                return cached["captions"], cached["duration"]
+
+        sampling_rate = WHISPER_SAMPLING_RATE
+        audio = decode_audio(audio_path, sampling_rate=sampling_rate)
+        duration = len(audio) / sampling_rate
+        pool = get_process_pool(init_worker, workers, num_cores)
+        if language is None:
+            language = pool.submit(
+                detect_language, audio[: LANGUAGE_DETECTION_SECONDS * sampling_rate]
+            ).result()
+
+        chunks = self.split_at_silences(audio, int(chunk_seconds * sampling_rate))
+        context_logger = logger.bind(
+            model_size=whisper_model,
+            compute_type=whisper_compute_type,
+            audio_path=audio_path,
+            language=language,
+            duration=duration,
+            num_chunks=len(chunks),
+            workers=workers,
+        )
+        context_logger.debug("transcribing audio chunks in parallel")
+
+        futures = [
+            pool.submit(
+                transcribe_chunk,
+                audio[start:end],
+                start / sampling_rate,
+                language,
+                beam_size,
+            )
+            for start, end in chunks
+        ]
+
+        captions = []
+        for (start, end), future in zip(chunks, futures):
+            chunk_start = start / sampling_rate
+            chunk_end = end / sampling_rate
+            for word in future.result():
+                word["start_ts"] = max(chunk_start, min(word["start_ts"], chunk_end))
+                word["end_ts"] = max(word["start_ts"], min(word["end_ts"], chunk_end))
+                if captions and self.is_seam_duplicate(captions[-1], word):
+                    continue
+                captions.append(word)
+
+        context_logger.bind(num_words=len(captions)).debug("merged parallel transcription")
+        if cache_key is not None:
+            transcription_cache.store(
+                cache_key,
+                {"captions": captions, "duration": duration, "language": language},
+            )
+        return captions, duration
+
+    @staticmethod
+    def split_at_silences(audio, chunk_samples: int) -> List[tuple]:
+        """
+        Splits audio into chunks of about chunk_samples, cutting only in pauses.
+
+        Args:
+            audio: Mono float32 audio at 16kHz
+            chunk_samples: Target chunk length in samples
+
+        Returns:
+            List[tuple]: (start, end) sample ranges covering the whole audio
+        """
+        speech = get_speech_timestamps(audio, VadOptions(min_silence_duration_ms=500))
+        boundaries = [0]
+        for previous, current in zip(speech, speech[1:]):
+            if current["end"] - boundaries[-1] > chunk_samples:
+                # cut in the middle of the pause before the segment that overflows
+                boundaries.append((previous["end"] + current["start"]) // 2)
+        boundaries.append(len(audio))
+        return [
+            (start, end) for start, end in zip(boundaries, boundaries[1:]) if end > start
+        ]
+
+    @staticmethod
+    def is_seam_duplicate(previous: dict, word: dict) -> bool:
+        """Whether a word repeats the previous one across a chunk seam."""
+        if word["end_ts"] <= previous["end_ts"] - SEAM_TOLERANCE:
+            return True
+        overlaps = word["start_ts"] < previous["end_ts"] - SEAM_TOLERANCE
+        same_text = word["text"].strip().lower() == previous["text"].strip().lower()
+        return overlaps and same_text
+
+    def align(self, audio_path, segments: List[dict], language: str = "en") -> List[dict]:
+        """
+        Produces word level captions for audio whose text is already known.
+
+        Instead of decoding, every segment's text is force-aligned against the
+        encoder output of its own audio span with Whisper's cross-attention
+        alignment, so only the encoder runs.
+
+        Args:
+            audio_path: Path to the audio file
+            segments: Caption dicts (text, start_ts, end_ts) covering the audio,
+                e.g. the sentence captions returned by kokoro; consecutive
+                segments repeating the same text are aligned as one
+            language: ISO 639-1 code of the text
+
+        Returns:
+            List[dict]: Word captions in the same format as transcribe()
+        """
+        segments = self.merge_repeated_segments(segments)
+        feature_extractor = self.model.feature_extractor
+        sampling_rate = feature_extractor.sampling_rate
+        max_samples = feature_extractor.n_samples
+        audio = decode_audio(audio_path, sampling_rate=sampling_rate)
+        tokenizer = Tokenizer(
+            self.model.hf_tokenizer,
+            self.model.model.is_multilingual,
+            task="transcribe",
             language=language,
         )
 
-        duration = info.duration
+        context_logger = logger.bind(
+            device=device.type,
+            model_size=whisper_model,
+            audio_path=audio_path,
+            language=language,
+            num_segments=len(segments),
+        )
+        context_logger.debug("aligning known text with Whisper model")
+
         captions = []
         for segment in segments:
-            for word in segment.words:
+            text = segment["text"].strip()
+            if not text:
+                continue
+            start_sample = int(segment["start_ts"] * sampling_rate)
+            end_sample = int(segment["end_ts"] * sampling_rate)
+            chunk = audio[start_sample:end_sample]
+            if not len(chunk) or len(chunk) > max_samples:
+                captions.extend(self.distribute_words(segment))
+                continue
+
+            try:
+                features = feature_extractor(chunk)
+                encoder_output = self.model.encode(pad_or_trim(features))
+                alignment = self.model.find_alignment(
+                    tokenizer,
+                    [tokenizer.encode(" " + text)],
+                    encoder_output,
+                    len(chunk) // feature_extractor.hop_length,
+                )[0]
+            except Exception as e:
+                context_logger.bind(error=str(e), text=text).warning(
+                    "failed to align segment, distributing words evenly"
+                )
+                captions.extend(self.distribute_words(segment))
+                continue
+
+            for word in alignment:
                 captions.append(
                     {
-                        "text": word.word,
-                        "start_ts": word.start,
-                        "end_ts": word.end,
+                        "text": word["word"],
+                        "start_ts": segment["start_ts"] + word["start"],
+                        "end_ts": min(segment["start_ts"] + word["end"], segment["end_ts"]),
                     }
                 )
-        return captions, duration
+        return captions
+
+    @staticmethod
+    def merge_repeated_segments(segments: List[dict]) -> List[dict]:
+        """
+        Merges consecutive segments that repeat the same text into one.
+
+        Kokoro's international path emits one caption per pipeline result, and
+        a sentence split into several results repeats the full sentence text in
+        each; aligning them one by one would duplicate its words.
+
+        Args:
+            segments: Caption dicts (text, start_ts, end_ts) in time order
+
+        Returns:
+            List[dict]: Segments with each repeated run spanning its whole audio
+        """
+        merged = []
+        for segment in segments:
+            previous = merged[-1] if merged else None
+            if (
+                previous is not None
+                and previous["text"].strip() == segment["text"].strip()
+                and abs(segment["start_ts"] - previous["end_ts"]) <= SEAM_TOLERANCE
+            ):
+                previous["end_ts"] = segment["end_ts"]
+                continue
+            merged.append(dict(segment))
+        return merged
+
+    @staticmethod
+    def distribute_words(segment: dict) -> List[dict]:
+        """
+        Splits a caption into words with timestamps proportional to their length.
+
+        Used when a segment can't be force-aligned (e.g. longer than one
+        Whisper window).
+        """
+        words = segment["text"].split()
+        total_chars = sum(len(word) for word in words)
+        if len(words) <= 1 or not total_chars:
+            return [dict(segment)]
+
+        duration = segment["end_ts"] - segment["start_ts"]
+        captions = []
+        position = segment["start_ts"]
+        for word in words:
+            word_duration = duration * len(word) / total_chars
+            captions.append(
+                {
+                    "text": " " + word,
+                    "start_ts": position,
+                    "end_ts": position + word_duration,
+                }
+            )
+            position += word_duration
+        return captions
+
+
+class STTPool:
+    """
+    Fixed set of STT replicas shared by concurrent requests.
+
+    Every call checks out a free replica for its whole duration and queues
+    when all of them are busy, so each model runs one transcription at a time
+    with a known share of the CPU cores.
+    """
+
+    def __init__(self, size: int = stt_pool_size, num_workers: int = stt_num_workers):
+        """
+        Args:
+            size: Number of model replicas
+            num_workers: CTranslate2 num_workers of each replica
+        """
+        self.size = max(1, size)
+        cpu_threads = max(1, num_cores // self.size)
+        start = time.time()
+        self._replicas = [
+            STT(cpu_threads=cpu_threads, num_workers=num_workers)
+            for _ in range(self.size)
+        ]
+        self._free = queue.Queue()
+        for replica in self._replicas:
+            self._free.put(replica)
+
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.waiting = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        logger.bind(
+            size=self.size,
+            cpu_threads=cpu_threads,
+            num_workers=num_workers,
+            execution_time=time.time() - start,
+        ).debug("created Whisper model pool")
+
+    @contextmanager
+    def acquire(self):
+        """Checks out a free replica, waiting for one if all are busy."""
+        with self._lock:
+            self.requests += 1
+            self.waiting += 1
+        start = time.time()
+        replica = self._free.get()
+        wait = time.time() - start
+        with self._lock:
+            self.waiting -= 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+        if wait > 1:
+            logger.bind(wait=wait, size=self.size).debug("waited for a free Whisper model")
+        try:
+            yield replica
+        finally:
+            self._free.put(replica)
+
+    def transcribe(self, *args, **kwargs):
+        """Runs STT.transcribe on a free replica."""
+        with self.acquire() as replica:
+            return replica.transcribe(*args, **kwargs)
+
+    def transcribe_with_info(self, *args, **kwargs) -> dict:
+        """Runs STT.transcribe_with_info on a free replica."""
+        with self.acquire() as replica:
+            return replica.transcribe_with_info(*args, **kwargs)
+
+    def transcribe_stream(self, *args, **kwargs) -> Iterator[dict]:
+        """Runs STT.transcribe_stream on a replica held until the stream ends."""
+        with self.acquire() as replica:
+            yield from replica.transcribe_stream(*args, **kwargs)
+
+    def transcribe_parallel(self, *args, **kwargs):
+        """
+        Runs STT.transcribe_parallel without checking out a replica.
+
+        All decoding, language detection included, happens in the worker
+        processes, so concurrent requests keep every replica available.
+        """
+        return self._replicas[0].transcribe_parallel(*args, **kwargs)
+
+    def align(self, *args, **kwargs) -> List[dict]:
+        """Runs STT.align on a free replica."""
+        with self.acquire() as replica:
+            return replica.align(*args, **kwargs)
+
+    def stats(self) -> dict:
+        """
+        Returns usage counters of the pool.
+
+        Returns:
+            dict: size, busy and waiting calls, requests and wait times in seconds
+        """
+        with self._lock:
+            return {
+                "size": self.size,
+                "busy": self.size - self._free.qsize(),
+                "waiting": self.waiting,
+                "requests": self.requests,
+                "avg_wait": self.total_wait / self.requests if self.requests else 0.0,
+                "max_wait": self.max_wait,
+            }
@@ -0,0 +1,82 @@
+import json
+import os
+from typing import Optional
+from loguru import logger
+from video.cache import DigestCache, DiskCache, file_sha256, stream_sha256
+from video.config import cache_path, stt_cache_max_mb
+
+
+class TranscriptionCache(DigestCache):
+    """
+    Cache of Whisper transcriptions keyed by audio content.
+
+    Each entry stores the word captions, duration and detected language under
+    a hash of the audio sha256 and the transcription parameters.
+    """
+
+    def key(self, audio, **params) -> str:
+        """
+        Builds the cache key for a transcription request.
+
+        Args:
+            audio: Path or seekable file object of the audio
+            **params: Parameters that influence the result (model, compute_type,
+                language, beam_size, ...)
+
+        Returns:
+            str: Hex digest identifying the request
+        """
+        audio_digest = (
+            file_sha256(audio) if isinstance(audio, (str, os.PathLike)) else stream_sha256(audio)
+        )
+        return self.digest({"audio": audio_digest, "params": params})
+
+    def load(self, key: str) -> Optional[dict]:
+        """
+        Returns a cached transcription.
+
+        Args:
+            key: Cache key from key()
+
+        Returns:
+            dict: captions, duration and language on a hit, None on a miss
+        """
+        path = self.disk_cache.path(key, ".json")
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                result = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.disk_cache.record(hit=False)
+            return None
+
+        self.disk_cache.touch(path)
+        self.disk_cache.record(hit=True)
+        logger.bind(cache_key=key).debug("transcription cache hit")
+        return result
+
+    def store(self, key: str, result: dict):
+        """
+        Adds a transcription to the cache.
+
+        Args:
+            key: Cache key from key()
+            result: captions, duration and language of the transcription
+        """
+        tmp_path = self.tmp_path(key, ".json")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(result, f)
+            self.commit(tmp_path, key, ".json")
+            self.disk_cache.evict()
+        except Exception as e:
+            logger.bind(cache_key=key, error=str(e)).warning(
+                "failed to store transcription in cache"
+            )
+
+
+transcription_cache = TranscriptionCache(
+    DiskCache(
+        os.path.join(cache_path, "stt"),
+        max_bytes=stt_cache_max_mb * 1024 * 1024,
+    )
+)
@@ -0,0 +1,69 @@
+"""
+Process pool workers for chunked parallel transcription.
+
+This module only imports the standard library at the top, so the thread count
+of a worker can be set before video.config is imported in it.
+"""
+import os
+
+_model = None
+
+
+def init_worker(num_threads: int):
+    """Limits the threads of a worker and loads its Whisper model."""
+    os.environ["NUM_THREADS"] = str(num_threads)
+    from faster_whisper import WhisperModel
+    from video.config import whisper_model, whisper_compute_type
+
+    global _model
+    _model = WhisperModel(
+        model_size_or_path=whisper_model,
+        compute_type=whisper_compute_type,
+        cpu_threads=num_threads,
+    )
+
+
+def detect_language(audio) -> str:
+    """
+    Detects the spoken language inside a worker process.
+
+    Args:
+        audio: Mono float32 audio at 16kHz, the first 30 seconds are used
+
+    Returns:
+        str: Language code
+    """
+    language, _, _ = _model.detect_language(audio)
+    return language
+
+
+def transcribe_chunk(audio, offset: float, language: str, beam_size: int = 5):
+    """
+    Transcribes one chunk of audio inside a worker process.
+
+    Args:
+        audio: Mono float32 audio at 16kHz
+        offset: Start of the chunk in the original audio, in seconds
+        language: Language code, shared by every chunk
+        beam_size: Beam size of the decoder
+
+    Returns:
+        list: Word captions with timestamps relative to the original audio
+    """
+    segments, _ = _model.transcribe(
+        audio,
+        beam_size=beam_size,
+        word_timestamps=True,
+        language=language,
+    )
+    captions = []
+    for segment in segments:
+        for word in segment.words:
+            captions.append(
+                {
+                    "text": word.word,
+                    "start_ts": offset + word.start,
+                    "end_ts": offset + word.end,
+                }
+            )
+    return captions
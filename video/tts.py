@@ -1,99 +1,167 @@
 import re
+import struct
+import threading
 import time
 import warnings
-from typing import List
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Iterator, List
 from kokoro import KPipeline
 import numpy as np
-import soundfile as sf
+import torch
 from loguru import logger
-import torchaudio as ta
-from chatterbox.tts import ChatterboxTTS
-from video.config import device
+from video.config import (
+    device,
+    num_cores,
+    kokoro_pipeline_cache_size,
+    kokoro_preload_lang_codes,
+    kokoro_max_batch_tokens,
+    tts_cache_enabled,
+    tts_output_channels,
+    tts_shard_workers,
+    tts_shard_min_chars,
+)
+from video.process_pools import get_process_pool
+from video.tts_workers import init_worker, synthesize_shard
+from video.tts_cache import tts_result_cache
+from video.media import MediaUtils, STREAM_AUDIO_FORMATS
+from video.audio_sink import WavSink
+from video.voices import LANGUAGE_VOICE_MAP, valid_kokoro_voices
+from video.kokoro_batch import (
+    MAX_PHONEME_LENGTH,
+    check_parity,
+    group_batches,
+    phonemes_to_input_ids,
+    synthesize_batch,
+)
 
 # Suppress PyTorch warnings
 warnings.filterwarnings("ignore")
 
-LANGUAGE_CONFIG = {
-    "en-us": {
-        "lang_code": "a",
-        "international": False,
-        "iso639_1": "en",
-    },
-    "en": {
-        "lang_code": "a",
-        "international": False,
-        "iso639_1": "en",
-    },
-    "en-gb": {
-        "lang_code": "b",
-        "international": False,
-        "iso639_1": "en",
-    },
-    "es": {"lang_code": "e", "international": True, "iso639_1": "es"},
-    "fr": {"lang_code": "f", "international": True, "iso639_1": "fr"},
-    "hi": {"lang_code": "h", "international": True, "iso639_1": "hi"},
-    "it": {"lang_code": "i", "international": True, "iso639_1": "it"},
-    "pt": {"lang_code": "p", "international": True, "iso639_1": "pt"},
-    "ja": {"lang_code": "j", "international": True, "iso639_1": "ja"},
-    "zh": {"lang_code": "z", "international": True, "iso639_1": "zh"},
-}
-LANGUAGE_VOICE_CONFIG = {
-    "en-us": [
-        "af_heart",
-        "af_alloy",
-        "af_aoede",
-        "af_bella",
-        "af_jessica",
-        "af_kore",
-        "af_nicole",
-        "af_nova",
-        "af_river",
-        "af_sarah",
-        "af_sky",
-        "am_adam",
-        "am_echo",
-        "am_eric",
-        "am_fenrir",
-        "am_liam",
-        "am_michael",
-        "am_onyx",
-        "am_puck",
-        "am_santa",
-    ],
-    "en-gb": [
-        "bf_alice",
-        "bf_emma",
-        "bf_isabella",
-        "bf_lily",
-        "bm_daniel",
-        "bm_fable",
-        "bm_george",
-        "bm_lewis",
-    ],
-    "zh": [
-        "zf_xiaobei",
-        "zf_xiaoni",
-        "zf_xiaoxiao",
-        "zf_xiaoyi",
-        "zm_yunjian",
-        "zm_yunxi",
-        "zm_yunxia",
-        "zm_yunyang",
-    ],
-    "es": ["ef_dora", "em_alex", "em_santa"],
-    "fr": ["ff_siwis"],
-    "it": ["if_sara", "im_nicola"],
-    "pt": ["pf_dora", "pm_alex", "pm_santa"],
-    "hi": ["hf_alpha", "hf_beta", "hm_omega", "hm_psi"],
-}
-
-LANGUAGE_VOICE_MAP = {}
-for lang, voices in LANGUAGE_VOICE_CONFIG.items():
-    for voice in voices:
-        if lang in LANGUAGE_CONFIG:
-            LANGUAGE_VOICE_MAP[voice] = LANGUAGE_CONFIG[lang]
-        else:
-            print(f"Warning: Language {lang} not found in LANGUAGE_CONFIG")
+
+def pcm16_bytes(audio) -> bytes:
+    """Converts float audio in [-1, 1] to little endian 16 bit PCM bytes."""
+    audio = np.asarray(audio, dtype=np.float32)
+    return (np.clip(audio, -1.0, 1.0) * 32767).astype("<i2").tobytes()
+
+
+def wav_stream_header(sample_rate: int, channels: int, bits_per_sample: int = 16) -> bytes:
+    """
+    Builds a PCM WAV header for a stream of unknown length.
+
+    The RIFF and data chunk sizes are set to 0xFFFFFFFF, which players
+    treat as "read until the end of the stream".
+    """
+    block_align = channels * bits_per_sample // 8
+    return (
+        b"RIFF"
+        + struct.pack("<I", 0xFFFFFFFF)
+        + b"WAVEfmt "
+        + struct.pack(
+            "<IHHIIHH",
+            16,
+            1,
+            channels,
+            sample_rate,
+            sample_rate * block_align,
+            block_align,
+            bits_per_sample,
+        )
+        + b"data"
+        + struct.pack("<I", 0xFFFFFFFF)
+    )
+
+
+class KokoroPipelinePool:
+    """
+    Process-wide registry of KPipeline instances keyed by (lang_code, device).
+
+    Pipelines are created lazily on first use and kept in LRU order; once
+    max_size is exceeded the least recently used language is evicted. A
+    pipeline is constructed outside the lock, so a slow construction only
+    blocks the requests waiting for that same pipeline.
+    """
+
+    def __init__(self, max_size: int = kokoro_pipeline_cache_size):
+        self.max_size = max(1, max_size)
+        self._pipelines = OrderedDict()
+        # pipelines under construction, keyed like _pipelines
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def get(self, lang_code: str, device_type: str = None) -> KPipeline:
+        """
+        Returns the pipeline for the given language, creating it if needed.
+
+        Args:
+            lang_code: Kokoro language code (e.g. 'a', 'e', 'z')
+            device_type: Torch device type, defaults to the configured device
+
+        Returns:
+            KPipeline: Shared pipeline instance
+        """
+        key = (lang_code, device_type or device.type)
+        with self._lock:
+            pipeline = self._pipelines.get(key)
+            if pipeline is not None:
+                self._pipelines.move_to_end(key)
+                return pipeline
+
+            future = self._pending.get(key)
+            if future is not None:
+                owner = False
+            else:
+                future = self._pending[key] = Future()
+                owner = True
+
+        if not owner:
+            # another request is constructing this pipeline
+            return future.result()
+
+        try:
+            start = time.time()
+            pipeline = KPipeline(
+                lang_code=lang_code, repo_id="hexgrad/Kokoro-82M", device=key[1]
+            )
+            logger.bind(
+                lang_code=lang_code,
+                device=key[1],
+                execution_time=time.time() - start,
+            ).debug("created kokoro pipeline")
+        except Exception as e:
+            with self._lock:
+                del self._pending[key]
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            del self._pending[key]
+            self._pipelines[key] = pipeline
+            while len(self._pipelines) > self.max_size:
+                evicted_key, _ = self._pipelines.popitem(last=False)
+                logger.bind(lang_code=evicted_key[0], device=evicted_key[1]).debug(
+                    "evicted kokoro pipeline"
+                )
+        future.set_result(pipeline)
+        return pipeline
+
+    def warmup(self, lang_codes: List[str] = None):
+        """
+        Eagerly creates pipelines for the given (or configured) language codes.
+
+        Args:
+            lang_codes: Kokoro language codes, defaults to KOKORO_PRELOAD_LANG_CODES
+        """
+        for lang_code in lang_codes or kokoro_preload_lang_codes:
+            self.get(lang_code)
+
+    def clear(self):
+        """Drops every cached pipeline."""
+        with self._lock:
+            self._pipelines.clear()
+
+
+kokoro_pipelines = KokoroPipelinePool()
 
 
 class TTS:
@@ -222,9 +290,16 @@ class TTS:
 
         return restored_sentences if restored_sentences else [text.strip()]
 
-    def kokoro_international(
-        self, text: str, output_path: str, voice: str, lang_code: str, speed=1
-    ) -> tuple[str, List[dict], float]:
+    def iter_kokoro_international(
+        self, text: str, voice: str, lang_code: str, speed=1
+    ) -> Iterator[tuple[np.ndarray, List[dict]]]:
+        """
+        Synthesizes non-English text sentence by sentence.
+
+        Yields:
+            tuple: (mono audio chunk at 24kHz, captions for the chunk with
+            timestamps relative to the start of the whole audio)
+        """
         if not text or not text.strip():
             raise ValueError("Text cannot be empty or whitespace")
         lang_code = LANGUAGE_VOICE_MAP.get(voice, {}).get("lang_code")
@@ -245,12 +320,48 @@ class TTS:
         )
 
         # generate the audio for each sentence
-        audio_data = []
-        captions = []
         full_audio_length = 0
-        pipeline = KPipeline(lang_code=lang_code, repo_id="hexgrad/Kokoro-82M", device=device)
+        pipeline = kokoro_pipelines.get(lang_code)
+        if kokoro_max_batch_tokens > 0:
+            sentence_audio = self.iter_sentence_audio_batched(
+                pipeline, sentences, voice, speed, kokoro_max_batch_tokens
+            )
+        else:
+            sentence_audio = self.iter_sentence_audio(pipeline, sentences, voice, speed)
+
+        for sentence, data in sentence_audio:
+            audio_length = len(data) / 24000
+            # since there are no tokens, we can just use the sentence as the text
+            captions = [
+                {
+                    "text": sentence,
+                    "start_ts": full_audio_length,
+                    "end_ts": full_audio_length + audio_length,
+                }
+            ]
+            full_audio_length += audio_length
+            yield data, captions
+
+        context_logger = context_logger.bind(
+            execution_time=time.time() - start,
+            audio_length=full_audio_length,
+            speedup=full_audio_length / (time.time() - start),
+        )
+        context_logger.debug(
+            "TTS generation (international) completed with kokoro",
+        )
+
+    def iter_sentence_audio(
+        self, pipeline: KPipeline, sentences: List[str], voice: str, speed=1
+    ) -> Iterator[tuple[str, np.ndarray]]:
+        """
+        Synthesizes sentences one by one.
+
+        Yields:
+            tuple: (sentence, audio) for every pipeline result, in order
+        """
         for sentence in sentences:
-            context_logger.debug(
+            logger.debug(
                 "Processing sentence",
                 sentence=sentence,
                 voice=voice,
@@ -259,39 +370,94 @@ class TTS:
             generator = pipeline(sentence, voice=voice, speed=speed)
 
             for i, result in enumerate(generator):
-                context_logger.debug(
+                logger.debug(
                     "Generated audio for sentence",
                 )
-                data = result.audio
-                audio_length = len(data) / 24000
-                audio_data.append(data)
-                # since there are no tokens, we can just use the sentence as the text
-                captions.append(
-                    {
-                        "text": sentence,
-                        "start_ts": full_audio_length,
-                        "end_ts": full_audio_length + audio_length,
-                    }
+                yield sentence, result.audio
+
+    def iter_sentence_audio_batched(
+        self,
+        pipeline: KPipeline,
+        sentences: List[str],
+        voice: str,
+        speed=1,
+        max_batch_tokens: int = kokoro_max_batch_tokens,
+    ) -> Iterator[tuple[str, np.ndarray]]:
+        """
+        Synthesizes sentences in padded batches.
+
+        Consecutive sentences are grouped so that batch_size * longest sentence
+        stays within max_batch_tokens. Sentences are phonemized as batches are
+        formed and the first sentence is synthesized alone, so the first audio
+        isn't delayed. Sentences that don't fit the model context, batches that
+        fail and models failing the parity check use the sentence by sentence path.
+
+        Yields:
+            tuple: (sentence, audio) in sentence order
+        """
+        model = pipeline.model
+        pack = pipeline.load_voice(voice).to(model.device)
+
+        def phonemize():
+            for sentence in sentences:
+                ps, _ = pipeline.g2p(sentence)
+                length = (
+                    len(ps) + 2 if ps and len(ps) <= MAX_PHONEME_LENGTH else max_batch_tokens + 1
                 )
-                full_audio_length += audio_length
+                yield sentence, ps, length
 
-        context_logger = context_logger.bind(
-            execution_time=time.time() - start,
-            audio_length=full_audio_length,
-            speedup=full_audio_length / (time.time() - start),
-        )
-        context_logger.debug(
-            "TTS generation (international) completed with kokoro",
-        )
+        for batch in group_batches(
+            phonemize(), lambda item: item[2], max_batch_tokens, first_batch_size=1
+        ):
+            batch_sentences = [sentence for sentence, _, _ in batch]
+            if len(batch) == 1:
+                yield from self.iter_sentence_audio(pipeline, batch_sentences, voice, speed)
+                continue
 
-        audio_data = np.concatenate(audio_data)
-        audio_data = np.column_stack((audio_data, audio_data))
-        sf.write(output_path, audio_data, 24000, format="WAV")
-        return captions, full_audio_length
+            start = time.time()
+            try:
+                input_ids = [phonemes_to_input_ids(model, ps) for _, ps, _ in batch]
+                ref_s = torch.cat([pack[len(ps) - 1] for _, ps, _ in batch])
+                if not check_parity(model, input_ids, ref_s, speed):
+                    yield from self.iter_sentence_audio(pipeline, batch_sentences, voice, speed)
+                    continue
+                audio = synthesize_batch(model, input_ids, ref_s, speed=speed)
+            except Exception as e:
+                logger.bind(error=str(e), batch_size=len(batch)).warning(
+                    "batched kokoro synthesis failed, falling back to sequential"
+                )
+                yield from self.iter_sentence_audio(pipeline, batch_sentences, voice, speed)
+                continue
 
-    def kokoro_english(
-        self, text: str, output_path: str, voice="af_heart", speed=1
+            logger.bind(
+                batch_size=len(batch),
+                batch_tokens=max(length for _, _, length in batch) * len(batch),
+                execution_time=time.time() - start,
+            ).debug("Generated audio for sentence batch")
+            yield from zip(batch_sentences, audio)
+
+    def kokoro_international(
+        self, text: str, output_path: str, voice: str, lang_code: str, speed=1
     ) -> tuple[str, List[dict], float]:
+        captions = []
+        with WavSink(output_path, 24000) as sink:
+            for data, chunk_captions in self.iter_kokoro_international(
+                text, voice, lang_code, speed
+            ):
+                sink.write(data)
+                captions.extend(chunk_captions)
+        return captions, sink.duration
+
+    def iter_kokoro_english(
+        self, text: str, voice="af_heart", speed=1
+    ) -> Iterator[tuple[np.ndarray, List[dict]]]:
+        """
+        Synthesizes English text with word level captions.
+
+        Yields:
+            tuple: (mono audio chunk at 24kHz, word captions for the chunk with
+            timestamps relative to the start of the whole audio)
+        """
         if not text or not text.strip():
             raise ValueError("Text cannot be empty or whitespace")
         lang_code = LANGUAGE_VOICE_MAP.get(voice, {}).get("lang_code")
@@ -311,19 +477,15 @@ class TTS:
         )
 
         context_logger.debug("Starting TTS generation with kokoro")
-        if not text or not text.strip():
-            raise ValueError("Text cannot be empty or whitespace")
-        pipeline = KPipeline(lang_code=lang_code, repo_id="hexgrad/Kokoro-82M", device=device.type)
+        pipeline = kokoro_pipelines.get(lang_code)
 
         generator = pipeline(text, voice=voice, speed=speed)
 
-        captions = []
-        audio_data = []
         full_audio_length = 0
         for _, result in enumerate(generator):
             data = result.audio
             audio_length = len(data) / 24000
-            audio_data.append(data)
+            captions = []
             if result.tokens:
                 tokens = result.tokens
                 for t in tokens:
@@ -348,10 +510,8 @@ class TTS:
                         )
                         raise ValueError(f"Error processing token: {t}, Error: {e}")
             full_audio_length += audio_length
+            yield data, captions
 
-        audio_data = np.concatenate(audio_data)
-        audio_data = np.column_stack((audio_data, audio_data))
-        sf.write(output_path, audio_data, 24000, format="WAV")
         context_logger.bind(
             execution_time=time.time() - start,
             audio_length=full_audio_length,
@@ -360,84 +520,205 @@ class TTS:
         ).debug(
             "TTS generation completed with kokoro",
         )
-        return captions, full_audio_length
 
-    def kokoro(
+    def kokoro_english(
         self, text: str, output_path: str, voice="af_heart", speed=1
     ) -> tuple[str, List[dict], float]:
+        captions = []
+        with WavSink(output_path, 24000) as sink:
+            for data, chunk_captions in self.iter_kokoro_english(text, voice, speed):
+                sink.write(data)
+                captions.extend(chunk_captions)
+        return captions, sink.duration
+
+    def kokoro_stream(
+        self, text: str, voice="af_heart", speed=1
+    ) -> Iterator[tuple[np.ndarray, List[dict]]]:
+        """
+        Generator API for kokoro, yields audio as soon as each chunk is synthesized.
+
+        Args:
+            text: Text to convert to speech
+            voice: Kokoro voice name
+            speed: Speech speed
+
+        Yields:
+            tuple: (mono float audio chunk at 24kHz, captions of the chunk)
+        """
         if not text or not text.strip():
             raise ValueError("Text cannot be empty or whitespace")
         lang_code = LANGUAGE_VOICE_MAP.get(voice, {}).get("lang_code")
         if not lang_code:
             raise ValueError(f"Voice '{voice}' not found in LANGUAGE_VOICE_MAP")
         if lang_code == "a":
-            return self.kokoro_english(text, output_path, voice, speed)
+            yield from self.iter_kokoro_english(text, voice, speed)
         else:
-            return self.kokoro_international(text, output_path, voice, lang_code, speed)
+            yield from self.iter_kokoro_international(text, voice, lang_code, speed)
 
-    def chatterbox(
+    def kokoro_stream_encoded(
         self,
         text: str,
-        output_path: str,
-        sample_audio_path: str = None,
-        exaggeration=0.5,
-        cfg_weight=0.5,
-        temperature=0.8,
-    ):
+        voice="af_heart",
+        speed=1,
+        audio_format: str = "wav",
+        media_utils: MediaUtils = None,
+    ) -> Iterator[bytes]:
+        """
+        Streams kokoro audio encoded as WAV (streaming header), MP3 or Opus.
+
+        Args:
+            text: Text to convert to speech
+            voice: Kokoro voice name
+            speed: Speech speed
+            audio_format: One of STREAM_AUDIO_FORMATS
+            media_utils: MediaUtils used to run ffmpeg for compressed formats
+
+        Yields:
+            bytes: Encoded audio
+        """
+        if audio_format not in STREAM_AUDIO_FORMATS:
+            raise ValueError(f"Unsupported stream audio format: {audio_format}")
+
+        pcm_chunks = (
+            pcm16_bytes(data) for data, _ in self.kokoro_stream(text, voice, speed)
+        )
+        if audio_format == "wav":
+            yield wav_stream_header(24000, 1)
+            yield from pcm_chunks
+        else:
+            media_utils = media_utils or MediaUtils()
+            yield from media_utils.encode_pcm_stream(
+                pcm_chunks,
+                sample_rate=24000,
+                channels=1,
+                audio_format=audio_format,
+            )
+
+    def split_into_shards(self, sentences: List[str], shards: int) -> List[str]:
+        """
+        Groups sentences into at most `shards` contiguous texts of similar length.
+
+        Args:
+            sentences: Sentences in reading order
+            shards: Maximum number of groups
+
+        Returns:
+            List[str]: Text of every group, in order
+        """
+        total_chars = sum(len(sentence) for sentence in sentences)
+        groups = []
+        current = []
+        current_chars = 0
+        for sentence in sentences:
+            current.append(sentence)
+            current_chars += len(sentence)
+            if current_chars >= total_chars * (len(groups) + 1) / shards:
+                groups.append(" ".join(current))
+                current = []
+        if current:
+            groups.append(" ".join(current))
+        return groups
+
+    def kokoro_sharded(
+        self, text: str, output_path: str, voice="af_heart", speed=1, workers: int = 2
+    ) -> tuple[List[dict], float]:
+        """
+        Synthesizes long text in a process pool on CPU workers.
+
+        The text is split into contiguous sentence groups that are synthesized in
+        parallel, each worker using its share of the CPU cores as torch threads.
+        The audio is stitched in order and caption timestamps are re-based.
+
+        Args:
+            text: Text to convert to speech
+            output_path: Path of the WAV file to write
+            voice: Kokoro voice name
+            speed: Speech speed
+            workers: Number of worker processes
+
+        Returns:
+            tuple: (captions, audio duration in seconds)
+        """
+        lang_code = LANGUAGE_VOICE_MAP.get(voice, {}).get("lang_code")
+        if not lang_code:
+            raise ValueError(f"Voice '{voice}' not found in LANGUAGE_VOICE_MAP")
+
         start = time.time()
+        shards = self.split_into_shards(
+            self.break_text_into_sentences(text, lang_code), workers
+        )
         context_logger = logger.bind(
+            voice=voice,
+            speed=speed,
             text_length=len(text),
-            sample_audio_path=sample_audio_path,
-            exaggeration=exaggeration,
-            cfg_weight=cfg_weight,
-            temperature=temperature,
-            model="ChatterboxTTS",
-            language="en-US",
-            device=device.type,
+            workers=workers,
+            num_shards=len(shards),
         )
-        context_logger.debug("starting TTS generation with Chatterbox")
-        model = ChatterboxTTS.from_pretrained(device=device.type)
-
-        if sample_audio_path:
-            wav = model.generate(
-                text,
-                audio_prompt_path=sample_audio_path,
-                exaggeration=exaggeration,
-                cfg_weight=cfg_weight,
-                temperature=temperature,
-            )
-        else:
-            wav = model.generate(
-                text,
-                exaggeration=exaggeration,
-                cfg_weight=cfg_weight,
-                temperature=temperature,
-            )
+        context_logger.debug("Starting sharded TTS generation with kokoro")
 
-        if wav.dim() == 2 and wav.shape[0] == 1:
-            wav = wav.repeat(2, 1)
-        elif wav.dim() == 1:
-            wav = wav.unsqueeze(0).repeat(2, 1)
+        pool = get_process_pool(init_worker, workers, num_cores)
+        futures = [pool.submit(synthesize_shard, shard, voice, speed) for shard in shards]
+
+        captions = []
+        with WavSink(output_path, 24000) as sink:
+            for future in futures:
+                audio, shard_captions = future.result()
+                offset = sink.duration
+                for caption in shard_captions:
+                    captions.append(
+                        {
+                            **caption,
+                            "start_ts": caption["start_ts"] + offset,
+                            "end_ts": caption["end_ts"] + offset,
+                        }
+                    )
+                sink.write(audio)
 
-        audio_length = wav.shape[1] / model.sr
-        ta.save(output_path, wav, model.sr)
         context_logger.bind(
             execution_time=time.time() - start,
-            audio_length=audio_length,
-            speedup=audio_length / (time.time() - start),
-            youtube_channel="https://www.youtube.com/@aiagentsaz"
-        ).debug(
-            "TTS generation with Chatterbox completed",
-        )
+            audio_length=sink.duration,
+            speedup=sink.duration / (time.time() - start),
+        ).debug("Sharded TTS generation completed with kokoro")
+        return captions, sink.duration
+
+    def kokoro(
+        self, text: str, output_path: str, voice="af_heart", speed=1, use_cache=True
+    ) -> tuple[str, List[dict], float]:
+        if not text or not text.strip():
+            raise ValueError("Text cannot be empty or whitespace")
+        lang_code = LANGUAGE_VOICE_MAP.get(voice, {}).get("lang_code")
+        if not lang_code:
+            raise ValueError(f"Voice '{voice}' not found in LANGUAGE_VOICE_MAP")
+
+        cache_key = None
+        if use_cache and tts_cache_enabled:
+            cache_key = tts_result_cache.key(
+                "kokoro", text, voice=voice, speed=speed, channels=tts_output_channels
+            )
+            cached = tts_result_cache.load(cache_key, output_path)
+            if cached:
+                return cached
+
+        if (
+            tts_shard_workers > 1
+            and device.type == "cpu"
+            and len(text) >= tts_shard_min_chars
+        ):
+            captions, audio_length = self.kokoro_sharded(
+                text, output_path, voice, speed, workers=tts_shard_workers
+            )
+        elif lang_code == "a":
+            captions, audio_length = self.kokoro_english(text, output_path, voice, speed)
+        else:
+            captions, audio_length = self.kokoro_international(text, output_path, voice, lang_code, speed)
+
+        if cache_key:
+            tts_result_cache.store(cache_key, output_path, captions, audio_length)
+        return captions, audio_length
 
     def valid_kokoro_voices(self, lang_code = None) -> List[str]:
         """
         Returns a list of valid voices for the given language code.
         If no language code is provided, returns all voices.
         """
-        if lang_code:
-            return LANGUAGE_VOICE_CONFIG.get(lang_code, [])
-        else:
-            return [
-                voice for voices in LANGUAGE_VOICE_CONFIG.values() for voice in voices
-            ]
+        return valid_kokoro_voices(lang_code)
@@ -0,0 +1,95 @@
+import json
+import os
+import shutil
+from typing import List, Optional
+from loguru import logger
+from video.cache import DigestCache, DiskCache
+from video.config import cache_path, tts_cache_max_mb
+
+
+class TTSResultCache(DigestCache):
+    """
+    Content-addressed cache of synthesized audio.
+
+    Each entry stores the WAV file plus its captions and duration under a
+    hash of the engine, the normalized text and the generation parameters.
+    """
+
+    def key(self, engine: str, text: str, **params) -> str:
+        """
+        Builds the cache key for a TTS request.
+
+        Args:
+            engine: TTS engine name, e.g. 'kokoro' or 'chatterbox'
+            text: Text to synthesize, whitespace is normalized
+            **params: Generation parameters that influence the audio
+
+        Returns:
+            str: Hex digest identifying the request
+        """
+        return self.digest(
+            {
+                "engine": engine,
+                "text": " ".join(text.split()),
+                "params": params,
+            }
+        )
+
+    def load(self, key: str, output_path: str) -> Optional[tuple[List[dict], float]]:
+        """
+        Copies a cached result to output_path.
+
+        Args:
+            key: Cache key from key()
+            output_path: Path the cached WAV should be written to
+
+        Returns:
+            tuple: (captions, duration) on a hit, None on a miss
+        """
+        audio_path = self.disk_cache.path(key, ".wav")
+        meta_path = self.disk_cache.path(key, ".json")
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            shutil.copyfile(audio_path, output_path)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.disk_cache.record(hit=False)
+            return None
+
+        self.disk_cache.touch(audio_path)
+        self.disk_cache.touch(meta_path)
+        self.disk_cache.record(hit=True)
+        logger.bind(cache_key=key, output_path=output_path).debug("TTS cache hit")
+        return meta["captions"], meta["duration"]
+
+    def store(self, key: str, audio_path: str, captions: List[dict], duration: float):
+        """
+        Adds a synthesized result to the cache.
+
+        Args:
+            key: Cache key from key()
+            audio_path: Path of the generated WAV file
+            captions: Captions returned by the TTS engine
+            duration: Audio duration in seconds
+        """
+        try:
+            tmp_audio_path = self.tmp_path(key, ".wav")
+            tmp_meta_path = self.tmp_path(key, ".json")
+            shutil.copyfile(audio_path, tmp_audio_path)
+            with open(tmp_meta_path, "w", encoding="utf-8") as f:
+                json.dump({"captions": captions, "duration": duration}, f)
+            self.commit(tmp_audio_path, key, ".wav")
+            self.commit(tmp_meta_path, key, ".json")
+            self.disk_cache.evict()
+        except Exception as e:
+            logger.bind(cache_key=key, error=str(e)).warning(
+                "failed to store TTS result in cache"
+            )
+
+
+tts_result_cache = TTSResultCache(
+    DiskCache(
+        os.path.join(cache_path, "tts"),
+        max_bytes=tts_cache_max_mb * 1024 * 1024,
+    )
+)
@@ -1,18 +1,197 @@
 import os
+import threading
 import time
 import traceback
 import warnings
+from collections import OrderedDict
+from contextlib import contextmanager
 from loguru import logger
-import torchaudio as ta
-from chatterbox.tts import ChatterboxTTS
-from video.config import device
+from chatterbox.tts import ChatterboxTTS, Conditionals
+from video.cache import DiskCache, file_sha256
+from video.config import (
+    device,
+    cache_path,
+    chatterbox_conds_cache_size,
+    chatterbox_conds_cache_max_mb,
+    tts_cache_enabled,
+    tts_output_channels,
+)
+from video.tts_cache import tts_result_cache
+from video.audio_sink import WavSink
 import nltk
 import torch
-from typing import List, Optional
+from typing import Iterator, List, Optional
 
 # Suppress PyTorch warnings
 warnings.filterwarnings("ignore")
 
+
+class ChatterboxModelHolder:
+    """
+    Holds the single ChatterboxTTS instance shared by every request.
+
+    The model is loaded once on first use (or explicitly via load()) and
+    generation is serialized, because voice cloning mutates model.conds.
+    """
+
+    def __init__(self):
+        self._model = None
+        self._default_conds = None
+        self._load_lock = threading.Lock()
+        self._generate_lock = threading.Lock()
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._model is not None
+
+    def load(self) -> ChatterboxTTS:
+        """
+        Loads the model if it is not loaded yet.
+
+        Returns:
+            ChatterboxTTS: The shared model instance
+        """
+        with self._load_lock:
+            if self._model is None:
+                start = time.time()
+                self._model = ChatterboxTTS.from_pretrained(device=device.type)
+                self._default_conds = self._model.conds
+                logger.bind(
+                    device=device.type,
+                    execution_time=time.time() - start,
+                ).debug("ChatterboxTTS model loaded")
+            return self._model
+
+    def unload(self):
+        """Releases the model and frees cached GPU memory."""
+        with self._generate_lock, self._load_lock:
+            if self._model is None:
+                return
+            self._model = None
+            self._default_conds = None
+            voice_conditionals.clear()
+            if device.type == "cuda":
+                torch.cuda.empty_cache()
+            logger.debug("ChatterboxTTS model unloaded")
+
+    def reload(self) -> ChatterboxTTS:
+        """
+        Unloads and loads the model again, e.g. after updating the weights.
+
+        Returns:
+            ChatterboxTTS: The freshly loaded model instance
+        """
+        self.unload()
+        return self.load()
+
+    @contextmanager
+    def session(self):
+        """
+        Yields the shared model for exclusive use with its built-in voice restored.
+        """
+        with self._generate_lock:
+            model = self.load()
+            model.conds = self._default_conds
+            yield model
+
+
+chatterbox_model = ChatterboxModelHolder()
+
+
+class VoiceConditionalsCache:
+    """
+    Cache of prepared Chatterbox conditionals for voice cloning.
+
+    Entries are keyed by the sha256 of the sample audio and the exaggeration,
+    kept in memory (LRU, max_entries) and persisted to a size-bounded disk cache.
+    """
+
+    def __init__(self, max_entries: int, disk_cache: DiskCache):
+        self.max_entries = max(1, max_entries)
+        self.disk_cache = disk_cache
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(
+        self, model: ChatterboxTTS, audio_prompt_path: str, exaggeration: float = 0.5
+    ) -> Conditionals:
+        """
+        Returns the conditionals for a sample audio, preparing them on a miss.
+
+        Must be called while holding a chatterbox_model session, since
+        preparing conditionals overwrites model.conds.
+
+        Args:
+            model: Loaded ChatterboxTTS model
+            audio_prompt_path: Path to the sample audio file
+            exaggeration: Emotion exaggeration the conditionals are built with
+
+        Returns:
+            Conditionals: Prepared conditionals on the model device
+        """
+        key = f"{file_sha256(audio_prompt_path)}_{float(exaggeration):.4f}"
+        with self._lock:
+            conds = self._entries.get(key)
+            if conds is not None:
+                self._entries.move_to_end(key)
+                self.disk_cache.record(hit=True)
+                return conds
+
+        context_logger = logger.bind(
+            audio_prompt_path=audio_prompt_path,
+            exaggeration=exaggeration,
+            cache_key=key,
+        )
+        start = time.time()
+        conds_path = self.disk_cache.path(key, ".pt")
+        conds = None
+        if os.path.exists(conds_path):
+            try:
+                conds = Conditionals.load(conds_path, map_location=device.type).to(
+                    model.device
+                )
+                self.disk_cache.touch(conds_path)
+                context_logger.debug("loaded voice conditionals from disk cache")
+            except Exception as e:
+                context_logger.bind(error=str(e)).warning(
+                    "failed to load cached voice conditionals"
+                )
+
+        self.disk_cache.record(hit=conds is not None)
+        if conds is None:
+            model.prepare_conditionals(audio_prompt_path, exaggeration=exaggeration)
+            conds = model.conds
+            try:
+                conds.save(conds_path)
+                self.disk_cache.evict()
+            except Exception as e:
+                context_logger.bind(error=str(e)).warning(
+                    "failed to persist voice conditionals"
+                )
+            context_logger.bind(execution_time=time.time() - start).debug(
+                "prepared voice conditionals"
+            )
+
+        with self._lock:
+            self._entries[key] = conds
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return conds
+
+    def clear(self):
+        """Drops the in-memory entries, e.g. after the model is reloaded."""
+        with self._lock:
+            self._entries.clear()
+
+
+voice_conditionals = VoiceConditionalsCache(
+    max_entries=chatterbox_conds_cache_size,
+    disk_cache=DiskCache(
+        os.path.join(cache_path, "chatterbox_conds"),
+        max_bytes=chatterbox_conds_cache_max_mb * 1024 * 1024,
+    ),
+)
+
 class TTSChatterbox:
     def __init__(self):
         """Initialize ChatterboxTTS and ensure NLTK data is available."""
@@ -82,17 +261,17 @@ class TTSChatterbox:
             logger.debug(f"Generating audio for chunk: {text_chunk[:50]}...")
 
             
-            # Check if audio prompt exists
-            effective_prompt_path = None
-            if audio_prompt_path and os.path.exists(audio_prompt_path):
-                effective_prompt_path = audio_prompt_path
+            # Use the cached conditionals of the audio prompt if it exists
+            if audio_prompt_path and os.path.isfile(audio_prompt_path):
+                model.conds = voice_conditionals.get(
+                    model, audio_prompt_path, exaggeration
+                )
             elif audio_prompt_path:
                 logger.warning(f"Audio prompt path not found: {audio_prompt_path}")
             
             # Generate audio
             wav_tensor = model.generate(
                 text_chunk,
-                audio_prompt_path=effective_prompt_path,
                 temperature=temperature,
                 cfg_weight=cfg_weight,
                 exaggeration=exaggeration
@@ -120,6 +299,56 @@ class TTSChatterbox:
             logger.error(traceback.format_exc())
             return None
 
+    def iter_audio_chunks(
+        self,
+        text: str,
+        model: ChatterboxTTS,
+        max_chars_per_chunk: int = 1024,
+        inter_chunk_silence_ms: int = 350,
+        audio_prompt_path: Optional[str] = None,
+        temperature: float = 0.8,
+        cfg_weight: float = 0.5,
+        exaggeration: float = 0.5
+    ) -> Iterator[torch.Tensor]:
+        """Yield [1, N] audio tensors per text chunk, with silence between chunks."""
+        # Split text into chunks
+        text_chunks = self.split_text_into_chunks(text, max_chars_per_chunk)
+
+        if not text_chunks:
+            logger.error("No text chunks to process")
+            return
+
+        sample_rate = model.sr
+
+        logger.debug(f"Processing {len(text_chunks)} chunks at {sample_rate} Hz")
+
+        for i, chunk_text in enumerate(text_chunks):
+            logger.debug(f"Processing chunk {i+1}/{len(text_chunks)}")
+
+            chunk_tensor = self.generate_audio_chunk(
+                chunk_text,
+                model,
+                audio_prompt_path,
+                temperature,
+                cfg_weight,
+                exaggeration
+            )
+
+            if chunk_tensor is None:
+                logger.warning(f"Skipping chunk {i+1} due to generation error")
+                continue
+
+            yield chunk_tensor
+
+            # Add silence between chunks (except after the last chunk)
+            if i < len(text_chunks) - 1 and inter_chunk_silence_ms > 0:
+                silence_samples = int(sample_rate * inter_chunk_silence_ms / 1000.0)
+                yield torch.zeros(
+                    (1, silence_samples),
+                    dtype=chunk_tensor.dtype,
+                    device=chunk_tensor.device
+                )
+
     def text_to_speech_pipeline(
         self,
         text: str,
@@ -131,59 +360,32 @@ class TTSChatterbox:
         cfg_weight: float = 0.5,
         exaggeration: float = 0.5
     ) -> Optional[torch.Tensor]:
-        """Convert text to speech with chunking support."""
+        """Convert text to speech with chunking support, returning the whole clip in memory."""
         try:
-            # Split text into chunks
-            text_chunks = self.split_text_into_chunks(text, max_chars_per_chunk)
-            
-            if not text_chunks:
-                logger.error("No text chunks to process")
-                return None
-            
-            all_audio_tensors = []
-            sample_rate = model.sr
-            
-            logger.debug(f"Processing {len(text_chunks)} chunks at {sample_rate} Hz")
-            
-            for i, chunk_text in enumerate(text_chunks):
-                logger.debug(f"Processing chunk {i+1}/{len(text_chunks)}")
-                
-                chunk_tensor = self.generate_audio_chunk(
-                    chunk_text,
+            all_audio_tensors = list(
+                self.iter_audio_chunks(
+                    text,
                     model,
-                    audio_prompt_path,
-                    temperature,
-                    cfg_weight,
-                    exaggeration
+                    max_chars_per_chunk=max_chars_per_chunk,
+                    inter_chunk_silence_ms=inter_chunk_silence_ms,
+                    audio_prompt_path=audio_prompt_path,
+                    temperature=temperature,
+                    cfg_weight=cfg_weight,
+                    exaggeration=exaggeration,
                 )
-                
-                if chunk_tensor is None:
-                    logger.warning(f"Skipping chunk {i+1} due to generation error")
-                    continue
-                
-                all_audio_tensors.append(chunk_tensor)
-                
-                # Add silence between chunks (except after the last chunk)
-                if i < len(text_chunks) - 1 and inter_chunk_silence_ms > 0:
-                    silence_samples = int(sample_rate * inter_chunk_silence_ms / 1000.0)
-                    silence_tensor = torch.zeros(
-                        (1, silence_samples),
-                        dtype=chunk_tensor.dtype,
-                        device=chunk_tensor.device
-                    )
-                    all_audio_tensors.append(silence_tensor)
-            
+            )
+
             if not all_audio_tensors:
                 logger.error("No audio tensors generated")
                 return None
-            
+
             # Concatenate all audio tensors
             logger.debug("Concatenating audio tensors...")
             final_audio_tensor = torch.cat(all_audio_tensors, dim=1)
-            
+
             logger.debug(f"Final audio shape: {final_audio_tensor.shape}")
             return final_audio_tensor
-            
+
         except Exception as e:
             logger.error(f"Error in text-to-speech pipeline: {e}")
             logger.error(traceback.format_exc())
@@ -200,7 +402,36 @@ class TTSChatterbox:
         temperature=0.8,
         chunk_chars: int = 1024,
         chunk_silence_ms: int = 350,
+        seed: Optional[int] = None,
     ):
+        """
+        Generate speech with Chatterbox and write it to output_path.
+
+        Results are cached only when generation is deterministic, i.e. when a
+        seed is given or temperature is 0.
+        """
+        if sample_audio_path and not os.path.isfile(sample_audio_path):
+            # keep going with the default voice, as for a missing audio prompt
+            logger.warning(f"Audio prompt path not found: {sample_audio_path}")
+            sample_audio_path = None
+
+        cache_key = None
+        if tts_cache_enabled and (seed is not None or temperature == 0):
+            cache_key = tts_result_cache.key(
+                "chatterbox",
+                text,
+                sample_audio=file_sha256(sample_audio_path) if sample_audio_path else None,
+                exaggeration=exaggeration,
+                cfg_weight=cfg_weight,
+                temperature=temperature,
+                chunk_chars=chunk_chars,
+                chunk_silence_ms=chunk_silence_ms,
+                seed=seed,
+                channels=tts_output_channels,
+            )
+            if tts_result_cache.load(cache_key, output_path):
+                return
+
         start = time.time()
         context_logger = logger.bind(
             text_length=len(text),
@@ -208,42 +439,34 @@ class TTSChatterbox:
             exaggeration=exaggeration,
             cfg_weight=cfg_weight,
             temperature=temperature,
+            seed=seed,
             model="ChatterboxTTS",
             language="en-US",
             device=device.type,
         )
         context_logger.debug("starting TTS generation with Chatterbox")
-        model = ChatterboxTTS.from_pretrained(device=device.type)
-
-        if sample_audio_path:
-            wav = self.text_to_speech_pipeline(
-                text,
-                model,
-                audio_prompt_path=sample_audio_path,
-                temperature=temperature,
-                cfg_weight=cfg_weight,
-                exaggeration=exaggeration,
-                max_chars_per_chunk=chunk_chars,
-                inter_chunk_silence_ms=chunk_silence_ms
-            )
-        else:
-            wav = self.text_to_speech_pipeline(
-                text,
-                model,
-                temperature=temperature,
-                cfg_weight=cfg_weight,
-                exaggeration=exaggeration,
-                max_chars_per_chunk=chunk_chars,
-                inter_chunk_silence_ms=chunk_silence_ms
-            )
+        with chatterbox_model.session() as model:
+            if seed is not None:
+                torch.manual_seed(seed)
+            with WavSink(output_path, model.sr) as sink:
+                for chunk_tensor in self.iter_audio_chunks(
+                    text,
+                    model,
+                    audio_prompt_path=sample_audio_path,
+                    temperature=temperature,
+                    cfg_weight=cfg_weight,
+                    exaggeration=exaggeration,
+                    max_chars_per_chunk=chunk_chars,
+                    inter_chunk_silence_ms=chunk_silence_ms
+                ):
+                    sink.write(chunk_tensor)
 
-        if wav.dim() == 2 and wav.shape[0] == 1:
-            wav = wav.repeat(2, 1)
-        elif wav.dim() == 1:
-            wav = wav.unsqueeze(0).repeat(2, 1)
+        if not sink.frames:
+            raise ValueError("Chatterbox did not generate any audio")
 
-        audio_length = wav.shape[1] / model.sr
-        ta.save(output_path, wav, model.sr)
+        audio_length = sink.duration
+        if cache_key:
+            tts_result_cache.store(cache_key, output_path, [], audio_length)
         context_logger.bind(
             execution_time=time.time() - start,
             audio_length=audio_length,
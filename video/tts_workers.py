@@ -0,0 +1,44 @@
+"""
+Process pool workers for sharded kokoro synthesis.
+
+This module only imports the standard library at the top, so the torch thread
+count of a worker can be set before video.config is imported in it.
+"""
+import os
+
+_tts = None
+
+
+def init_worker(num_threads: int):
+    """Limits the torch threads of a worker and loads its TTS instance."""
+    os.environ["NUM_THREADS"] = str(num_threads)
+    import torch
+    from video.tts import TTS
+
+    torch.set_num_threads(num_threads)
+
+    global _tts
+    _tts = TTS()
+
+
+def synthesize_shard(text: str, voice: str, speed: float = 1):
+    """
+    Synthesizes one shard of text inside a worker process.
+
+    Args:
+        text: Text of the shard
+        voice: Kokoro voice name
+        speed: Speech speed
+
+    Returns:
+        tuple: (mono float32 audio at 24kHz, captions relative to the shard start)
+    """
+    import numpy as np
+
+    audio = []
+    captions = []
+    for data, chunk_captions in _tts.kokoro_stream(text, voice, speed):
+        audio.append(np.asarray(data, dtype=np.float32))
+        captions.extend(chunk_captions)
+    audio = np.concatenate(audio) if audio else np.zeros(0, dtype=np.float32)
+    return audio, captions
@@ -0,0 +1,98 @@
+from typing import List
+
+# kokoro languages and voices; kept free of model imports, so requests can be
+# validated without loading kokoro
+LANGUAGE_CONFIG = {
+    "en-us": {
+        "lang_code": "a",
+        "international": False,
+        "iso639_1": "en",
+    },
+    "en": {
+        "lang_code": "a",
+        "international": False,
+        "iso639_1": "en",
+    },
+    "en-gb": {
+        "lang_code": "b",
+        "international": False,
+        "iso639_1": "en",
+    },
+    "es": {"lang_code": "e", "international": True, "iso639_1": "es"},
+    "fr": {"lang_code": "f", "international": True, "iso639_1": "fr"},
+    "hi": {"lang_code": "h", "international": True, "iso639_1": "hi"},
+    "it": {"lang_code": "i", "international": True, "iso639_1": "it"},
+    "pt": {"lang_code": "p", "international": True, "iso639_1": "pt"},
+    "ja": {"lang_code": "j", "international": True, "iso639_1": "ja"},
+    "zh": {"lang_code": "z", "international": True, "iso639_1": "zh"},
+}
+LANGUAGE_VOICE_CONFIG = {
+    "en-us": [
+        "af_heart",
+        "af_alloy",
+        "af_aoede",
+        "af_bella",
+        "af_jessica",
+        "af_kore",
+        "af_nicole",
+        "af_nova",
+        "af_river",
+        "af_sarah",
+        "af_sky",
+        "am_adam",
+        "am_echo",
+        "am_eric",
+        "am_fenrir",
+        "am_liam",
+        "am_michael",
+        "am_onyx",
+        "am_puck",
+        "am_santa",
+    ],
+    "en-gb": [
+        "bf_alice",
+        "bf_emma",
+        "bf_isabella",
+        "bf_lily",
+        "bm_daniel",
+        "bm_fable",
+        "bm_george",
+        "bm_lewis",
+    ],
+    "zh": [
+        "zf_xiaobei",
+        "zf_xiaoni",
+        "zf_xiaoxiao",
+        "zf_xiaoyi",
+        "zm_yunjian",
+        "zm_yunxi",
+        "zm_yunxia",
+        "zm_yunyang",
+    ],
+    "es": ["ef_dora", "em_alex", "em_santa"],
+    "fr": ["ff_siwis"],
+    "it": ["if_sara", "im_nicola"],
+    "pt": ["pf_dora", "pm_alex", "pm_santa"],
+    "hi": ["hf_alpha", "hf_beta", "hm_omega", "hm_psi"],
+}
+
+LANGUAGE_VOICE_MAP = {}
+for lang, voices in LANGUAGE_VOICE_CONFIG.items():
+    for voice in voices:
+        if lang in LANGUAGE_CONFIG:
+            LANGUAGE_VOICE_MAP[voice] = LANGUAGE_CONFIG[lang]
+        else:
+            print(f"Warning: Language {lang} not found in LANGUAGE_CONFIG")
+
+
+def valid_kokoro_voices(lang_code: str = None) -> List[str]:
+    """
+    Returns a list of valid voices for the given language code.
+    If no language code is provided, returns all voices.
+    """
+    if lang_code:
+        return LANGUAGE_VOICE_CONFIG.get(lang_code, [])
+    else:
+        return [
+            voice for voices in LANGUAGE_VOICE_CONFIG.values() for voice in voices
+        ]
@@ -128,6 +128,7 @@ class RunPodVideoHandler(RunPodBaseHandler):
         kokoro_speed = parameters.get("kokoro_speed", 1.0)
         language = parameters.get("language")
         image_effect = parameters.get("image_effect", "ken_burns")
+        ken_burns_engine = parameters.get("ken_burns_engine")
         caption_config = parameters.get("caption_config", {})
 
         # Create a temp dir for processing
@@ -159,13 +160,16 @@ class RunPodVideoHandler(RunPodBaseHandler):
             background_path = self.storage.download_file(f"image/{background_id}", os.path.join(temp_dir, background_id))
             
             # Resize background if needed
-            info = self.media_utils.get_video_info(background_path)
+            info = self.media_utils.probe(background_path)["video"] or {}
             if info.get("width", 0) != width or info.get("height", 0) != height:
                 resized_background_path = os.path.join(temp_dir, f"resized_{background_id}")
                 resize_image_cover(background_path, resized_background_path, width, height)
                 background_path = resized_background_path
 
-            builder.set_background_image(background_path, effect_config={"effect": image_effect})
+            effect_config = {"effect": image_effect}
+            if ken_burns_engine:
+                effect_config["engine"] = ken_burns_engine
+            builder.set_background_image(background_path, effect_config=effect_config)
 
             # Execute video generation
             output_filename = f"video/{uuid.uuid4().hex}.mp4"